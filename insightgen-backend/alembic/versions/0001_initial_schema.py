@@ -0,0 +1,59 @@
+"""Initial schema: products, customers and orders
+
+Databases created earlier by init_db.py already have these tables; they are
+left untouched, so this revision can be applied to them directly.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Offline (--sql) runs can't inspect, and emit every table
+    if op.get_context().as_sql:
+        existing = set()
+    else:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+    
+    if "products" not in existing:
+        op.create_table(
+            "products",
+            sa.Column("product_id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("product_name", sa.String(255), nullable=False),
+            sa.Column("category", sa.String(100), nullable=False),
+            sa.Column("price", sa.Numeric(10, 2), nullable=False)
+        )
+    
+    if "customers" not in existing:
+        op.create_table(
+            "customers",
+            sa.Column("customer_id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("customer_name", sa.String(255), nullable=False),
+            sa.Column("region", sa.String(100), nullable=False)
+        )
+    
+    if "orders" not in existing:
+        op.create_table(
+            "orders",
+            sa.Column("order_id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("customer_id", sa.Integer(), sa.ForeignKey("customers.customer_id"), nullable=False),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.product_id"), nullable=False),
+            sa.Column("order_date", sa.Date(), nullable=False),
+            sa.Column("quantity", sa.Integer(), nullable=False),
+            sa.Column("revenue", sa.Numeric(10, 2), nullable=False)
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("orders")
+    op.drop_table("customers")
+    op.drop_table("products")
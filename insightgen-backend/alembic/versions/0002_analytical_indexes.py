@@ -0,0 +1,56 @@
+"""Analytical indexes on orders, products and customers
+
+- BRIN on orders.order_date for date-range pruning (orders are appended in
+  date order, so block ranges map to narrow date ranges)
+- Covering btrees on orders (product_id, order_date) and
+  (customer_id, order_date) including quantity and revenue, so joins to
+  products/customers with date filters and SUM aggregates can be answered
+  by index-only scans
+- products.category and customers.region, including the join key
+
+Indexes are built CONCURRENTLY, outside a transaction, so large tables stay
+writable during the migration.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("ix_orders_order_date_brin", "orders", ["order_date"], {"postgresql_using": "brin"}),
+    ("ix_orders_product_date", "orders", ["product_id", "order_date"], {"postgresql_include": ["quantity", "revenue"]}),
+    ("ix_orders_customer_date", "orders", ["customer_id", "order_date"], {"postgresql_include": ["quantity", "revenue"]}),
+    ("ix_products_category", "products", ["category"], {"postgresql_include": ["product_id"]}),
+    ("ix_customers_region", "customers", ["region"], {"postgresql_include": ["customer_id"]}),
+]
+
+ANALYZED_TABLES = ("orders", "products", "customers")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                **options
+            )
+        for table in ANALYZED_TABLES:
+            op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,57 @@
+"""Daily and monthly order rollups for the aggregate navigator
+
+orders_daily_rollup is grained by (order_date, product_id, region) with the
+product name and category carried along; orders_monthly_rollup by
+(month_start, category, region). Both store order counts and quantity and
+revenue sums. rollup_state records the refresh watermark. The tables are
+filled (incrementally, in the background) by app.db.rollups.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "orders_daily_rollup",
+        sa.Column("order_date", sa.Date(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), primary_key=True),
+        sa.Column("region", sa.String(100), primary_key=True),
+        sa.Column("product_name", sa.String(255), nullable=False),
+        sa.Column("category", sa.String(100), nullable=False),
+        sa.Column("order_count", sa.BigInteger(), nullable=False),
+        sa.Column("quantity", sa.BigInteger(), nullable=False),
+        sa.Column("revenue", sa.Numeric(18, 2), nullable=False)
+    )
+    op.create_table(
+        "orders_monthly_rollup",
+        sa.Column("month_start", sa.Date(), primary_key=True),
+        sa.Column("category", sa.String(100), primary_key=True),
+        sa.Column("region", sa.String(100), primary_key=True),
+        sa.Column("order_count", sa.BigInteger(), nullable=False),
+        sa.Column("quantity", sa.BigInteger(), nullable=False),
+        sa.Column("revenue", sa.Numeric(18, 2), nullable=False)
+    )
+    op.create_table(
+        "rollup_state",
+        sa.Column("name", sa.String(100), primary_key=True),
+        sa.Column("last_order_id", sa.BigInteger(), nullable=False),
+        sa.Column("source_changes", sa.BigInteger(), nullable=False),
+        sa.Column("source_modifications", sa.BigInteger(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rollup_state")
+    op.drop_table("orders_monthly_rollup")
+    op.drop_table("orders_daily_rollup")
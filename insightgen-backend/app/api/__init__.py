@@ -1,5 +1,7 @@
 """API package initialization"""
 from app.api.dashboard import router as dashboard_router
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
+from app.api.slow_queries import router as slow_queries_router
 
-__all__ = ["dashboard_router", "health_router"]
+__all__ = ["dashboard_router", "health_router", "metrics_router", "slow_queries_router"]
@@ -1,14 +1,73 @@
 """Dashboard API endpoints"""
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db import get_db
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.db import get_async_db, AsyncSessionLocal
+from app.metrics import metrics
 from app.schemas import DashboardRequest, DashboardResponse, ErrorResponse
 from app.services import dashboard_builder
 from app.security import limiter
 from fastapi import Request
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable
+import asyncio
+import json
 
 router = APIRouter(prefix="/api/v1/dashboard", tags=["Dashboard"])
 
+CLIENT_DISCONNECTS = metrics.counter(
+    "insightgen_client_disconnects_total",
+    "Dashboard requests abandoned by the client and cancelled",
+    ("endpoint",)
+)
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was ready"""
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """Return once the client disconnects (the request body is already read)"""
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+@asynccontextmanager
+async def _watch_disconnect(request: Request) -> AsyncIterator[asyncio.Future]:
+    """Watch for a client disconnect for the duration of a request"""
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        yield watcher
+    finally:
+        watcher.cancel()
+
+
+async def _cancel_on_disconnect(disconnect: asyncio.Future, awaitable: Awaitable) -> Any:
+    """
+    Await work, cancelling it as soon as the client disconnects
+    
+    Cancellation reaches every pending pipeline stage: LLM requests are
+    aborted and a running query is cancelled on the server.
+    
+    Args:
+        disconnect: Watcher from _watch_disconnect
+        awaitable: The work
+    
+    Raises:
+        ClientDisconnected: The client disconnected and the work was cancelled
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        await asyncio.wait({task, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done():
+            raise ClientDisconnected()
+        return task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
 
 @router.post(
     "/generate",
@@ -22,7 +81,7 @@ router = APIRouter(prefix="/api/v1/dashboard", tags=["Dashboard"])
 async def generate_dashboard(
     request: Request,
     dashboard_request: DashboardRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Generate dashboard from natural language query
@@ -38,14 +97,24 @@ async def generate_dashboard(
     - Complete dashboard with charts, insights, and metadata
     """
     try:
-        # Build dashboard
-        dashboard = dashboard_builder.build_dashboard(
-            db=db,
-            user_question=dashboard_request.query
-        )
+        # Build dashboard, abandoning it if the client goes away
+        async with _watch_disconnect(request) as disconnect:
+            dashboard = await _cancel_on_disconnect(disconnect, dashboard_builder.build_dashboard(
+                db=db,
+                user_question=dashboard_request.query,
+                response_format=dashboard_request.response_format,
+                insight_mode=dashboard_request.insight_mode
+            ))
         
         return dashboard
-        
+    
+    except ClientDisconnected:
+        CLIENT_DISCONNECTS.inc(endpoint="generate")
+        # Nobody is listening; 499 (client closed request) is for the logs
+        raise HTTPException(
+            status_code=499,
+            detail="Client closed request"
+        )
     except ValueError as e:
         # Validation errors (SQL validation, etc.)
         raise HTTPException(
@@ -58,3 +127,65 @@ async def generate_dashboard(
             status_code=500,
             detail=f"Dashboard generation failed: {str(e)}"
         )
+
+
+def _format_sse(event: str, payload: Any) -> str:
+    """Format a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+@router.post(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}}
+    }
+)
+@limiter.limit("10/minute")
+async def stream_dashboard(
+    request: Request,
+    dashboard_request: DashboardRequest
+):
+    """
+    Generate dashboard from natural language query, streamed as Server-Sent Events
+    
+    Events are emitted as each pipeline stage completes:
+    `sql`, `metadata`, `rows` (chunked), `chart`, `insights`, then `complete`.
+    Failures are reported as an `error` event with a `status_code`. The
+    pipeline is cancelled if the client disconnects.
+    """
+    async def event_stream() -> AsyncIterator[str]:
+        # The session must live as long as the stream, so it is opened here
+        # rather than through a dependency
+        async with AsyncSessionLocal() as db, _watch_disconnect(request) as disconnect:
+            events = dashboard_builder.stream_dashboard(
+                db=db,
+                user_question=dashboard_request.query,
+                chunk_size=settings.STREAM_ROW_CHUNK_SIZE,
+                response_format=dashboard_request.response_format,
+                insight_mode=dashboard_request.insight_mode
+            )
+            try:
+                while True:
+                    try:
+                        event, payload = await _cancel_on_disconnect(disconnect, events.__anext__())
+                    except StopAsyncIteration:
+                        break
+                    yield _format_sse(event, payload)
+            except ClientDisconnected:
+                CLIENT_DISCONNECTS.inc(endpoint="stream")
+            except ValueError as e:
+                yield _format_sse("error", {"status_code": 400, "detail": str(e)})
+            except Exception as e:
+                yield _format_sse("error", {
+                    "status_code": 500,
+                    "detail": f"Dashboard generation failed: {str(e)}"
+                })
+            finally:
+                await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
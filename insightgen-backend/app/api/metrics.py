@@ -0,0 +1,98 @@
+"""Metrics endpoint - Prometheus text format"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.llm import sql_generator
+from app.llm.client import llm_client
+from app.metrics import metrics, MetricFamily
+from app.security import sql_validator
+from app.services import query_executor
+from typing import List
+
+router = APIRouter(tags=["Metrics"])
+
+# Counters kept by LLMClient.stats(), per purpose
+LLM_COUNTERS = (
+    ("calls", "LLM calls"),
+    ("failures", "LLM calls that failed after retries"),
+    ("timeouts", "LLM calls that hit their deadline"),
+    ("cancellations", "LLM calls abandoned by their caller"),
+    ("retries", "LLM call retries"),
+    ("hedges", "Hedged duplicate LLM requests sent"),
+    ("hedge_wins", "Hedged requests that answered first"),
+)
+
+
+def collect_llm() -> List[MetricFamily]:
+    """LLM call counters and token totals per purpose"""
+    stats = llm_client.stats()
+    families = [
+        (
+            f"insightgen_llm_{key}_total",
+            "counter",
+            documentation,
+            [({"purpose": purpose}, values[key]) for purpose, values in stats.items()]
+        )
+        for key, documentation in LLM_COUNTERS
+    ]
+    families.append((
+        "insightgen_llm_tokens_total",
+        "counter",
+        "LLM tokens reported by the provider",
+        [
+            ({"purpose": purpose, "kind": kind}, values[f"{kind}_tokens"])
+            for purpose, values in stats.items()
+            for kind in ("prompt", "output")
+        ]
+    ))
+    return families
+
+
+def collect_caches() -> List[MetricFamily]:
+    """Hit, miss and size figures of the SQL, validation and result caches"""
+    caches = {"sql_validation": sql_validator.stats()}
+    if sql_generator.cache is not None:
+        caches["nl_sql"] = sql_generator.cache.stats()
+    if query_executor.result_cache is not None:
+        caches["result"] = query_executor.result_cache.stats()
+    
+    families = [
+        (
+            f"insightgen_cache_{key}_total",
+            "counter",
+            documentation,
+            [({"cache": name}, stats[key]) for name, stats in caches.items()]
+        )
+        for key, documentation in (("hits", "Cache hits"), ("misses", "Cache misses"))
+    ]
+    families.append((
+        "insightgen_cache_entries",
+        "gauge",
+        "Entries held by the cache",
+        [({"cache": name}, stats["entries"]) for name, stats in caches.items()]
+    ))
+    if "result" in caches:
+        families.append((
+            "insightgen_result_cache_bytes",
+            "gauge",
+            "Estimated size of the cached query results",
+            [({}, caches["result"]["bytes"])]
+        ))
+    return families
+
+
+metrics.add_collector(collect_llm)
+metrics.add_collector(collect_caches)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Metrics in the Prometheus text exposition format
+    
+    Stage, query phase, LLM call and HTTP request duration histograms, LLM
+    call and token counters, and cache statistics
+    """
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,42 @@
+"""Slow-query log endpoint"""
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+from app.services.slow_query_log import slow_query_log
+from typing import Any, Dict, List, Literal, Optional
+
+router = APIRouter(prefix="/api/v1/slow-queries", tags=["Diagnostics"])
+
+
+class SlowQuery(BaseModel):
+    """A logged query with its timing totals and latest plan"""
+    fingerprint: str
+    sql: str
+    calls: int
+    timeouts: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    last_rows: Optional[int] = None
+    last_seen: Optional[float] = None
+    plan_type: Optional[str] = None
+    plan_summary: Optional[List[str]] = None
+    plan: Optional[Dict[str, Any]] = None
+
+
+@router.get("", response_model=List[SlowQuery])
+async def list_slow_queries(
+    limit: int = Query(default=20, ge=1, le=200),
+    order_by: Literal["total_ms", "max_ms", "mean_ms", "calls"] = "total_ms",
+    include_plans: bool = False
+):
+    """
+    Worst logged queries, grouped by SQL fingerprint
+    
+    Ordered by total time by default. plan_summary lists the scans and joins
+    of the latest captured plan (e.g. "Seq Scan on orders"); the full EXPLAIN
+    JSON is included with include_plans=true.
+    """
+    queries = slow_query_log.worst(limit=limit, order_by=order_by)
+    if not include_plans:
+        queries = [{**query, "plan": None} for query in queries]
+    return queries
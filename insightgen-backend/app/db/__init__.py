@@ -1,5 +1,13 @@
 """Database package initialization"""
 from app.db.models import Base, Product, Customer, Order
 from app.db.session import engine, get_db, SessionLocal
+from app.db.async_session import async_engine, get_async_db, AsyncSessionLocal
+from app.db.query_result import QueryResult
+from app.db.profiler import ColumnProfile
 
-__all__ = ["Base", "Product", "Customer", "Order", "engine", "get_db", "SessionLocal"]
+__all__ = [
+    "Base", "Product", "Customer", "Order",
+    "engine", "get_db", "SessionLocal",
+    "async_engine", "get_async_db", "AsyncSessionLocal",
+    "QueryResult", "ColumnProfile"
+]
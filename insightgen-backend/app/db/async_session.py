@@ -0,0 +1,64 @@
+"""Async database session management"""
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.config import settings
+from typing import AsyncGenerator
+
+# Create async database engine (asyncpg driver)
+async_engine = create_async_engine(
+    settings.async_database_url,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20
+)
+
+# Small engine of its own for pg_cancel_backend, so cancelling a query never
+# waits for a connection from the (then likely exhausted) API pool
+cancel_engine = create_async_engine(
+    settings.async_database_url,
+    pool_size=1,
+    max_overflow=4,
+    pool_timeout=5
+)
+
+
+def session_defaults_sql(read_only: bool, timeout_ms: int) -> str:
+    """SET statements applied once to every new pooled connection"""
+    statements = [f"SET statement_timeout = {int(timeout_ms)}"]
+    if read_only:
+        statements.append("SET default_transaction_read_only = on")
+    return "; ".join(statements)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def configure_connection(dbapi_connection, connection_record) -> None:
+    """
+    Configure a new connection for API queries
+    
+    Transactions are read-only and statements time out after
+    QUERY_TIMEOUT_SECONDS, so queries need no per-query SET (and nothing
+    leaks between requests).
+    Both settings are sent in one round trip when the connection is opened.
+    Code that writes (the rollup refresh) starts its transaction with
+    SET TRANSACTION READ WRITE.
+    """
+    sql = session_defaults_sql(settings.DB_READ_ONLY, settings.QUERY_TIMEOUT_SECONDS * 1000)
+    dbapi_connection.run_async(lambda connection: connection.execute(sql))
+
+
+# Create async session factory
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting an async database session
+    Usage in FastAPI: db: AsyncSession = Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
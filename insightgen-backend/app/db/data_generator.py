@@ -0,0 +1,372 @@
+"""Synthetic sales data generator - vectorized chunks loaded with COPY"""
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import io
+import time
+import numpy as np
+import pandas as pd
+
+
+ORDERS_PER_SCALE = 1_000_000
+CUSTOMERS_PER_SCALE = 50_000
+MIN_CUSTOMERS = 100
+
+CATEGORIES = ['Electronics', 'Clothing', 'Home & Garden', 'Sports', 'Books', 'Toys', 'Food & Beverage']
+REGIONS = ['North', 'South', 'East', 'West', 'Central']
+# Share of customers per region
+REGION_WEIGHTS = [0.26, 0.22, 0.18, 0.22, 0.12]
+
+PRODUCT_NAMES = {
+    'Electronics': ['Laptop', 'Smartphone', 'Tablet', 'Headphones', 'Smart Watch', 'Camera', 'Speaker', 'Monitor'],
+    'Clothing': ['T-Shirt', 'Jeans', 'Jacket', 'Dress', 'Shoes', 'Hat', 'Scarf', 'Sweater'],
+    'Home & Garden': ['Sofa', 'Table', 'Chair', 'Lamp', 'Rug', 'Plant', 'Vase', 'Mirror'],
+    'Sports': ['Basketball', 'Soccer Ball', 'Tennis Racket', 'Yoga Mat', 'Dumbbell', 'Bicycle', 'Skateboard'],
+    'Books': ['Fiction Novel', 'Cookbook', 'Biography', 'Self-Help', 'Science', 'History', 'Poetry'],
+    'Toys': ['Action Figure', 'Doll', 'Board Game', 'Puzzle', 'LEGO Set', 'RC Car', 'Stuffed Animal'],
+    'Food & Beverage': ['Coffee', 'Tea', 'Chocolate', 'Cookies', 'Juice', 'Snacks', 'Pasta']
+}
+VARIANTS = ['Standard', 'Premium', 'Deluxe']
+
+# Largest quantity per order line, by category
+MAX_QUANTITY = {
+    'Electronics': 3, 'Home & Garden': 3,
+    'Clothing': 5, 'Sports': 5
+}
+DEFAULT_MAX_QUANTITY = 10
+
+# Price multipliers; full price 70% of the time
+DISCOUNTS = np.array([1.0, 1.0, 1.0, 0.9, 0.85, 0.8])
+
+FIRST_NAMES = ['John', 'Jane', 'Michael', 'Sarah', 'David', 'Emily', 'Robert', 'Lisa', 'James', 'Mary',
+               'William', 'Patricia', 'Richard', 'Jennifer', 'Thomas', 'Linda', 'Charles', 'Barbara',
+               'Daniel', 'Susan', 'Matthew', 'Jessica', 'Anthony', 'Karen', 'Mark', 'Nancy']
+
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+              'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor',
+              'Moore', 'Jackson', 'Martin', 'Lee', 'Thompson', 'White', 'Harris', 'Clark']
+
+# Independent random streams, so each table (and each order chunk) can be
+# generated on its own without changing the others
+_PRODUCT_STREAM, _CUSTOMER_STREAM, _ORDER_STREAM, _DATE_STREAM = 0, 1, 2, 3
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    """
+    Size and shape of the generated data
+    
+    Attributes:
+        scale: Scale factor; 1.0 = 1M orders and 50K customers
+        seed: Random seed; the same seed and end date give the same data
+        days: Length of the order history in days
+        end_date: Last order date
+        chunk_size: Orders generated and copied per chunk
+        product_skew: Zipf exponent of product popularity
+        customer_skew: Zipf exponent of customer activity
+    """
+    scale: float = 0.002
+    seed: int = 42
+    days: int = 365
+    end_date: date = field(default_factory=date.today)
+    chunk_size: int = 250_000
+    product_skew: float = 1.1
+    customer_skew: float = 0.7
+    
+    @property
+    def num_orders(self) -> int:
+        return max(1, int(self.scale * ORDERS_PER_SCALE))
+    
+    @property
+    def num_customers(self) -> int:
+        return max(MIN_CUSTOMERS, int(self.scale * CUSTOMERS_PER_SCALE))
+    
+    @property
+    def num_chunks(self) -> int:
+        return -(-self.num_orders // self.chunk_size)
+
+
+def _rng(config: GeneratorConfig, stream: int, index: int = 0) -> np.random.Generator:
+    """Random generator for one stream (and chunk) of a seed"""
+    return np.random.default_rng([config.seed, stream, index])
+
+
+def _zipf_weights(n: int, skew: float, rng: np.random.Generator) -> np.ndarray:
+    """Zipf popularity weights over n items, in a seeded random order"""
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    weights = weights[rng.permutation(n)]
+    return weights / weights.sum()
+
+
+def day_weights(config: GeneratorConfig) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Order dates and their relative order volume
+    
+    Volume grows through the period, peaks in the November-December holiday
+    season, dips in late summer, and is higher on weekends.
+    
+    Returns:
+        Tuple of (dates as datetime64[D], probabilities)
+    """
+    end = np.datetime64(config.end_date, "D")
+    dates = np.arange(end - config.days + 1, end + 1, dtype="datetime64[D]")
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype(int)
+    weekday = (dates.astype(int) + 3) % 7  # 0 = Monday
+    
+    trend = 1.0 + 0.3 * np.linspace(0.0, 1.0, len(dates))
+    season = 1.0 + 0.15 * np.cos(2 * np.pi * (day_of_year - 345) / 365.25)
+    holidays = np.where(day_of_year >= 323, 1.5, 1.0)
+    weekend = np.where(weekday >= 5, 1.2, 1.0)
+    
+    weights = trend * season * holidays * weekend
+    return dates, weights / weights.sum()
+
+
+@lru_cache(maxsize=4)
+def generate_products(config: GeneratorConfig) -> pd.DataFrame:
+    """Product catalog: 2-3 variants of every product name"""
+    rng = _rng(config, _PRODUCT_STREAM)
+    names, categories = [], []
+    for category in CATEGORIES:
+        for product_name in PRODUCT_NAMES[category]:
+            for variant in range(rng.integers(2, 4)):
+                names.append(product_name if variant == 0 else f"{product_name} - {VARIANTS[variant]}")
+                categories.append(category)
+    
+    return pd.DataFrame({
+        "product_id": np.arange(1, len(names) + 1),
+        "product_name": names,
+        "category": categories,
+        "price": np.round(rng.uniform(10, 500, len(names)), 2)
+    })
+
+
+def generate_customers(config: GeneratorConfig) -> pd.DataFrame:
+    """Customers with random names, unevenly spread over regions"""
+    rng = _rng(config, _CUSTOMER_STREAM)
+    n = config.num_customers
+    first = np.array(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), n)]
+    last = np.array(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), n)]
+    return pd.DataFrame({
+        "customer_id": np.arange(1, n + 1),
+        "customer_name": np.char.add(np.char.add(first, " "), last),
+        "region": np.array(REGIONS)[rng.choice(len(REGIONS), n, p=REGION_WEIGHTS)]
+    })
+
+
+@lru_cache(maxsize=4)
+def _popularity(config: GeneratorConfig, num_products: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Product and customer weights, derived from the seed alone (not the chunk)"""
+    rng = _rng(config, _ORDER_STREAM)
+    return (
+        _zipf_weights(num_products, config.product_skew, rng),
+        _zipf_weights(config.num_customers, config.customer_skew, rng)
+    )
+
+
+@lru_cache(maxsize=4)
+def _orders_per_day(config: GeneratorConfig) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Number of orders on each day, as cumulative counts
+    
+    Order ids are assigned in date order (like a live system appending
+    orders), so any chunk can look up the dates of its id range.
+    
+    Returns:
+        Tuple of (dates, cumulative order count at the end of each date)
+    """
+    dates, weights = day_weights(config)
+    counts = _rng(config, _DATE_STREAM).multinomial(config.num_orders, weights)
+    return dates, np.cumsum(counts)
+
+
+def generate_orders(
+    config: GeneratorConfig,
+    chunk_index: int,
+    products: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Generate one chunk of orders
+    
+    Each chunk has its own random stream and id range, so chunks can be
+    generated in any order, in parallel, with identical results. Order ids
+    increase with order date.
+    
+    Args:
+        config: Generator configuration
+        chunk_index: Chunk number (0-based)
+        products: Product catalog from generate_products
+    
+    Returns:
+        Orders with the columns of the orders table
+    """
+    start = chunk_index * config.chunk_size
+    size = min(config.chunk_size, config.num_orders - start)
+    product_weights, customer_weights = _popularity(config, len(products))
+    dates, day_ends = _orders_per_day(config)
+    order_dates = dates[np.searchsorted(day_ends, np.arange(start, start + size), side="right")]
+    
+    rng = _rng(config, _ORDER_STREAM, chunk_index + 1)
+    product_index = rng.choice(len(products), size, p=product_weights)
+    customer_ids = rng.choice(config.num_customers, size, p=customer_weights) + 1
+    
+    max_quantity = products["category"].map(MAX_QUANTITY).fillna(DEFAULT_MAX_QUANTITY).to_numpy(dtype=np.int64)
+    quantity = rng.integers(1, max_quantity[product_index] + 1)
+    discount = DISCOUNTS[rng.integers(0, len(DISCOUNTS), size)]
+    prices = products["price"].to_numpy()
+    
+    return pd.DataFrame({
+        "order_id": np.arange(start + 1, start + size + 1),
+        "customer_id": customer_ids,
+        "product_id": products["product_id"].to_numpy()[product_index],
+        "order_date": order_dates,
+        "quantity": quantity,
+        "revenue": np.round(prices[product_index] * quantity * discount, 2)
+    })
+
+
+def copy_frame(connection, table: str, frame: pd.DataFrame) -> None:
+    """
+    Load a data frame into a table with COPY ... FROM STDIN
+    
+    Args:
+        connection: Raw DB-API (psycopg2) connection
+        table: Target table name
+        frame: Rows to load, columns named after the table columns
+    """
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, float_format="%.2f")
+    buffer.seek(0)
+    columns = ", ".join(frame.columns)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _load_order_chunk(database_url: str, config: GeneratorConfig, chunk_index: int) -> int:
+    """Worker: generate one chunk of orders and COPY it (own connection)"""
+    engine = create_engine(database_url, poolclass=NullPool)
+    connection = engine.raw_connection()
+    try:
+        orders = generate_orders(config, chunk_index, generate_products(config))
+        copy_frame(connection, "orders", orders)
+        connection.commit()
+        return len(orders)
+    finally:
+        connection.close()
+        engine.dispose()
+
+
+def _drop_keys_and_indexes(connection, table: str) -> List[str]:
+    """
+    Drop a table's constraints and secondary indexes
+    
+    Returns:
+        Statements that re-create them (primary key first, indexes last)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass ORDER BY contype = 'p' DESC, conname",
+            (table,)
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) FROM pg_index i "
+            "WHERE indrelid = %s::regclass "
+            "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)",
+            (table,)
+        )
+        indexes = cursor.fetchall()
+        
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {name}")
+        for name, _ in constraints:
+            cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+    connection.commit()
+    
+    return [
+        f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'
+        for name, definition in constraints
+    ] + [definition for _, definition in indexes]
+
+
+def load_sample_data(engine: Engine, config: GeneratorConfig, workers: int = 4) -> Dict[str, int]:
+    """
+    Generate and load products, customers and orders into empty tables
+    
+    Orders are generated and copied by a pool of worker processes, one
+    chunk at a time. The orders table's keys and indexes are dropped during
+    the load and rebuilt afterwards (also when a chunk fails), which is much
+    faster than maintaining them per row.
+    
+    Args:
+        engine: Sync engine (psycopg2) of the target database
+        config: Generator configuration
+        workers: Number of loader processes
+    
+    Returns:
+        Dict of table name to rows loaded
+    """
+    database_url = engine.url.render_as_string(hide_password=False)
+    connection = engine.raw_connection()
+    try:
+        products = generate_products(config)
+        customers = generate_customers(config)
+        copy_frame(connection, "products", products)
+        copy_frame(connection, "customers", customers)
+        connection.commit()
+        print(f"✓ Created {len(products)} products and {len(customers):,} customers")
+        
+        restore_statements = _drop_keys_and_indexes(connection, "orders")
+        start = time.perf_counter()
+        loaded = 0
+        try:
+            with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+                futures = [
+                    pool.submit(_load_order_chunk, database_url, config, index)
+                    for index in range(config.num_chunks)
+                ]
+                try:
+                    for future in as_completed(futures):
+                        loaded += future.result()
+                        elapsed = time.perf_counter() - start
+                        print(
+                            f"  {loaded:,}/{config.num_orders:,} orders "
+                            f"({loaded / max(elapsed, 1e-9):,.0f} rows/s)",
+                            end="\r",
+                            flush=True
+                        )
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            print()
+        finally:
+            # Also after a failed chunk: orders must not be left without its
+            # primary key, foreign keys and indexes
+            print("Rebuilding orders keys and indexes...")
+            connection.rollback()
+            with connection.cursor() as cursor:
+                for statement in restore_statements:
+                    cursor.execute(statement)
+                for table, column in (("products", "product_id"), ("customers", "customer_id"), ("orders", "order_id")):
+                    cursor.execute(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                        f"(SELECT coalesce(max({column}), 1) FROM {table}))"
+                    )
+            connection.commit()
+        
+        # Fresh planner statistics (also read by schema introspection)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE products, customers, orders")
+        connection.commit()
+        print(f"✓ Created {loaded:,} orders over {config.days} days in {time.perf_counter() - start:.1f}s")
+    finally:
+        connection.close()
+    
+    return {"products": len(products), "customers": len(customers), "orders": loaded}
@@ -1,5 +1,5 @@
 """Database models for sample sales data"""
-from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, Numeric, ForeignKey, Index, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -17,6 +17,11 @@ class Product(Base):
     
     # Relationship
     orders = relationship("Order", back_populates="product")
+    
+    __table_args__ = (
+        # Category filters and groupings resolve to product ids without a heap visit
+        Index("ix_products_category", "category", postgresql_include=["product_id"]),
+    )
 
 
 class Customer(Base):
@@ -29,6 +34,11 @@ class Customer(Base):
     
     # Relationship
     orders = relationship("Order", back_populates="customer")
+    
+    __table_args__ = (
+        # Region filters and groupings resolve to customer ids without a heap visit
+        Index("ix_customers_region", "region", postgresql_include=["customer_id"]),
+    )
 
 
 class Order(Base):
@@ -45,3 +55,66 @@ class Order(Base):
     # Relationships
     customer = relationship("Customer", back_populates="orders")
     product = relationship("Product", back_populates="orders")
+    
+    __table_args__ = (
+        # Orders are appended in date order, so a BRIN index prunes date
+        # ranges at a tiny fraction of a btree's size
+        Index("ix_orders_order_date_brin", "order_date", postgresql_using="brin"),
+        # Covering indexes for the join + group patterns: orders joined to
+        # products or customers, optionally date-filtered, summing measures
+        Index(
+            "ix_orders_product_date",
+            "product_id", "order_date",
+            postgresql_include=["quantity", "revenue"]
+        ),
+        Index(
+            "ix_orders_customer_date",
+            "customer_id", "order_date",
+            postgresql_include=["quantity", "revenue"]
+        ),
+    )
+
+
+class OrderDailyRollup(Base):
+    """Orders aggregated per day, product and customer region"""
+    __tablename__ = "orders_daily_rollup"
+    
+    order_date = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    region = Column(String(100), primary_key=True)
+    product_name = Column(String(255), nullable=False)
+    category = Column(String(100), nullable=False)
+    order_count = Column(BigInteger, nullable=False)
+    quantity = Column(BigInteger, nullable=False)
+    revenue = Column(Numeric(18, 2), nullable=False)
+
+
+class OrderMonthlyRollup(Base):
+    """Orders aggregated per month (first day), product category and customer region"""
+    __tablename__ = "orders_monthly_rollup"
+    
+    month_start = Column(Date, primary_key=True)
+    category = Column(String(100), primary_key=True)
+    region = Column(String(100), primary_key=True)
+    order_count = Column(BigInteger, nullable=False)
+    quantity = Column(BigInteger, nullable=False)
+    revenue = Column(Numeric(18, 2), nullable=False)
+
+
+class RollupState(Base):
+    """Refresh watermark of the rollup tables"""
+    __tablename__ = "rollup_state"
+    
+    name = Column(String(100), primary_key=True)
+    last_order_id = Column(BigInteger, nullable=False)
+    source_changes = Column(BigInteger, nullable=False)
+    source_modifications = Column(BigInteger, nullable=False)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# Tables maintained by the application, hidden from schema introspection
+INTERNAL_TABLES = frozenset({
+    OrderDailyRollup.__tablename__,
+    OrderMonthlyRollup.__tablename__,
+    RollupState.__tablename__,
+})
@@ -0,0 +1,152 @@
+"""Vectorized per-column profiling of query results"""
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+import numpy as np
+import re
+
+if TYPE_CHECKING:
+    from app.db.query_result import QueryResult
+
+
+NUMERIC_KINDS = ("integer", "decimal", "float")
+DATE_KINDS = ("date", "datetime")
+
+# Numeric columns whose names mark them as time buckets rather than measures
+TIME_BUCKET_NAMES = re.compile(r"^(year|quarter|month|week|day|hour|date|period)(_\w+)?$|_(year|quarter|month|week|day|date)$")
+
+# Numeric columns whose names mark them as identifiers rather than measures
+IDENTIFIER_NAMES = re.compile(r"(^id$|_id$)")
+
+
+@dataclass
+class ColumnProfile:
+    """Statistics for one result column"""
+    name: str
+    kind: str
+    count: int
+    null_count: int
+    distinct_count: int
+    min: Any = None
+    max: Any = None
+    mean: Optional[float] = None
+    sum: Optional[float] = None
+    std: Optional[float] = None
+    quantiles: Dict[str, float] = field(default_factory=dict)
+    span_days: Optional[float] = None
+    
+    @property
+    def is_numeric(self) -> bool:
+        return self.kind in NUMERIC_KINDS
+    
+    @property
+    def is_temporal(self) -> bool:
+        return self.kind in DATE_KINDS
+    
+    @property
+    def is_categorical(self) -> bool:
+        return self.kind in ("string", "boolean")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly representation"""
+        profile = asdict(self)
+        if self.is_temporal:
+            profile["min"] = str(self.min) if self.min is not None else None
+            profile["max"] = str(self.max) if self.max is not None else None
+        return profile
+
+
+def profile_column(result: "QueryResult", name: str) -> ColumnProfile:
+    """
+    Profile a single column with vectorized NumPy operations
+    
+    Args:
+        result: Query results
+        name: Column name
+    
+    Returns:
+        ColumnProfile for the column
+    """
+    kind = result.column_kind(name)
+    array = result.array(name)
+    count = len(array)
+    
+    if kind in NUMERIC_KINDS or kind == "boolean":
+        values = array.astype(np.float64)
+        valid = values[~np.isnan(values)]
+        profile = ColumnProfile(
+            name=name,
+            kind=kind,
+            count=count,
+            null_count=count - len(valid),
+            distinct_count=len(np.unique(valid))
+        )
+        if len(valid) and kind != "boolean":
+            q25, q50, q75 = np.quantile(valid, [0.25, 0.5, 0.75])
+            profile.min = float(valid.min())
+            profile.max = float(valid.max())
+            profile.sum = float(valid.sum())
+            profile.mean = profile.sum / len(valid)
+            profile.std = float(valid.std())
+            profile.quantiles = {"p25": float(q25), "p50": float(q50), "p75": float(q75)}
+        return profile
+    
+    if kind in DATE_KINDS:
+        valid = array[~np.isnat(array)]
+        profile = ColumnProfile(
+            name=name,
+            kind=kind,
+            count=count,
+            null_count=count - len(valid),
+            distinct_count=len(np.unique(valid.view(np.int64)))
+        )
+        if len(valid):
+            low, high = valid.min(), valid.max()
+            profile.min = low.item()
+            profile.max = high.item()
+            profile.span_days = float((high - low) / np.timedelta64(1, "D"))
+        return profile
+    
+    values = [v for v in result.column(name) if v is not None]
+    return ColumnProfile(
+        name=name,
+        kind=kind,
+        count=count,
+        null_count=count - len(values),
+        distinct_count=len(set(map(str, values)))
+    )
+
+
+def profile_result(result: "QueryResult") -> Dict[str, ColumnProfile]:
+    """Profile every column of a query result"""
+    return {name: profile_column(result, name) for name in result.columns}
+
+
+def numeric_columns(profiles: Dict[str, ColumnProfile]) -> List[str]:
+    """Names of numeric columns, in result order"""
+    return [name for name, p in profiles.items() if p.is_numeric]
+
+
+def classify_columns(
+    profiles: Dict[str, ColumnProfile]
+) -> Tuple[List[ColumnProfile], List[ColumnProfile], List[ColumnProfile]]:
+    """
+    Split columns into analytical roles
+    
+    Numeric columns named like time buckets (year, month, ...) count as
+    temporal and numeric identifiers (*_id) as categorical.
+    
+    Returns:
+        Tuple of (temporal, categorical, measures), each in result order
+    """
+    temporal: List[ColumnProfile] = []
+    categorical: List[ColumnProfile] = []
+    measures: List[ColumnProfile] = []
+    for profile in profiles.values():
+        name = profile.name.lower()
+        if profile.is_temporal or (profile.is_numeric and TIME_BUCKET_NAMES.search(name)):
+            temporal.append(profile)
+        elif profile.is_numeric and not IDENTIFIER_NAMES.search(name):
+            measures.append(profile)
+        elif profile.is_categorical or profile.is_numeric:
+            categorical.append(profile)
+    return temporal, categorical, measures
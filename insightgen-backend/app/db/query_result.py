@@ -0,0 +1,184 @@
+"""Columnar representation of SQL query results"""
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Sequence
+from app.db.profiler import ColumnProfile, profile_result
+import sys
+import numpy as np
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_NAT = np.iinfo(np.int64).min
+
+
+class QueryResult:
+    """
+    Query results stored column by column
+    
+    Holds the column names and one value list per column instead of one dict
+    per row, so key strings are not repeated for every row. Row-oriented
+    records are only materialized when a caller asks for them.
+    """
+    
+    def __init__(self, columns: Sequence[str], column_values: Sequence[Sequence[Any]]):
+        self.columns: List[str] = list(columns)
+        self.column_values: List[Sequence[Any]] = list(column_values)
+        self._num_rows = len(self.column_values[0]) if self.column_values else 0
+        self._arrays: Dict[str, Any] = {}
+        self._kinds: Dict[str, str] = {}
+        self._profile: Optional[Dict[str, ColumnProfile]] = None
+    
+    @classmethod
+    def from_rows(cls, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> "QueryResult":
+        """Build a result by transposing driver rows"""
+        if rows:
+            column_values = [list(values) for values in zip(*rows)]
+        else:
+            column_values = [[] for _ in columns]
+        return cls(columns, column_values)
+    
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "QueryResult":
+        """Build a result from a list of row dictionaries"""
+        if not records:
+            return cls([], [])
+        columns = list(records[0].keys())
+        return cls(columns, [[row.get(col) for row in records] for col in columns])
+    
+    def __len__(self) -> int:
+        return self._num_rows
+    
+    def __bool__(self) -> bool:
+        return self._num_rows > 0
+    
+    def column(self, name: str) -> Sequence[Any]:
+        """Return the values of a column"""
+        return self.column_values[self.columns.index(name)]
+    
+    def column_kind(self, name: str) -> str:
+        """
+        Return the logical type of a column
+        
+        One of: integer, decimal, float, boolean, date, datetime, string, null
+        """
+        if name not in self._kinds:
+            self._kinds[name] = _infer_kind(self.column(name))
+        return self._kinds[name]
+    
+    def is_numeric(self, name: str) -> bool:
+        """Check whether a column holds numbers (including Decimal)"""
+        return self.column_kind(name) in ("integer", "decimal", "float")
+    
+    def array(self, name: str):
+        """
+        Return a column as a typed NumPy array (cached)
+        
+        Numeric columns become float64 (int64 when integral and null-free)
+        with NaN for nulls, dates become datetime64, everything else object.
+        """
+        if name not in self._arrays:
+            values = self.column(name)
+            kind = self.column_kind(name)
+            if kind == "integer" and all(v is not None for v in values):
+                array = np.fromiter(values, dtype=np.int64, count=len(values))
+            elif kind in ("integer", "decimal", "float", "boolean"):
+                array = np.fromiter(
+                    (np.nan if v is None else float(v) for v in values),
+                    dtype=np.float64,
+                    count=len(values)
+                )
+            elif kind == "date":
+                # Day offsets from the epoch; the int64 minimum is NaT
+                array = np.fromiter(
+                    (_NAT if v is None else v.toordinal() - _EPOCH_ORDINAL for v in values),
+                    dtype=np.int64,
+                    count=len(values)
+                ).view("datetime64[D]")
+            elif kind == "datetime":
+                array = np.array(
+                    [np.datetime64("NaT") if v is None else _naive_utc(v) for v in values],
+                    dtype="datetime64[us]"
+                )
+            else:
+                array = np.array(values, dtype=object)
+            self._arrays[name] = array
+        return self._arrays[name]
+    
+    def profile(self) -> Dict[str, ColumnProfile]:
+        """
+        Return per-column statistics (computed once and shared by all stages)
+        """
+        if self._profile is None:
+            self._profile = profile_result(self)
+        return self._profile
+    
+    def slice(self, start: int, stop: Optional[int] = None) -> "QueryResult":
+        """Return a result holding a contiguous range of rows"""
+        return QueryResult(
+            self.columns,
+            [values[start:stop] for values in self.column_values]
+        )
+    
+    def take(self, indices: Sequence[int]) -> "QueryResult":
+        """Return a result holding the rows at the given positions"""
+        return QueryResult(
+            self.columns,
+            [[values[i] for i in indices] for values in self.column_values]
+        )
+    
+    def head(self, n: int) -> List[Dict[str, Any]]:
+        """Return the first n rows as records"""
+        return self.slice(0, n).to_records()
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Materialize rows as a list of dictionaries"""
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in zip(*self.column_values)]
+    
+    def to_columnar(self) -> Dict[str, Any]:
+        """Return the columnar wire format: column names plus value lists"""
+        return {
+            "columns": list(self.columns),
+            "values": {
+                name: list(values)
+                for name, values in zip(self.columns, self.column_values)
+            }
+        }
+    
+    def estimated_size(self) -> int:
+        """Estimate the memory footprint in bytes"""
+        size = sys.getsizeof(self.column_values)
+        for values in self.column_values:
+            size += sys.getsizeof(values)
+            sample = values[:100]
+            if sample:
+                size += sum(sys.getsizeof(v) for v in sample) * len(values) // len(sample)
+        return size
+
+
+def _infer_kind(values: Sequence[Any]) -> str:
+    """Infer a column's logical type from its first non-null value"""
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return "boolean"
+        if isinstance(value, int):
+            return "integer"
+        if isinstance(value, Decimal):
+            return "decimal"
+        if isinstance(value, float):
+            return "float"
+        if isinstance(value, datetime):
+            return "datetime"
+        if isinstance(value, date):
+            return "date"
+        return "string"
+    return "null"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Convert a timezone-aware datetime to naive UTC"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
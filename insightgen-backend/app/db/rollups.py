@@ -0,0 +1,157 @@
+"""
+Order rollups - pre-aggregated daily and monthly order totals
+
+orders_daily_rollup holds order counts and quantity/revenue sums per
+(order_date, product, customer region), orders_monthly_rollup per
+(month_start, category, region). app.services.aggregate_navigator rewrites
+matching queries onto them.
+
+The rollups are plain tables refreshed incrementally. A refresh finds the
+order dates of orders above the last refreshed id, less a trailing window of
+rescan_ids ids, and recomputes the rollup rows of those dates (and their
+months) from scratch. The window picks up orders that committed after an
+order with a higher id; an order committing more than rescan_ids ids late
+is only counted by the next full rebuild. Any update or delete on orders,
+products or customers (seen in pg_stat_user_tables) triggers a full rebuild.
+
+Rows are replaced with DELETE and INSERT in the refresh transaction, so
+queries keep reading the previous rows until it commits instead of waiting
+on a table lock.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from typing import Dict, Any, Optional
+from datetime import date
+import calendar
+
+
+ROLLUP_NAME = "orders"
+
+# Arbitrary key serializing concurrent refreshes (e.g. several workers)
+REFRESH_LOCK_KEY = 702_001
+
+SOURCE_CHANGES_SQL = text(
+    "SELECT coalesce(sum(n_tup_ins + n_tup_upd + n_tup_del), 0) AS changes, "
+    "coalesce(sum(n_tup_upd + n_tup_del), 0) AS modifications "
+    "FROM pg_stat_user_tables WHERE relname IN ('orders', 'products', 'customers')"
+)
+
+STATE_SQL = text(
+    "SELECT last_order_id, source_changes, source_modifications "
+    "FROM rollup_state WHERE name = :name"
+)
+
+# Recomputed per date range: refreshing the same range twice is harmless
+DAILY_DELETE_SQL = text(
+    "DELETE FROM orders_daily_rollup WHERE order_date BETWEEN :first AND :last"
+)
+
+DAILY_INSERT_SQL = text("""
+    INSERT INTO orders_daily_rollup
+        (order_date, product_id, region, product_name, category, order_count, quantity, revenue)
+    SELECT o.order_date, o.product_id, c.region, p.product_name, p.category,
+           COUNT(*), SUM(o.quantity), SUM(o.revenue)
+    FROM orders o
+    JOIN products p ON o.product_id = p.product_id
+    JOIN customers c ON o.customer_id = c.customer_id
+    WHERE o.order_date BETWEEN :first AND :last
+    GROUP BY o.order_date, o.product_id, c.region, p.product_name, p.category
+""")
+
+MONTHLY_DELETE_SQL = text(
+    "DELETE FROM orders_monthly_rollup WHERE month_start BETWEEN :month_first AND :month_last"
+)
+
+# Monthly totals are summed from the (already refreshed) daily rollup
+MONTHLY_INSERT_SQL = text("""
+    INSERT INTO orders_monthly_rollup
+        (month_start, category, region, order_count, quantity, revenue)
+    SELECT date_trunc('month', order_date)::date, category, region,
+           SUM(order_count), SUM(quantity), SUM(revenue)
+    FROM orders_daily_rollup
+    WHERE order_date BETWEEN :month_first AND :month_last
+    GROUP BY 1, category, region
+""")
+
+CHANGED_DATES_SQL = text(
+    "SELECT min(order_date) AS first, max(order_date) AS last "
+    "FROM orders WHERE order_id > :low AND order_id <= :high"
+)
+
+SAVE_STATE_SQL = text("""
+    INSERT INTO rollup_state
+        (name, last_order_id, source_changes, source_modifications, refreshed_at)
+    VALUES (:name, :last_order_id, :source_changes, :source_modifications, now())
+    ON CONFLICT (name) DO UPDATE SET
+        last_order_id = EXCLUDED.last_order_id,
+        source_changes = EXCLUDED.source_changes,
+        source_modifications = EXCLUDED.source_modifications,
+        refreshed_at = EXCLUDED.refreshed_at
+""")
+
+
+def _recompute(connection: Connection, first: date, last: date) -> None:
+    """Recompute the daily rollup rows from first to last and their months"""
+    month_last = last.replace(day=calendar.monthrange(last.year, last.month)[1])
+    dates = {"first": first, "last": last}
+    months = {"month_first": first.replace(day=1), "month_last": month_last}
+    connection.execute(DAILY_DELETE_SQL, dates)
+    connection.execute(DAILY_INSERT_SQL, dates)
+    connection.execute(MONTHLY_DELETE_SQL, months)
+    connection.execute(MONTHLY_INSERT_SQL, months)
+
+
+def refresh_rollups(
+    connection: Connection,
+    full: bool = False,
+    rescan_ids: int = 0
+) -> Optional[Dict[str, Any]]:
+    """
+    Bring the rollup tables up to date, inside the caller's transaction
+    
+    Args:
+        connection: Database connection with an open transaction
+        full: Rebuild from scratch even if an incremental refresh would do
+        rescan_ids: How many order ids below the last refreshed one to
+            re-scan for orders that committed late
+    
+    Returns:
+        Dict with the refresh mode ("full", "incremental" or "unchanged") and
+        the order id range, or None when another refresh holds the lock
+    """
+    locked = connection.execute(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+    ).scalar()
+    if not locked:
+        return None
+    
+    # Counters first: changes made while refreshing leave the state stale
+    source = connection.execute(SOURCE_CHANGES_SQL).one()
+    state = connection.execute(STATE_SQL, {"name": ROLLUP_NAME}).one_or_none()
+    high = connection.execute(text("SELECT coalesce(max(order_id), 0) FROM orders")).scalar()
+    
+    rebuild = (
+        full
+        or state is None
+        or int(source.modifications) != state.source_modifications
+        or high < state.last_order_id
+    )
+    if not rebuild and int(source.changes) == state.source_changes:
+        return {"mode": "unchanged", "low": high, "high": high}
+    if rebuild:
+        # Every row, including those of dates that no longer have orders
+        low = 0
+        _recompute(connection, date.min, date.max)
+    else:
+        low = max(state.last_order_id - rescan_ids, 0)
+        changed = connection.execute(CHANGED_DATES_SQL, {"low": low, "high": high}).one()
+        if changed.first is not None:
+            _recompute(connection, changed.first, changed.last)
+    
+    connection.execute(SAVE_STATE_SQL, {
+        "name": ROLLUP_NAME,
+        "last_order_id": high,
+        "source_changes": int(source.changes),
+        "source_modifications": int(source.modifications)
+    })
+    return {"mode": "full" if rebuild else "incremental", "low": low, "high": high}
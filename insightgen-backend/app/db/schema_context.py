@@ -0,0 +1,324 @@
+"""Question-aware schema context for SQL generation prompts"""
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Set, Tuple, FrozenSet
+from app.db.schema_loader import SCHEMA_METADATA
+import hashlib
+import json
+import re
+
+
+# Words that carry no meaning for SQL generation
+STOP_WORDS = {
+    'a', 'an', 'the', 'of', 'for', 'in', 'on', 'at', 'to', 'by', 'with', 'and',
+    'me', 'my', 'our', 'us', 'i', 'we', 'you', 'please', 'show', 'give', 'get',
+    'list', 'display', 'find', 'what', 'which', 'is', 'are', 'was', 'were',
+    'do', 'does', 'can', 'could', 'would', 'tell', 'about', 'all', 'each',
+    'per', 'from', 'that', 'this', 'these', 'those', 'there', 'be', 'how'
+}
+
+# Domain synonyms mapped onto schema terms
+SYNONYMS = {
+    'sales': 'revenue', 'sale': 'revenue', 'income': 'revenue',
+    'earnings': 'revenue', 'turnover': 'revenue', 'money': 'revenue',
+    'units': 'quantity', 'qty': 'quantity', 'volume': 'quantity',
+    'items': 'products', 'item': 'products', 'goods': 'products',
+    'clients': 'customers', 'client': 'customers', 'buyers': 'customers',
+    'purchases': 'orders', 'transactions': 'orders',
+    'sell': 'revenue', 'sells': 'revenue', 'selling': 'revenue', 'sold': 'revenue',
+    'categories': 'category', 'regions': 'region', 'area': 'region',
+    'areas': 'region', 'monthly': 'month', 'months': 'month',
+    'daily': 'day', 'days': 'day', 'weekly': 'week', 'weeks': 'week',
+    'yearly': 'year', 'years': 'year', 'annual': 'year',
+    'best': 'top', 'highest': 'top', 'most': 'top', 'largest': 'top',
+    'worst': 'bottom', 'lowest': 'bottom', 'least': 'bottom',
+    'trends': 'trend', 'trending': 'trend',
+    'average': 'avg', 'mean': 'avg', 'total': 'sum', 'totals': 'sum'
+}
+
+# Question terms that ask for a date/time column
+TIME_TERMS = {
+    'date', 'time', 'day', 'week', 'month', 'quarter', 'year', 'trend',
+    'when', 'recent', 'last', 'latest', 'since', 'over', 'growth', 'history'
+}
+
+# Column name parts too generic to select a column on their own
+GENERIC_TERMS = {'id', 'name', 'type', 'code'}
+
+TEMPORAL_TYPES = ('DATE', 'TIMESTAMP', 'TIME')
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9&]+")
+
+
+def schema_definitions(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Table and column definitions of schema metadata, without statistics
+    
+    Sample values, date ranges and column stats come from pg_stats and
+    change with every ANALYZE; generated SQL does not depend on them.
+    """
+    return {
+        "description": metadata.get("description", ""),
+        "tables": {
+            name: {
+                "description": table.get("description", ""),
+                "columns": {
+                    column_name: {key: value for key, value in column.items() if key != "stats"}
+                    for column_name, column in table.get("columns", {}).items()
+                }
+            }
+            for name, table in metadata.get("tables", {}).items()
+        }
+    }
+
+
+def _singular(term: str) -> str:
+    """Naive singular form of an English noun"""
+    if term.endswith('ies') and len(term) > 4:
+        return term[:-3] + 'y'
+    if term.endswith('s') and not term.endswith('ss') and len(term) > 3:
+        return term[:-1]
+    return term
+
+
+class SchemaContextBuilder:
+    """
+    Build a pruned, compact schema description for one question
+    
+    An index maps table names, column names (and their parts), sample values
+    and domain synonyms onto tables and columns. A question selects the
+    tables and columns it mentions; tables needed to join them are added by
+    following foreign keys. The selection is rendered as one DDL-like line
+    per table, and rendered table fragments are cached.
+    """
+    
+    def __init__(self, metadata: Dict[str, Any], max_cached_fragments: int = 512):
+        self.max_cached_fragments = max_cached_fragments
+        self.load(metadata)
+    
+    def load(self, metadata: Dict[str, Any]) -> None:
+        """(Re)index schema metadata and drop all cached fragments"""
+        self.metadata = metadata
+        self.tables: Dict[str, Dict[str, Any]] = metadata.get("tables", {})
+        # Statistics are left out: re-analyzing a table is not a schema change
+        self.schema_version = hashlib.sha256(
+            json.dumps(schema_definitions(metadata), sort_keys=True, default=str).encode()
+        ).hexdigest()
+        self._table_terms: Dict[str, Set[str]] = {}
+        self._column_terms: Dict[str, Set[Tuple[str, str]]] = {}
+        self._joins: Dict[str, Dict[str, Tuple[str, str]]] = {name: {} for name in self.tables}
+        self._fragments: "OrderedDict[Tuple[str, FrozenSet[str]], str]" = OrderedDict()
+        self._full_context: Optional[str] = None
+        
+        for table_name, table in self.tables.items():
+            for term in (table_name, _singular(table_name)):
+                self._table_terms.setdefault(term, set()).add(table_name)
+            
+            for column_name, column in table.get("columns", {}).items():
+                target = self._references(column)
+                terms = {column_name, column_name.replace('_', '')}
+                # Key columns are reached through joins, not through the
+                # entity name they embed (customer_id is not "customer")
+                if target is None and not self._is_primary_key(column_name, column):
+                    terms.update(
+                        part for part in column_name.split('_')
+                        if part not in GENERIC_TERMS
+                    )
+                if str(column.get("type", "")).upper().startswith(TEMPORAL_TYPES):
+                    terms.update(TIME_TERMS)
+                for term in terms:
+                    self._column_terms.setdefault(term, set()).add((table_name, column_name))
+                
+                if target is not None and target[0] in self.tables:
+                    ref_table, ref_column = target
+                    self._joins[table_name][ref_table] = (column_name, ref_column)
+                    self._joins.setdefault(ref_table, {})[table_name] = (ref_column, column_name)
+            
+            for column_name, values in table.get("sample_values", {}).items():
+                for value in values:
+                    for term in _TOKEN_PATTERN.findall(str(value).lower()):
+                        self._column_terms.setdefault(term, set()).add((table_name, column_name))
+    
+    def build(self, question: str) -> str:
+        """
+        Render the schema context relevant to a question
+        
+        Args:
+            question: Natural language question
+        
+        Returns:
+            Compact schema text; the whole schema when nothing matches
+        """
+        selection = self.select(question)
+        if not selection:
+            return self.full_context()
+        return self._render(selection)
+    
+    def full_context(self) -> str:
+        """Render every table and column (cached)"""
+        if self._full_context is None:
+            self._full_context = self._render({
+                name: set(table.get("columns", {}))
+                for name, table in self.tables.items()
+            })
+        return self._full_context
+    
+    def select(self, question: str) -> Dict[str, Set[str]]:
+        """
+        Pick the tables and columns a question needs
+        
+        Returns:
+            Dict of table name to selected column names (empty when the
+            question mentions nothing in the schema)
+        """
+        named_tables: Set[str] = set()
+        columns: Dict[str, Set[str]] = {}
+        for term in self._terms(question):
+            named_tables.update(self._table_terms.get(term, ()))
+            for table_name, column_name in self._column_terms.get(term, ()):
+                columns.setdefault(table_name, set()).add(column_name)
+        
+        # Time terms match every date column, so they only add columns to
+        # tables selected for another reason
+        mentioned = named_tables | {
+            table_name for table_name, cols in columns.items()
+            if any(not self._is_temporal(table_name, c) for c in cols)
+        }
+        if not mentioned:
+            return {}
+        
+        # Connect the mentioned tables through foreign keys
+        tables = self._join_path(sorted(mentioned))
+        
+        selection: Dict[str, Set[str]] = {}
+        for table_name in tables:
+            if table_name in named_tables:
+                selected = set(self.tables[table_name].get("columns", {}))
+            else:
+                selected = set(columns.get(table_name, ()))
+            selected.update(self._key_columns(table_name, tables))
+            selection[table_name] = selected
+        return selection
+    
+    def _terms(self, question: str) -> Set[str]:
+        """Normalize a question into index terms"""
+        terms = set()
+        for token in _TOKEN_PATTERN.findall(question.lower()):
+            if token in STOP_WORDS:
+                continue
+            token = SYNONYMS.get(token, token)
+            terms.add(token)
+            terms.add(_singular(token))
+        return terms
+    
+    def _is_temporal(self, table_name: str, column_name: str) -> bool:
+        """Check whether a column holds dates or timestamps"""
+        column = self.tables[table_name]["columns"][column_name]
+        return str(column.get("type", "")).upper().startswith(TEMPORAL_TYPES)
+    
+    def _key_columns(self, table_name: str, tables: Set[str]) -> Set[str]:
+        """Primary key columns, and join columns towards the other selected tables"""
+        keys = {
+            name for name, column in self.tables[table_name].get("columns", {}).items()
+            if self._is_primary_key(name, column)
+        }
+        keys.update(
+            column for other, (column, _) in self._joins.get(table_name, {}).items()
+            if other in tables
+        )
+        return keys
+    
+    def _join_path(self, tables: List[str]) -> Set[str]:
+        """Tables on the shortest foreign key paths connecting the given tables"""
+        if len(tables) < 2:
+            return set(tables)
+        
+        connected = {tables[0]}
+        for target in tables[1:]:
+            if target in connected:
+                continue
+            # Breadth-first search from the connected set to the target
+            previous: Dict[str, Optional[str]] = {table: None for table in connected}
+            queue = deque(connected)
+            while queue:
+                current = queue.popleft()
+                if current == target:
+                    break
+                for neighbour in self._joins.get(current, {}):
+                    if neighbour not in previous:
+                        previous[neighbour] = current
+                        queue.append(neighbour)
+            
+            if target not in previous:
+                connected.add(target)
+                continue
+            node: Optional[str] = target
+            while node is not None and node not in connected:
+                connected.add(node)
+                node = previous[node]
+        return connected
+    
+    def _render(self, selection: Dict[str, Set[str]]) -> str:
+        """Render a selection as a description line plus one line per table"""
+        lines = []
+        description = self.metadata.get("description")
+        if description:
+            lines.append(f"-- {description}")
+        for table_name in self.tables:
+            if table_name in selection:
+                lines.append(self._fragment(table_name, frozenset(selection[table_name])))
+        return "\n".join(lines)
+    
+    def _fragment(self, table_name: str, columns: FrozenSet[str]) -> str:
+        """Render (or fetch from cache) one table with the given columns"""
+        key = (table_name, columns)
+        fragment = self._fragments.get(key)
+        if fragment is not None:
+            self._fragments.move_to_end(key)
+            return fragment
+        
+        table = self.tables[table_name]
+        samples = table.get("sample_values", {})
+        date_ranges = table.get("date_ranges", {})
+        definitions = []
+        for column_name, column in table.get("columns", {}).items():
+            if column_name not in columns:
+                continue
+            definition = f"{column_name} {column.get('type', '')}".rstrip()
+            if self._is_primary_key(column_name, column):
+                definition += " PK"
+            target = self._references(column)
+            if target is not None:
+                definition += f" REFERENCES {target[0]}({target[1]})"
+            if column_name in samples:
+                definition += f" /* e.g. {', '.join(map(str, samples[column_name]))} */"
+            elif column_name in date_ranges:
+                low, high = date_ranges[column_name]
+                definition += f" /* {low} to {high} */"
+            definitions.append(definition)
+        
+        fragment = f"{table_name}({', '.join(definitions)})"
+        if table.get("description"):
+            fragment += f" -- {table['description']}"
+        
+        self._fragments[key] = fragment
+        if len(self._fragments) > self.max_cached_fragments:
+            self._fragments.popitem(last=False)
+        return fragment
+    
+    def _is_primary_key(self, column_name: str, column: Dict[str, Any]) -> bool:
+        """Check whether a column is (part of) its table's primary key"""
+        if "primary_key" in column:
+            return bool(column["primary_key"])
+        return "primary key" in column.get("description", "").lower()
+    
+    def _references(self, column: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """Return the (table, column) a foreign key column points to"""
+        reference = column.get("references")
+        if reference and "." in reference:
+            ref_table, ref_column = reference.split(".", 1)
+            return ref_table, ref_column
+        return None
+
+
+# Global instance
+schema_context_builder = SchemaContextBuilder(SCHEMA_METADATA)
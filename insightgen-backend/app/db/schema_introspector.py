@@ -0,0 +1,307 @@
+"""Live schema introspection with cached column statistics"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine.reflection import ObjectKind
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.config import settings
+from app.db.models import INTERNAL_TABLES
+from app.db.schema_loader import SCHEMA_METADATA
+from typing import Dict, Any, List, Optional, Tuple
+import copy
+import json
+import os
+import time
+
+
+CACHE_FORMAT_VERSION = 1
+
+# String columns with at most this many distinct values get sample values
+MAX_SAMPLE_DISTINCT = 50
+MAX_SAMPLE_VALUES = 10
+
+# One row per table: a hash of its definition and when it was last analyzed
+TABLE_SIGNATURES_SQL = text("""
+    SELECT
+        c.relname AS table_name,
+        md5(
+            string_agg(
+                a.attname || ' ' || format_type(a.atttypid, a.atttypmod) || ' '
+                    || a.attnotnull || ' ' || coalesce(col_description(c.oid, a.attnum), ''),
+                ',' ORDER BY a.attnum
+            )
+            || coalesce((
+                SELECT string_agg(pg_get_constraintdef(con.oid), ',' ORDER BY con.conname)
+                FROM pg_constraint con
+                WHERE con.conrelid = c.oid
+            ), '')
+            || coalesce(obj_description(c.oid, 'pg_class'), '')
+        ) AS definition,
+        greatest(s.last_analyze, s.last_autoanalyze)::text AS analyzed_at
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE n.nspname = :schema AND c.relkind IN ('r', 'p', 'v', 'm')
+    GROUP BY c.oid, c.relname, s.last_analyze, s.last_autoanalyze
+""")
+
+# Planner statistics for a set of tables (arrays converted to JSON text)
+COLUMN_STATS_SQL = text("""
+    SELECT
+        tablename AS table_name,
+        attname AS column_name,
+        null_frac,
+        n_distinct,
+        array_to_json(most_common_vals::text::text[])::text AS common_values,
+        array_to_json(histogram_bounds::text::text[])::text AS histogram
+    FROM pg_stats
+    WHERE schemaname = :schema AND tablename = ANY(:tables)
+""")
+
+
+def _is_text_type(type_name: str) -> bool:
+    """Check whether a SQL type name is a character type"""
+    return any(marker in type_name.upper() for marker in ("CHAR", "TEXT"))
+
+
+def _is_temporal_type(type_name: str) -> bool:
+    """Check whether a SQL type name is a date or timestamp type"""
+    return type_name.upper().startswith(("DATE", "TIMESTAMP"))
+
+
+class SchemaIntrospector:
+    """
+    Build schema metadata from the live database
+    
+    Tables, columns, types, keys and comments come from the SQLAlchemy
+    inspector's batched reflection (one query per kind of object, not per
+    table); common values, distinct counts and date ranges come from
+    pg_stats. Results are cached in memory and on disk together with a
+    per-table signature (definition hash + last analyze time), so a refresh
+    only re-reads the tables whose definition or statistics changed.
+    
+    The metadata has the same shape as the static SCHEMA_METADATA, whose
+    descriptions are used where the database has no comments.
+    """
+    
+    def __init__(
+        self,
+        schema: str = "public",
+        cache_path: Optional[str] = None,
+        static_metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.schema = schema
+        self.cache_path = cache_path
+        self.static_metadata = static_metadata or SCHEMA_METADATA
+        self.metadata: Optional[Dict[str, Any]] = None
+        self.refreshed_at: Optional[float] = None
+        self._signatures: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._tables: Dict[str, Dict[str, Any]] = {}
+        self._cache_checked = False
+    
+    async def refresh(self, engine: AsyncEngine) -> bool:
+        """
+        Bring the cached metadata up to date with the database
+        
+        Args:
+            engine: Async database engine
+        
+        Returns:
+            True if the metadata changed (including the first load)
+        """
+        previous = self.metadata
+        if previous is None and not self._cache_checked:
+            self.load_cached()
+            previous = self.metadata
+        
+        async with engine.connect() as conn:
+            result = await conn.execute(TABLE_SIGNATURES_SQL, {"schema": self.schema})
+            signatures = {
+                row.table_name: (row.definition, row.analyzed_at)
+                for row in result
+                if not row.table_name.startswith("alembic_") and row.table_name not in INTERNAL_TABLES
+            }
+            
+            redefined = [
+                name for name, (definition, _) in signatures.items()
+                if name not in self._signatures or self._signatures[name][0] != definition
+            ]
+            reanalyzed = [
+                name for name, (_, analyzed_at) in signatures.items()
+                if name not in redefined and self._signatures[name][1] != analyzed_at
+            ]
+            removed = [name for name in self._signatures if name not in signatures]
+            
+            if redefined:
+                reflected = await conn.run_sync(self._reflect, redefined)
+                self._tables.update(reflected)
+            if redefined or reanalyzed:
+                await self._apply_stats(conn, redefined + reanalyzed)
+        
+        for name in removed:
+            self._tables.pop(name, None)
+        self._signatures = signatures
+        self.refreshed_at = time.time()
+        
+        changed = bool(redefined or reanalyzed or removed)
+        if changed or self.metadata is None:
+            self.metadata = self._build_metadata()
+        if changed:
+            self._save_cache()
+        return self.metadata is not previous
+    
+    def _reflect(self, conn: Connection, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Reflect columns, keys and comments of the given tables in bulk"""
+        inspector = inspect(conn)
+        options = {"schema": self.schema, "filter_names": names, "kind": ObjectKind.ANY}
+        columns = inspector.get_multi_columns(**options)
+        primary_keys = inspector.get_multi_pk_constraint(**options)
+        foreign_keys = inspector.get_multi_foreign_keys(**options)
+        try:
+            comments = inspector.get_multi_table_comment(**options)
+        except NotImplementedError:
+            comments = {}
+        
+        tables: Dict[str, Dict[str, Any]] = {}
+        for key, table_columns in columns.items():
+            table_name = key[1]
+            static = self.static_metadata.get("tables", {}).get(table_name, {})
+            static_columns = static.get("columns", {})
+            pk_columns = set(
+                (primary_keys.get(key) or {}).get("constrained_columns") or []
+            )
+            references = {}
+            for fk in foreign_keys.get(key, []):
+                for local, remote in zip(fk["constrained_columns"], fk["referred_columns"]):
+                    references[local] = f"{fk['referred_table']}.{remote}"
+            
+            table_meta: Dict[str, Any] = {
+                "description": (comments.get(key) or {}).get("text")
+                    or static.get("description", ""),
+                "columns": {}
+            }
+            for column in table_columns:
+                name = column["name"]
+                try:
+                    type_name = column["type"].compile(dialect=conn.dialect)
+                except Exception:
+                    type_name = str(column["type"])
+                column_meta: Dict[str, Any] = {
+                    "type": type_name,
+                    "description": column.get("comment")
+                        or static_columns.get(name, {}).get("description", "")
+                }
+                if name in pk_columns:
+                    column_meta["primary_key"] = True
+                if name in references:
+                    column_meta["references"] = references[name]
+                if not column.get("nullable", True):
+                    column_meta["nullable"] = False
+                table_meta["columns"][name] = column_meta
+            tables[table_name] = table_meta
+        return tables
+    
+    async def _apply_stats(self, conn, names: List[str]) -> None:
+        """Read pg_stats for the given tables into their column metadata"""
+        for name in names:
+            table = self._tables.get(name)
+            if table is not None:
+                table["sample_values"] = {}
+                table["date_ranges"] = {}
+        
+        result = await conn.execute(COLUMN_STATS_SQL, {"schema": self.schema, "tables": names})
+        for row in result:
+            table = self._tables.get(row.table_name)
+            column = table["columns"].get(row.column_name) if table else None
+            if column is None:
+                continue
+            
+            common_values = json.loads(row.common_values) if row.common_values else []
+            histogram = json.loads(row.histogram) if row.histogram else []
+            column["stats"] = {
+                "null_frac": float(row.null_frac),
+                "n_distinct": float(row.n_distinct)
+            }
+            
+            # Positive n_distinct is a count; negative is a fraction of rows
+            distinct = row.n_distinct
+            if (
+                _is_text_type(column["type"])
+                and common_values
+                and 0 < distinct <= MAX_SAMPLE_DISTINCT
+            ):
+                table["sample_values"][row.column_name] = common_values[:MAX_SAMPLE_VALUES]
+            
+            if _is_temporal_type(column["type"]):
+                bounds = [v for v in histogram + common_values if v is not None]
+                if bounds:
+                    table["date_ranges"][row.column_name] = [min(bounds), max(bounds)]
+    
+    def _build_metadata(self) -> Dict[str, Any]:
+        """Assemble metadata in the SCHEMA_METADATA shape"""
+        tables = {}
+        for name in sorted(self._tables):
+            # Deep copy: _apply_stats rewrites self._tables in place, and
+            # the metadata handed out may already be in use
+            table = copy.deepcopy(self._tables[name])
+            for key in ("sample_values", "date_ranges"):
+                if not table.get(key):
+                    table.pop(key, None)
+            tables[name] = table
+        return {
+            "database": self.static_metadata.get("database", ""),
+            "description": self.static_metadata.get("description", ""),
+            "tables": tables
+        }
+    
+    def load_cached(self) -> bool:
+        """
+        Load previously introspected metadata from the disk cache
+        
+        Returns:
+            True if cached metadata was found
+        """
+        self._cache_checked = True
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            if cached.get("format") != CACHE_FORMAT_VERSION or cached.get("schema") != self.schema:
+                return False
+            self._tables = cached["tables"]
+            self._signatures = {
+                name: tuple(signature) for name, signature in cached["signatures"].items()
+            }
+        except Exception as e:
+            print(f"Ignoring unreadable schema cache {self.cache_path}: {e}")
+            self._tables, self._signatures = {}, {}
+            return False
+        
+        self.metadata = self._build_metadata()
+        return True
+    
+    def _save_cache(self) -> None:
+        """Write introspected tables and signatures to disk"""
+        if not self.cache_path:
+            return
+        payload = {
+            "format": CACHE_FORMAT_VERSION,
+            "schema": self.schema,
+            "signatures": self._signatures,
+            "tables": self._tables
+        }
+        try:
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(payload, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write schema cache {self.cache_path}: {e}")
+
+
+# Global instance
+schema_introspector = SchemaIntrospector(
+    schema=settings.SCHEMA_NAME,
+    cache_path=settings.SCHEMA_CACHE_PATH
+)
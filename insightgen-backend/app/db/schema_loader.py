@@ -1,5 +1,6 @@
 """Schema metadata loader for LLM context"""
 import json
+from functools import lru_cache
 from typing import Dict, Any
 
 
@@ -13,7 +14,8 @@ SCHEMA_METADATA = {
             "columns": {
                 "product_id": {
                     "type": "INTEGER",
-                    "description": "Unique product identifier (primary key)"
+                    "description": "Unique product identifier (primary key)",
+                    "primary_key": True
                 },
                 "product_name": {
                     "type": "VARCHAR(255)",
@@ -37,7 +39,8 @@ SCHEMA_METADATA = {
             "columns": {
                 "customer_id": {
                     "type": "INTEGER",
-                    "description": "Unique customer identifier (primary key)"
+                    "description": "Unique customer identifier (primary key)",
+                    "primary_key": True
                 },
                 "customer_name": {
                     "type": "VARCHAR(255)",
@@ -57,15 +60,18 @@ SCHEMA_METADATA = {
             "columns": {
                 "order_id": {
                     "type": "INTEGER",
-                    "description": "Unique order identifier (primary key)"
+                    "description": "Unique order identifier (primary key)",
+                    "primary_key": True
                 },
                 "customer_id": {
                     "type": "INTEGER",
-                    "description": "Foreign key reference to customers table"
+                    "description": "Foreign key reference to customers table",
+                    "references": "customers.customer_id"
                 },
                 "product_id": {
                     "type": "INTEGER",
-                    "description": "Foreign key reference to products table"
+                    "description": "Foreign key reference to products table",
+                    "references": "products.product_id"
                 },
                 "order_date": {
                     "type": "DATE",
@@ -99,19 +105,36 @@ SCHEMA_METADATA = {
 }
 
 
+# Metadata in use: the static schema until live introspection replaces it
+_current_metadata: Dict[str, Any] = SCHEMA_METADATA
+
+
+def get_schema_metadata() -> Dict[str, Any]:
+    """Get the schema metadata currently in use"""
+    return _current_metadata
+
+
+def set_schema_metadata(metadata: Dict[str, Any]) -> None:
+    """Replace the schema metadata (e.g. with introspected metadata)"""
+    global _current_metadata
+    _current_metadata = metadata
+    get_schema_context.cache_clear()
+
+
+@lru_cache(maxsize=1)
 def get_schema_context() -> str:
     """
     Get formatted schema context for LLM prompts
-    Returns a string representation of the database schema
+    Returns a string representation of the database schema (rendered once)
     """
-    return json.dumps(SCHEMA_METADATA, indent=2)
+    return json.dumps(_current_metadata, indent=2)
 
 
 def get_table_info(table_name: str) -> Dict[str, Any]:
     """Get information about a specific table"""
-    return SCHEMA_METADATA["tables"].get(table_name, {})
+    return _current_metadata["tables"].get(table_name, {})
 
 
 def get_all_tables() -> list:
     """Get list of all available tables"""
-    return list(SCHEMA_METADATA["tables"].keys())
+    return list(_current_metadata["tables"].keys())
@@ -2,5 +2,6 @@
 from app.llm.sql_generator import sql_generator
 from app.llm.viz_generator import viz_generator
 from app.llm.insight_generator import insight_generator
+from app.llm.analysis_generator import analysis_generator
 
-__all__ = ["sql_generator", "viz_generator", "insight_generator"]
+__all__ = ["sql_generator", "viz_generator", "insight_generator", "analysis_generator"]
@@ -0,0 +1,106 @@
+"""Combined visualization + insight generation in a single Gemini call"""
+from app.config import settings
+from app.llm.prompt_templates import COMBINED_ANALYSIS_PROMPT
+from app.db.query_result import QueryResult
+from app.llm.viz_rules import viz_rules
+from app.llm.viz_generator import viz_generator
+from app.llm.insight_generator import insight_generator
+from app.llm.client import llm_client
+import asyncio
+import json
+from typing import Dict, Any, List, Tuple
+
+
+class AnalysisGenerator:
+    """
+    Generate the chart config and insights with one LLM round trip
+    
+    The visualization and insight prompts carry nearly the same context
+    (SQL, data preview, columns); this sends it once and asks for both
+    answers in one JSON object. When the rule engine already decides the
+    chart, only the insights are requested. If the combined response can't
+    be parsed, the regular two-call path is used.
+    """
+    
+    def __init__(self):
+        self.client = llm_client
+    
+    async def generate_analysis(
+        self, 
+        user_question: str, 
+        sql_query: str, 
+        data: QueryResult
+    ) -> Tuple[Dict[str, Any], Tuple[List[str], str]]:
+        """
+        Generate visualization config and insights together
+        
+        Args:
+            user_question: Original user question
+            sql_query: SQL query that was executed
+            data: Query results
+        
+        Returns:
+            Tuple of (viz_config, (insights, insight_source)) in the shapes
+            returned by VizGenerator and InsightGenerator
+        """
+        if not data:
+            return (
+                viz_generator.default_config(),
+                (["No data available to generate insights."], "statistical")
+            )
+        
+        # Rules decide obvious charts; then only the insights need the LLM
+        if settings.VIZ_RULES_ENABLED:
+            config = viz_rules.infer(data.profile(), len(data))
+            if config is not None:
+                config["source"] = "rules"
+                insights = await insight_generator.generate_insights_with_source(
+                    user_question,
+                    sql_query,
+                    data
+                )
+                return config, insights
+        
+        # Format prompt
+        prompt = COMBINED_ANALYSIS_PROMPT.format(
+            user_question=user_question,
+            sql_query=sql_query,
+            column_names=", ".join(viz_generator.describe_columns(data)),
+            data_summary=insight_generator.create_data_summary(data)
+        )
+        
+        # Generate chart config and insights in one call
+        response_text = await self.client.generate(prompt, purpose="analysis")
+        
+        # Parse JSON response
+        try:
+            return self._parse_analysis(response_text.strip())
+        except Exception as e:
+            print(f"Error parsing combined analysis, falling back to separate calls: {e}")
+        
+        viz_config, insights = await asyncio.gather(
+            viz_generator.generate_viz_config(sql_query, data),
+            insight_generator.generate_insights_with_source(user_question, sql_query, data)
+        )
+        return viz_config, insights
+    
+    def _parse_analysis(
+        self, 
+        analysis_text: str
+    ) -> Tuple[Dict[str, Any], Tuple[List[str], str]]:
+        """Parse and validate the combined response"""
+        # Remove markdown formatting if present
+        analysis_text = analysis_text.replace('```json', '').replace('```', '').strip()
+        
+        analysis = json.loads(analysis_text)
+        if not isinstance(analysis, dict):
+            raise ValueError("Analysis must be an object")
+        
+        config = viz_generator.validate_config(analysis.get("chart"))
+        config["source"] = "llm"
+        insights = insight_generator.validate_insights(analysis.get("insights"))
+        return config, (insights, "llm")
+
+
+# Global instance
+analysis_generator = AnalysisGenerator()
@@ -0,0 +1,231 @@
+"""Shared LLM client - one configured provider with deadlines, retries and hedging"""
+from app.config import settings
+from app.metrics import metrics
+from app.llm.providers import LLMProvider, LLMResponse, create_provider
+from collections import deque
+from typing import Dict, Any, Optional, Set
+import asyncio
+import random
+import time
+
+LATENCY_WINDOW = 500
+
+LLM_SECONDS = metrics.histogram(
+    "insightgen_llm_request_duration_seconds",
+    "LLM call duration including retries and hedged requests",
+    ("purpose", "outcome")
+)
+
+
+def _percentile(values, fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of a sequence (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class LLMClient:
+    """
+    Single entry point for LLM calls shared by all generators
+    
+    - One provider (Gemini, or recorded responses), so every caller reuses
+      the same underlying client and its pooled connections
+    - A deadline per call covering all attempts
+    - Retries with full-jitter exponential backoff on the provider's
+      retryable errors (429 and 5xx for Gemini)
+    - Optional hedging: when a call runs longer than the recent latency
+      percentile of its purpose, a duplicate request is sent and the first
+      answer wins
+    - Per-call latency and token counts, aggregated per purpose
+    """
+    
+    def __init__(
+        self,
+        provider: LLMProvider,
+        timeout: float = 15.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 4.0,
+        hedge_enabled: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20
+    ):
+        self.provider = provider
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._purposes: Dict[str, Dict[str, Any]] = {}
+    
+    async def generate(self, prompt: str, purpose: str = "default") -> str:
+        """
+        Generate text for a prompt
+        
+        Args:
+            prompt: Prompt text
+            purpose: Caller label used for metrics (e.g. "sql", "viz")
+        
+        Returns:
+            Response text
+        
+        Raises:
+            asyncio.TimeoutError: The deadline passed before an answer arrived
+            Exception: The last error once retries are exhausted, or any
+                non-retryable error
+        """
+        counters = self._purpose_counters(purpose)
+        counters["calls"] += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        start = time.perf_counter()
+        attempt = 0
+        
+        while True:
+            remaining = deadline - loop.time()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                response = await self._attempt(prompt, purpose, remaining, counters)
+                break
+            except self.provider.retryable_errors:
+                backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if attempt >= self.max_retries or loop.time() + backoff >= deadline:
+                    counters["failures"] += 1
+                    LLM_SECONDS.observe(time.perf_counter() - start, purpose=purpose, outcome="error")
+                    raise
+                attempt += 1
+                counters["retries"] += 1
+                await asyncio.sleep(backoff)
+            except asyncio.CancelledError:
+                # The caller gave up (e.g. the client disconnected); the
+                # pending provider requests are aborted with this task
+                counters["cancellations"] += 1
+                LLM_SECONDS.observe(time.perf_counter() - start, purpose=purpose, outcome="cancelled")
+                raise
+            except asyncio.TimeoutError:
+                counters["failures"] += 1
+                counters["timeouts"] += 1
+                LLM_SECONDS.observe(time.perf_counter() - start, purpose=purpose, outcome="timeout")
+                raise
+            except Exception:
+                counters["failures"] += 1
+                LLM_SECONDS.observe(time.perf_counter() - start, purpose=purpose, outcome="error")
+                raise
+        
+        latency = time.perf_counter() - start
+        LLM_SECONDS.observe(latency, purpose=purpose, outcome="ok")
+        counters["latencies"].append(latency)
+        self._record_usage(response, counters)
+        return response.text
+    
+    def hedge_delay(self, purpose: str = "default") -> Optional[float]:
+        """
+        Latency after which a duplicate request is sent (None: no hedging)
+        
+        Taken from the purpose's own latency window, so quick calls (viz) are
+        not hedged against slow ones (analysis) or the other way round.
+        """
+        counters = self._purposes.get(purpose)
+        if not self.hedge_enabled or counters is None:
+            return None
+        latencies = counters["latencies"]
+        if len(latencies) < self.hedge_min_samples:
+            return None
+        return _percentile(latencies, self.hedge_percentile)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return per-purpose call counts, latency percentiles (ms) and token totals"""
+        stats = {}
+        for purpose, counters in self._purposes.items():
+            latencies = counters["latencies"]
+            stats[purpose] = {
+                key: value for key, value in counters.items() if key != "latencies"
+            }
+            for name, fraction in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+                value = _percentile(latencies, fraction)
+                stats[purpose][name] = round(value * 1000, 1) if value is not None else None
+        return stats
+    
+    async def _attempt(self, prompt: str, purpose: str, remaining: float, counters: Dict[str, Any]):
+        """One attempt, hedged with a duplicate request when it runs long"""
+        delay = self.hedge_delay(purpose)
+        if delay is None or delay >= remaining:
+            return await asyncio.wait_for(self._call(prompt), timeout=remaining)
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + remaining
+        primary = asyncio.ensure_future(self._call(prompt))
+        pending: Set[asyncio.Future] = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                counters["hedges"] += 1
+                pending.add(asyncio.ensure_future(self._call(prompt)))
+            
+            error: Optional[BaseException] = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    raise asyncio.TimeoutError()
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _call(self, prompt: str) -> LLMResponse:
+        """Send one request to the provider"""
+        return await self.provider.generate(prompt)
+    
+    def _purpose_counters(self, purpose: str) -> Dict[str, Any]:
+        """Get (or create) the counters and latency window of a purpose"""
+        if purpose not in self._purposes:
+            self._purposes[purpose] = {
+                "calls": 0,
+                "failures": 0,
+                "timeouts": 0,
+                "cancellations": 0,
+                "retries": 0,
+                "hedges": 0,
+                "hedge_wins": 0,
+                "prompt_tokens": 0,
+                "output_tokens": 0,
+                "latencies": deque(maxlen=LATENCY_WINDOW)
+            }
+        return self._purposes[purpose]
+    
+    def _record_usage(self, response: LLMResponse, counters: Dict[str, Any]) -> None:
+        """Add token counts reported by the provider"""
+        counters["prompt_tokens"] += response.prompt_tokens
+        counters["output_tokens"] += response.output_tokens
+
+
+# Global instance
+llm_client = LLMClient(
+    provider=create_provider(settings),
+    timeout=settings.LLM_TIMEOUT_SECONDS,
+    max_retries=settings.LLM_MAX_RETRIES,
+    backoff_base=settings.LLM_BACKOFF_SECONDS,
+    backoff_max=settings.LLM_BACKOFF_MAX_SECONDS,
+    hedge_enabled=settings.LLM_HEDGE_ENABLED,
+    hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+    hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES
+)
@@ -1,25 +1,23 @@
 """Insight generator using Google Gemini"""
-import google.generativeai as genai
-from app.config import settings
 from app.llm.prompt_templates import INSIGHT_GENERATION_PROMPT
+from app.db.query_result import QueryResult
+from app.llm.stat_insights import stat_insight_engine
+from app.llm.client import llm_client
 import json
-from typing import List, Dict, Any
-
-# Configure Google AI
-genai.configure(api_key=settings.GOOGLE_API_KEY)
+from typing import List, Dict, Any, Tuple
 
 
 class InsightGenerator:
     """Generate business insights from query results using Google Gemini"""
     
     def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.client = llm_client
     
-    def generate_insights(
+    async def generate_insights(
         self,
         user_question: str,
         sql_query: str,
-        data: List[Dict[str, Any]]
+        data: QueryResult
     ) -> List[str]:
         """
         Generate actionable business insights from data
@@ -32,11 +30,41 @@ class InsightGenerator:
         Returns:
             List of insight strings
         """
+        insights, _ = await self.generate_insights_with_source(
+            user_question,
+            sql_query,
+            data
+        )
+        return insights
+    
+    async def generate_insights_with_source(
+        self,
+        user_question: str,
+        sql_query: str,
+        data: QueryResult,
+        mode: str = "llm"
+    ) -> Tuple[List[str], str]:
+        """
+        Generate insights and report which engine produced them
+        
+        Args:
+            user_question: Original user question
+            sql_query: SQL query that was executed
+            data: Query results
+            mode: "llm" to ask Gemini (statistical fallback on parse errors),
+                or "statistical" to skip the LLM entirely
+            
+        Returns:
+            Tuple of (insights, source) where source is "llm" or "statistical"
+        """
         if not data:
-            return ["No data available to generate insights."]
+            return ["No data available to generate insights."], "statistical"
+        
+        if mode == "statistical":
+            return stat_insight_engine.generate(data), "statistical"
         
         # Create data summary
-        data_summary = self._create_data_summary(data)
+        data_summary = self.create_data_summary(data)
         
         # Format prompt
         prompt = INSIGHT_GENERATION_PROMPT.format(
@@ -46,18 +74,18 @@ class InsightGenerator:
         )
         
         # Generate insights
-        response = self.model.generate_content(prompt)
-        insights_text = response.text.strip()
+        response_text = await self.client.generate(prompt, purpose="insights")
+        insights_text = response_text.strip()
         
         # Parse insights
         try:
             insights = self._parse_insights(insights_text)
-            return insights
+            return insights, "llm"
         except Exception as e:
             print(f"Error parsing insights: {e}")
-            return self._default_insights(data)
+            return self.default_insights(data), "statistical"
     
-    def _create_data_summary(self, data: List[Dict[str, Any]]) -> str:
+    def create_data_summary(self, data: QueryResult) -> str:
         """Create a summary of the data for the LLM"""
         summary_parts = []
         
@@ -65,7 +93,7 @@ class InsightGenerator:
         summary_parts.append(f"Total rows: {len(data)}")
         
         # Show first few rows
-        preview = json.dumps(data[:10], indent=2, default=str)
+        preview = json.dumps(data.head(10), indent=2, default=str)
         summary_parts.append(f"Data preview:\n{preview}")
         
         # Column statistics (if numeric columns exist)
@@ -76,29 +104,22 @@ class InsightGenerator:
         
         return "\n\n".join(summary_parts)
     
-    def _calculate_numeric_stats(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate basic statistics for numeric columns"""
+    def _calculate_numeric_stats(self, data: QueryResult) -> Dict[str, Any]:
+        """Calculate basic statistics for numeric columns (including Decimal)"""
         stats = {}
         
         if not data:
             return stats
         
-        # Get numeric columns
-        first_row = data[0]
-        numeric_cols = [
-            col for col, val in first_row.items()
-            if isinstance(val, (int, float))
-        ]
-        
-        # Calculate stats for each numeric column
-        for col in numeric_cols:
-            values = [row[col] for row in data if col in row and row[col] is not None]
-            if values:
+        # Read stats for each numeric column from the shared profile
+        for col, profile in data.profile().items():
+            if profile.is_numeric and profile.sum is not None:
                 stats[col] = {
-                    "min": min(values),
-                    "max": max(values),
-                    "avg": sum(values) / len(values),
-                    "total": sum(values)
+                    "min": profile.min,
+                    "max": profile.max,
+                    "avg": profile.mean,
+                    "median": profile.quantiles["p50"],
+                    "total": profile.sum
                 }
         
         return stats
@@ -109,35 +130,19 @@ class InsightGenerator:
         insights_text = insights_text.replace('```json', '').replace('```', '').strip()
         
         # Parse JSON array
-        insights = json.loads(insights_text)
-        
+        return self.validate_insights(json.loads(insights_text))
+    
+    def validate_insights(self, insights: Any) -> List[str]:
+        """Check parsed insights form a list"""
         # Ensure it's a list
         if not isinstance(insights, list):
             raise ValueError("Insights must be a list")
         
         return insights
     
-    def _default_insights(self, data: List[Dict[str, Any]]) -> List[str]:
-        """Generate basic insights when AI generation fails"""
-        insights = []
-        
-        insights.append(f"Query returned {len(data)} rows of data.")
-        
-        # Try to find numeric columns and report totals
-        if data:
-            first_row = data[0]
-            numeric_cols = [
-                col for col, val in first_row.items()
-                if isinstance(val, (int, float))
-            ]
-            
-            for col in numeric_cols[:2]:  # Limit to first 2 numeric columns
-                values = [row[col] for row in data if col in row and row[col] is not None]
-                if values:
-                    total = sum(values)
-                    insights.append(f"Total {col}: {total:,.2f}")
-        
-        return insights
+    def default_insights(self, data: QueryResult) -> List[str]:
+        """Generate statistical insights when AI generation fails"""
+        return stat_insight_engine.generate(data)
 
 
 # Global instance
@@ -92,3 +92,50 @@ Return ONLY a JSON array of insight strings (no markdown, no explanations):
 ["Insight 1", "Insight 2", "Insight 3"]
 
 Insights:"""
+
+
+COMBINED_ANALYSIS_PROMPT = """You are a data visualization expert and business analyst. Based on the question, the SQL query and its results, choose the best chart and generate actionable insights.
+
+USER QUESTION:
+{user_question}
+
+SQL QUERY EXECUTED:
+{sql_query}
+
+COLUMN NAMES:
+{column_names}
+
+DATA SUMMARY:
+{data_summary}
+
+CHART INSTRUCTIONS:
+1. Choose from: line, bar, pie, area, scatter
+- **line**: Time series data, trends over time
+- **bar**: Comparing categories, rankings
+- **pie**: Showing proportions/percentages (max 10 categories)
+- **area**: Cumulative trends over time
+- **scatter**: Correlation between two numeric variables
+2. Identify which columns should be used for x-axis, y-axis, and grouping
+
+INSIGHT INSTRUCTIONS:
+1. Identify key trends, patterns, or anomalies in the data
+2. Highlight significant growth or decline
+3. Compare performance across categories/regions if applicable
+4. Provide 2-4 concise, actionable insights
+5. Use specific numbers and percentages
+6. Write in clear, business-friendly language
+
+Return ONLY a valid JSON object in this exact format (no markdown, no explanations):
+{{
+  "chart": {{
+    "chart_type": "line|bar|pie|area|scatter",
+    "title": "Descriptive chart title",
+    "x_axis": "column_name_for_x_axis",
+    "y_axis": "column_name_for_y_axis",
+    "group_by": "column_name_for_grouping (optional, can be null)",
+    "aggregation": "sum|avg|count|none"
+  }},
+  "insights": ["Insight 1", "Insight 2", "Insight 3"]
+}}
+
+Analysis:"""
@@ -0,0 +1,279 @@
+"""LLM providers - the model backends behind the shared LLM client"""
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+
+
+LATENCY_DISTRIBUTIONS = ("none", "fixed", "uniform", "lognormal", "recorded")
+
+
+@dataclass
+class LLMResponse:
+    """Text and token usage of one model response"""
+    text: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+class ReplayMissError(LookupError):
+    """Raised when a replayed prompt has no recording"""
+
+
+def prompt_key(prompt: str) -> str:
+    """Stable key identifying a prompt in recordings"""
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+
+class LLMProvider(ABC):
+    """
+    Interface for model backends
+    
+    A provider sends a single request and returns the response; deadlines,
+    retries, hedging and metrics are handled by LLMClient. Errors listed in
+    retryable_errors are retried by the client.
+    """
+    
+    name = "base"
+    retryable_errors: Tuple[type, ...] = ()
+    
+    @abstractmethod
+    async def generate(self, prompt: str) -> LLMResponse:
+        """
+        Send one prompt to the model
+        
+        Args:
+            prompt: Prompt text
+        
+        Returns:
+            Model response
+        """
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through google-generativeai"""
+    
+    name = "gemini"
+    # Rate limiting (429) and server-side (5xx) failures are worth retrying
+    retryable_errors = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServerError,
+    )
+    
+    def __init__(self, model_name: str, api_key: str):
+        self.model_name = model_name
+        self.api_key = api_key
+        self._model = None
+    
+    @property
+    def model(self):
+        """The Gemini model, configured on first use so importing needs no key"""
+        if self._model is None:
+            if not self.api_key:
+                raise ValueError("GOOGLE_API_KEY is required for the gemini LLM provider")
+            genai.configure(api_key=self.api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+    
+    async def generate(self, prompt: str) -> LLMResponse:
+        response = await self.model.generate_content_async(prompt)
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResponse(
+            text=response.text,
+            prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(usage, "candidates_token_count", 0) or 0
+        )
+
+
+class LatencyModel:
+    """
+    Simulated response latency for replayed calls
+    
+    Distributions:
+    - none: respond immediately
+    - fixed: always median_ms
+    - uniform: uniform within median_ms * (1 +/- spread)
+    - lognormal: median median_ms, shape (sigma) spread - a long right tail
+      like real model latency
+    - recorded: the latency measured when the response was recorded
+    """
+    
+    def __init__(
+        self,
+        distribution: str = "none",
+        median_ms: float = 0.0,
+        spread: float = 0.5,
+        seed: Optional[int] = None
+    ):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution '{distribution}' "
+                f"(expected one of: {', '.join(LATENCY_DISTRIBUTIONS)})"
+            )
+        self.distribution = distribution
+        self.median_ms = median_ms
+        self.spread = spread
+        self._random = random.Random(seed)
+    
+    def sample(self, recorded_ms: Optional[float] = None) -> float:
+        """Draw one latency in seconds"""
+        if self.distribution == "fixed":
+            latency_ms = self.median_ms
+        elif self.distribution == "uniform":
+            latency_ms = self._random.uniform(
+                self.median_ms * (1 - self.spread),
+                self.median_ms * (1 + self.spread)
+            )
+        elif self.distribution == "lognormal":
+            latency_ms = self.median_ms * self._random.lognormvariate(0.0, self.spread)
+        elif self.distribution == "recorded":
+            latency_ms = recorded_ms or 0.0
+        else:
+            latency_ms = 0.0
+        return max(latency_ms, 0.0) / 1000
+
+
+class RecordReplayProvider(LLMProvider):
+    """
+    Record responses of another provider to disk, or replay them offline
+    
+    Recordings are a JSON-lines file with one entry per call, keyed by a
+    hash of the prompt. In "record" mode every prompt goes to the wrapped
+    provider and its response (with the measured latency) is appended. In
+    "replay" mode responses come from the file, delayed by the latency
+    model; an unrecorded prompt raises ReplayMissError. When a prompt was
+    recorded more than once, the latest recording is replayed.
+    """
+    
+    name = "replay"
+    
+    def __init__(
+        self,
+        path: str,
+        mode: str = "replay",
+        provider: Optional[LLMProvider] = None,
+        latency: Optional[LatencyModel] = None
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown record/replay mode '{mode}'")
+        if mode == "record" and provider is None:
+            raise ValueError("Record mode needs a provider to record")
+        self.path = path
+        self.mode = mode
+        self.name = mode
+        self.provider = provider
+        self.latency = latency or LatencyModel()
+        if provider is not None:
+            self.retryable_errors = provider.retryable_errors
+        self._recordings: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+    
+    def load(self) -> int:
+        """
+        (Re)load recordings from disk
+        
+        Returns:
+            Number of distinct recorded prompts
+        """
+        self._recordings = {}
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    self._recordings[entry["key"]] = entry
+                except (ValueError, KeyError) as e:
+                    print(f"Skipping bad recording {self.path}:{line_number}: {e}")
+        return len(self._recordings)
+    
+    async def generate(self, prompt: str) -> LLMResponse:
+        if self.mode == "record":
+            return await self._record(prompt)
+        
+        entry = self._recordings.get(prompt_key(prompt))
+        if entry is None:
+            self.misses += 1
+            raise ReplayMissError(
+                f"No recorded response for prompt {prompt_key(prompt)[:12]} in {self.path}"
+            )
+        self.hits += 1
+        
+        delay = self.latency.sample(entry.get("latency_ms"))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return LLMResponse(
+            text=entry["response"]["text"],
+            prompt_tokens=entry["response"].get("prompt_tokens", 0),
+            output_tokens=entry["response"].get("output_tokens", 0)
+        )
+    
+    async def _record(self, prompt: str) -> LLMResponse:
+        """Call the wrapped provider and append the exchange to the file"""
+        start = time.perf_counter()
+        response = await self.provider.generate(prompt)
+        entry = {
+            "key": prompt_key(prompt),
+            "provider": self.provider.name,
+            "prompt": prompt,
+            "response": asdict(response),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "recorded_at": time.time()
+        }
+        self._recordings[entry["key"]] = entry
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Could not write LLM recording {self.path}: {e}")
+        return response
+
+
+def create_provider(settings) -> LLMProvider:
+    """
+    Build the provider selected by LLM_PROVIDER
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        "gemini": live Gemini calls
+        "record": live Gemini calls, recorded to LLM_RECORDINGS_PATH
+        "replay": recorded responses only, no network access
+    """
+    if settings.LLM_PROVIDER == "gemini":
+        return GeminiProvider(settings.LLM_MODEL, settings.GOOGLE_API_KEY)
+    if settings.LLM_PROVIDER == "record":
+        return RecordReplayProvider(
+            settings.LLM_RECORDINGS_PATH,
+            mode="record",
+            provider=GeminiProvider(settings.LLM_MODEL, settings.GOOGLE_API_KEY)
+        )
+    if settings.LLM_PROVIDER == "replay":
+        return RecordReplayProvider(
+            settings.LLM_RECORDINGS_PATH,
+            mode="replay",
+            latency=LatencyModel(
+                distribution=settings.LLM_REPLAY_LATENCY,
+                median_ms=settings.LLM_REPLAY_LATENCY_MS,
+                spread=settings.LLM_REPLAY_LATENCY_SPREAD,
+                seed=settings.LLM_REPLAY_SEED
+            )
+        )
+    raise ValueError(f"Unknown LLM_PROVIDER '{settings.LLM_PROVIDER}'")
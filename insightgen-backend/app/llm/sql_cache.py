@@ -0,0 +1,286 @@
+"""Semantic cache for natural language to SQL translations"""
+from app.db.schema_loader import SCHEMA_METADATA
+from app.db.schema_context import STOP_WORDS, SYNONYMS
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set, Tuple
+import hashlib
+import re
+import time
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9&]+")
+_NUM_PERMUTATIONS = 64
+_BAND_SIZE = 4
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Negation and ordering words: questions differing in one of these ask for
+# different rows, however similar the rest of the wording is
+QUALIFIER_TERMS = frozenset({
+    'not', 'no', 'non', 'nor', 'never', 'without', 'except', 'exclude',
+    'excluding', 'excluded', 'top', 'bottom', 'asc', 'desc', 'ascending',
+    'descending'
+})
+
+# Aggregates (after SYNONYMS): "average" and "total" ask for different SQL
+AGGREGATE_TERMS = frozenset({
+    'avg', 'sum', 'count', 'min', 'max', 'minimum', 'maximum'
+})
+
+# Negative contractions, tokenized without their "t" ("didn't" -> "didn")
+_NEGATIVE_CONTRACTIONS = {
+    'don', 'doesn', 'didn', 'isn', 'aren', 'wasn', 'weren', 'hasn', 'haven',
+    'hadn', 'won', 'wouldn', 'couldn', 'shouldn', 'cannot'
+}
+
+
+def _build_schema_synonyms(schema: Dict[str, Any]) -> Tuple[Dict[str, str], Set[str], Set[str]]:
+    """
+    Map singular/plural table and column terms onto their schema names
+    
+    Returns:
+        Tuple of (synonyms, value_terms, schema_terms)
+        - synonyms: Dict of question term to canonical schema term
+        - value_terms: Tokens from sample values, which act as filters
+        - schema_terms: Canonical table and column names
+    """
+    synonyms: Dict[str, str] = {}
+    value_terms: Set[str] = set()
+    for table_name, table in schema.get("tables", {}).items():
+        synonyms[table_name] = table_name
+        synonyms[table_name.rstrip('s')] = table_name
+        for column_name in table.get("columns", {}):
+            synonyms[column_name] = column_name
+            synonyms[column_name + 's'] = column_name
+            if column_name.endswith('_name'):
+                synonyms[column_name.replace('_', '')] = column_name
+        for values in table.get("sample_values", {}).values():
+            for value in values:
+                for token in _TOKEN_PATTERN.findall(value.lower()):
+                    synonyms.setdefault(token, token)
+                    value_terms.add(token)
+    schema_terms = set(synonyms.values()) - value_terms
+    schema_terms.update(SYNONYMS.values())
+    schema_terms.difference_update(QUALIFIER_TERMS, AGGREGATE_TERMS)
+    return synonyms, value_terms, schema_terms
+
+
+def _hash_token(token: str) -> int:
+    """Stable 64-bit hash of a token"""
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big')
+
+
+class SQLCache:
+    """
+    LRU + TTL cache of generated SQL keyed by normalized question
+    
+    Lookups first try an exact match on the normalized question. If that
+    misses, a MinHash/LSH index over the question tokens finds near matches,
+    which are accepted when their Jaccard similarity reaches the threshold
+    and they mention the same numbers, filter values, tables and columns,
+    aggregates ("average" vs "total") and qualifier words (negations such
+    as "not" or "excluding", and "top"/"bottom"). The whole
+    cache is dropped whenever the schema version changes.
+    
+    Only SQL that passed validation and ran should be stored; SQL that
+    fails later is evicted with discard().
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float = 0.8
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.load_schema(SCHEMA_METADATA)
+        self.hits = 0
+        self.misses = 0
+        
+        # MinHash permutations: h(x) = (a * x + b) mod p
+        self._permutations = [
+            (_hash_token(f"a{i}") % _MERSENNE_PRIME | 1, _hash_token(f"b{i}") % _MERSENNE_PRIME)
+            for i in range(_NUM_PERMUTATIONS)
+        ]
+        self._schema_fingerprint: Optional[str] = None
+        self._entries: "OrderedDict[str, Tuple[str, frozenset, tuple, float]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, tuple], Set[str]] = {}
+    
+    def load_schema(self, metadata: Dict[str, Any]) -> None:
+        """Rebuild the schema-derived synonyms (entries are dropped on the next schema version check)"""
+        self.synonyms, self.value_terms, self.schema_terms = _build_schema_synonyms(metadata)
+    
+    def normalize(self, question: str) -> List[str]:
+        """
+        Normalize a question into a sorted list of canonical tokens
+        
+        Lowercases, drops stop words and punctuation, and maps synonyms and
+        singular/plural forms onto schema terms so that casing and word
+        order don't change the key. Negative contractions become "not".
+        """
+        tokens = set()
+        for token in _TOKEN_PATTERN.findall(question.lower()):
+            if token in _NEGATIVE_CONTRACTIONS:
+                token = 'not'
+            elif token == 't' or token in STOP_WORDS:
+                continue
+            token = SYNONYMS.get(token, token)
+            token = self.synonyms.get(token, token)
+            if token.endswith('s') and token[:-1] in self.synonyms:
+                token = self.synonyms[token[:-1]]
+            tokens.add(token)
+        return sorted(tokens)
+    
+    def get(self, question: str, schema_version: str) -> Optional[str]:
+        """
+        Look up cached SQL for a question
+        
+        Args:
+            question: Natural language question
+            schema_version: Version of the schema the SQL would be generated against
+        
+        Returns:
+            Cached SQL string, or None on a miss
+        """
+        self._check_schema(schema_version)
+        tokens = self.normalize(question)
+        key = " ".join(tokens)
+        
+        entry = self._lookup(key)
+        if entry is None:
+            entry = self._lookup_similar(frozenset(tokens))
+        
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return entry[0]
+    
+    def set(self, question: str, schema_version: str, sql: str) -> None:
+        """Store generated SQL for a question"""
+        self._check_schema(schema_version)
+        tokens = self.normalize(question)
+        if not tokens:
+            return
+        key = " ".join(tokens)
+        
+        # Re-storing the same SQL must not extend its TTL
+        existing = self._entries.get(key)
+        if existing is not None and existing[0] == sql:
+            return
+        
+        self._remove(key)
+        signature = self._signature(tokens)
+        self._entries[key] = (sql, frozenset(tokens), signature, time.monotonic())
+        for band in self._bands(signature):
+            self._buckets.setdefault(band, set()).add(key)
+        
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+    
+    def discard(self, sql: str) -> int:
+        """
+        Evict every entry holding the given SQL
+        
+        Args:
+            sql: SQL that failed validation or execution
+        
+        Returns:
+            Number of entries removed
+        """
+        keys = [key for key, entry in self._entries.items() if entry[0] == sql]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+    
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        self._entries.clear()
+        self._buckets.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache statistics"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+    
+    def _check_schema(self, schema_version: str) -> None:
+        """Invalidate the cache when the schema changes"""
+        fingerprint = hashlib.sha256(schema_version.encode()).hexdigest()
+        if fingerprint != self._schema_fingerprint:
+            self.clear()
+            self._schema_fingerprint = fingerprint
+    
+    def _lookup(self, key: str) -> Optional[tuple]:
+        """Exact lookup honouring TTL; refreshes LRU position on hit"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[3] > self.ttl_seconds:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+    
+    def _lookup_similar(self, tokens: frozenset) -> Optional[tuple]:
+        """Find the most similar cached question through the LSH index"""
+        if not tokens:
+            return None
+        
+        candidates: Set[str] = set()
+        for band in self._bands(self._signature(tokens)):
+            candidates.update(self._buckets.get(band, ()))
+        
+        anchors = self._anchors(tokens)
+        best_key, best_score = None, 0.0
+        for key in candidates:
+            cached_tokens = self._entries[key][1]
+            if self._anchors(cached_tokens) != anchors:
+                continue
+            score = len(tokens & cached_tokens) / len(tokens | cached_tokens)
+            if score > best_score:
+                best_key, best_score = key, score
+        
+        if best_key is None or best_score < self.similarity_threshold:
+            return None
+        return self._lookup(best_key)
+    
+    def _anchors(self, tokens: frozenset) -> Set[str]:
+        """Tokens that must match exactly: numbers, filter values, schema terms, aggregates and qualifiers"""
+        return {
+            t for t in tokens
+            if t.isdigit() or t in self.value_terms or t in self.schema_terms
+            or t in AGGREGATE_TERMS or t in QUALIFIER_TERMS
+        }
+    
+    def _signature(self, tokens) -> tuple:
+        """Compute the MinHash signature of a token set"""
+        hashes = [_hash_token(t) for t in tokens]
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._permutations
+        )
+    
+    def _bands(self, signature: tuple) -> List[Tuple[int, tuple]]:
+        """Split a signature into LSH bands"""
+        return [
+            (i, signature[i:i + _BAND_SIZE])
+            for i in range(0, len(signature), _BAND_SIZE)
+        ]
+    
+    def _remove(self, key: str) -> None:
+        """Remove an entry and its LSH bucket memberships"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band in self._bands(entry[2]):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
@@ -1,33 +1,48 @@
 """SQL Generator using Google Gemini AI"""
-import google.generativeai as genai
 from app.config import settings
 from app.db.schema_loader import get_schema_context
+from app.db.schema_context import schema_context_builder
 from app.llm.prompt_templates import SQL_GENERATION_PROMPT
+from app.llm.sql_cache import SQLCache
+from app.llm.client import llm_client
 import re
 
-# Configure Google AI
-genai.configure(api_key=settings.GOOGLE_API_KEY)
-
 
 class SQLGenerator:
     """Generate SQL queries from natural language using Google Gemini"""
     
     def __init__(self):
-        # Use Gemini 2.5 Flash - stable model with good rate limits
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        # Shared Gemini client (model, deadlines, retries, hedging)
+        self.client = llm_client
+        self.cache = SQLCache(
+            max_entries=settings.SQL_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.SQL_CACHE_TTL_SECONDS,
+            similarity_threshold=settings.SQL_CACHE_SIMILARITY_THRESHOLD
+        ) if settings.SQL_CACHE_ENABLED else None
     
-    def generate_sql(self, user_question: str) -> str:
+    async def generate_sql(self, user_question: str) -> str:
         """
         Generate SQL query from natural language question
         
         Args:
             user_question: Natural language question from user
-            
+        
         Returns:
-            Generated SQL query string
+            Generated SQL query string (not cached until remember() is
+            called for it)
         """
-        # Get database schema context
-        schema_context = get_schema_context()
+        # Reuse SQL from an equivalent earlier question
+        schema_version = schema_context_builder.schema_version
+        if self.cache is not None:
+            cached_sql = self.cache.get(user_question, schema_version)
+            if cached_sql is not None:
+                return cached_sql
+        
+        # Get database schema context (only the relevant tables and columns)
+        if settings.SCHEMA_PRUNING_ENABLED:
+            schema_context = schema_context_builder.build(user_question)
+        else:
+            schema_context = get_schema_context()
         
         # Format prompt
         prompt = SQL_GENERATION_PROMPT.format(
@@ -36,21 +51,31 @@ class SQLGenerator:
         )
         
         # Generate SQL using Gemini
-        response = self.model.generate_content(prompt)
-        sql_query = response.text.strip()
+        response_text = await self.client.generate(prompt, purpose="sql")
+        sql_query = response_text.strip()
         
         # Clean up the response (remove markdown formatting if present)
         sql_query = self._clean_sql(sql_query)
         
         return sql_query
     
+    def remember(self, user_question: str, sql: str) -> None:
+        """Cache SQL for a question once it has passed validation and run"""
+        if self.cache is not None:
+            self.cache.set(user_question, schema_context_builder.schema_version, sql)
+    
+    def forget(self, sql: str) -> None:
+        """Evict SQL that failed validation or execution from the cache"""
+        if self.cache is not None:
+            self.cache.discard(sql)
+    
     def _clean_sql(self, sql: str) -> str:
         """
         Clean SQL query by removing markdown formatting and extra whitespace
         
         Args:
             sql: Raw SQL string from LLM
-            
+        
         Returns:
             Cleaned SQL query
         """
@@ -0,0 +1,243 @@
+"""Statistical insight engine - templated insights without an LLM"""
+from app.db.query_result import QueryResult
+from app.db.profiler import ColumnProfile, classify_columns
+from typing import List, Optional, Tuple
+import numpy as np
+
+
+MAX_SERIES = 10
+MIN_OUTLIER_ROWS = 8
+
+
+def _label(name: str) -> str:
+    """Turn a column name into a readable label"""
+    return name.replace("_", " ")
+
+
+def _fmt(value: float) -> str:
+    """Format a number for an insight sentence"""
+    return f"{value:,.2f}"
+
+
+def _known(array: np.ndarray) -> np.ndarray:
+    """Mask of the non-NULL entries of a column array (NaT, NaN or None are NULL)"""
+    if array.dtype.kind == "M":
+        return ~np.isnat(array)
+    if array.dtype.kind == "f":
+        return ~np.isnan(array)
+    return np.fromiter((v is not None for v in array), dtype=bool, count=len(array))
+
+
+def _group_sum(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum values per distinct key; returns (sorted keys, totals)"""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=values, minlength=len(unique))
+
+
+class StatInsightEngine:
+    """
+    Generate ranked, templated insights from a result set
+    
+    Detectors (each scores its insight so the strongest come first):
+    - period-over-period growth on a temporal column, overall and per series
+    - top/bottom contributors and concentration of a measure by category
+    - outliers by IQR fences, reported with their z-score
+    - category comparison against the category average
+    """
+    
+    def __init__(self, max_insights: int = 4):
+        self.max_insights = max_insights
+    
+    def generate(self, data: QueryResult) -> List[str]:
+        """
+        Generate insights for a query result
+        
+        Args:
+            data: Query results
+        
+        Returns:
+            List of insight strings, most significant first
+        """
+        if not data:
+            return ["No data available to generate insights."]
+        
+        temporal, categorical, measures = classify_columns(data.profile())
+        if not measures:
+            return [f"Query returned {len(data)} rows of data."]
+        
+        y = measures[0]
+        values = np.nan_to_num(data.array(y.name).astype(np.float64))
+        category = next(
+            (c for c in categorical if 1 < c.distinct_count <= len(data)),
+            None
+        )
+        
+        scored: List[Tuple[float, str]] = []
+        if temporal:
+            scored.extend(self._growth(data, temporal[0], y, values, category))
+        if category is not None:
+            scored.extend(self._contributors(data, category, y, values))
+        scored.extend(self._outliers(data, y, values, category or (temporal[0] if temporal else None)))
+        
+        if not scored:
+            return [
+                f"Query returned {len(data)} rows of data.",
+                f"Total {_label(y.name)}: {_fmt(values.sum())}"
+            ]
+        
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [text for _, text in scored[:self.max_insights]]
+    
+    def _growth(
+        self,
+        data: QueryResult,
+        period: ColumnProfile,
+        y: ColumnProfile,
+        values: np.ndarray,
+        series: Optional[ColumnProfile]
+    ) -> List[Tuple[float, str]]:
+        """Last-period and whole-range growth, plus the fastest-growing series"""
+        insights: List[Tuple[float, str]] = []
+        periods = data.array(period.name)
+        # Rows without a period belong to no period (NaT would sort first)
+        known = _known(periods)
+        if periods.dtype.kind == "M":
+            # Group datetimes by their integer representation (much faster)
+            periods = periods.view(np.int64)
+        periods, values = periods[known], values[known]
+        keys, totals = _group_sum(periods, values)
+        if len(keys) < 2:
+            return insights
+        
+        last, previous = totals[-1], totals[-2]
+        if previous != 0:
+            change = (last - previous) / abs(previous) * 100
+            direction = "increased" if change >= 0 else "decreased"
+            insights.append((
+                min(abs(change) / 100, 1.0) + 0.5,
+                f"{_label(y.name).capitalize()} {direction} {abs(change):.1f}% in the latest "
+                f"{_label(period.name)} ({_fmt(last)} vs {_fmt(previous)})."
+            ))
+        
+        first = totals[0]
+        if first != 0 and len(keys) > 2:
+            change = (last - first) / abs(first) * 100
+            direction = "up" if change >= 0 else "down"
+            insights.append((
+                min(abs(change) / 200, 1.0) + 0.3,
+                f"Across {len(keys)} {_label(period.name)} periods, {_label(y.name)} is "
+                f"{direction} {abs(change):.1f}% from the first to the latest period."
+            ))
+        
+        if series is not None and series.distinct_count <= MAX_SERIES:
+            labels = data.array(series.name)[known]
+            labelled = _known(labels)
+            labels = labels.astype(str)
+            last_mask = (periods == keys[-1]) & labelled
+            previous_mask = (periods == keys[-2]) & labelled
+            names, last_totals = _group_sum(labels[last_mask], values[last_mask])
+            previous_names, previous_totals = _group_sum(labels[previous_mask], values[previous_mask])
+            previous_by_name = dict(zip(previous_names, previous_totals))
+            
+            best_name, best_change = None, None
+            for name, total in zip(names, last_totals):
+                base = previous_by_name.get(name)
+                if base:
+                    change = (total - base) / abs(base) * 100
+                    if best_change is None or change > best_change:
+                        best_name, best_change = name, change
+            if best_name is not None:
+                insights.append((
+                    min(abs(best_change) / 100, 1.0) + 0.4,
+                    f"{best_name} had the strongest latest-period change in "
+                    f"{_label(y.name)} ({best_change:+.1f}%)."
+                ))
+        
+        return insights
+    
+    def _contributors(
+        self,
+        data: QueryResult,
+        category: ColumnProfile,
+        y: ColumnProfile,
+        values: np.ndarray
+    ) -> List[Tuple[float, str]]:
+        """Top and bottom contributors, concentration and comparison to average"""
+        insights: List[Tuple[float, str]] = []
+        names = data.array(category.name)
+        known = _known(names)
+        names, totals = _group_sum(names[known].astype(str), values[known])
+        grand_total = totals.sum()
+        if len(names) < 2 or grand_total <= 0:
+            return insights
+        
+        order = np.argsort(-totals, kind="stable")
+        top, bottom = order[0], order[-1]
+        top_share = totals[top] / grand_total * 100
+        insights.append((
+            top_share / 100 + 0.6,
+            f"{names[top]} leads {_label(y.name)} with {_fmt(totals[top])} "
+            f"({top_share:.1f}% of the total)."
+        ))
+        
+        if len(names) >= 5:
+            top_n = 3
+            concentration = totals[order[:top_n]].sum() / grand_total * 100
+            insights.append((
+                concentration / 100 + 0.2,
+                f"The top {top_n} {_label(category.name)} values account for "
+                f"{concentration:.1f}% of {_label(y.name)}."
+            ))
+        
+        insights.append((
+            0.3,
+            f"{names[bottom]} contributes the least {_label(y.name)} "
+            f"({_fmt(totals[bottom])}, {totals[bottom] / grand_total * 100:.1f}% of the total)."
+        ))
+        
+        average = grand_total / len(names)
+        if average > 0:
+            ratio = totals[top] / average
+            insights.append((
+                min(ratio / 5, 1.0) + 0.1,
+                f"{names[top]} is {ratio:.1f}x the average {_label(category.name)} "
+                f"({_fmt(average)})."
+            ))
+        
+        return insights
+    
+    def _outliers(
+        self,
+        data: QueryResult,
+        y: ColumnProfile,
+        values: np.ndarray,
+        label_column: Optional[ColumnProfile]
+    ) -> List[Tuple[float, str]]:
+        """Rows outside the 1.5 x IQR fences"""
+        if len(values) < MIN_OUTLIER_ROWS:
+            return []
+        
+        q1, q3 = np.quantile(values, [0.25, 0.75])
+        iqr = q3 - q1
+        std = values.std()
+        if iqr <= 0 or std <= 0:
+            return []
+        
+        outliers = np.flatnonzero((values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr))
+        if not len(outliers):
+            return []
+        
+        z_scores = (values - values.mean()) / std
+        worst = outliers[np.argmax(np.abs(z_scores[outliers]))]
+        where = ""
+        if label_column is not None:
+            where = f" at {_label(label_column.name)} {data.column(label_column.name)[worst]}"
+        return [(
+            min(abs(z_scores[worst]) / 6, 1.0) + 0.2,
+            f"{len(outliers)} unusual {_label(y.name)} value(s) detected; the most extreme is "
+            f"{_fmt(values[worst])}{where} (z-score {z_scores[worst]:+.1f})."
+        )]
+
+
+# Global instance
+stat_insight_engine = StatInsightEngine()
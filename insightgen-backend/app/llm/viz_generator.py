@@ -1,62 +1,81 @@
 """Visualization configuration generator using Google Gemini"""
-import google.generativeai as genai
 from app.config import settings
 from app.llm.prompt_templates import VISUALIZATION_GENERATION_PROMPT
+from app.db.query_result import QueryResult
+from app.db.profiler import ColumnProfile
+from app.llm.viz_rules import viz_rules
+from app.llm.client import llm_client
 import json
-from typing import Dict, Any, List
-
-# Configure Google AI
-genai.configure(api_key=settings.GOOGLE_API_KEY)
+from typing import Dict, Any, List, Optional
 
 
 class VizGenerator:
     """Generate visualization configurations using Google Gemini"""
     
     def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.client = llm_client
     
-    def generate_viz_config(
+    async def generate_viz_config(
         self, 
         sql_query: str, 
-        data: List[Dict[str, Any]]
+        data: QueryResult
     ) -> Dict[str, Any]:
         """
         Generate visualization configuration based on query and data
         
         Args:
             sql_query: The SQL query that was executed
-            data: Query results (list of dictionaries)
+            data: Query results
             
         Returns:
-            Visualization configuration dictionary
+            Visualization configuration dictionary; "source" records whether
+            it came from the rule engine, the LLM or the default config
         """
         if not data:
-            return self._default_config()
+            return self.default_config()
+        
+        # Obvious shapes are decided by rules without an LLM round trip
+        profiles = data.profile()
+        if settings.VIZ_RULES_ENABLED:
+            config = viz_rules.infer(profiles, len(data))
+            if config is not None:
+                config["source"] = "rules"
+                return config
         
-        # Get column names
-        column_names = list(data[0].keys())
+        # Get column names, annotated with type and cardinality
+        column_names = data.columns
+        column_descriptions = self.describe_columns(data)
         
         # Create data preview (first 5 rows)
-        data_preview = json.dumps(data[:5], indent=2, default=str)
+        data_preview = json.dumps(data.head(5), indent=2, default=str)
         
         # Format prompt
         prompt = VISUALIZATION_GENERATION_PROMPT.format(
             sql_query=sql_query,
             data_preview=data_preview,
-            column_names=", ".join(column_names)
+            column_names=", ".join(column_descriptions)
         )
         
         # Generate visualization config
-        response = self.model.generate_content(prompt)
-        config_text = response.text.strip()
+        response_text = await self.client.generate(prompt, purpose="viz")
+        config_text = response_text.strip()
         
         # Parse JSON response
         try:
             config = self._parse_config(config_text)
+            config["source"] = "llm"
             return config
         except Exception as e:
             print(f"Error parsing viz config: {e}")
-            return self._default_config(column_names)
+            return self.default_config(column_names, profiles)
+    
+    def describe_columns(self, data: QueryResult) -> List[str]:
+        """Column names annotated with kind and distinct count for prompts"""
+        profiles = data.profile()
+        return [
+            f"{name} ({profiles[name].kind}, {profiles[name].distinct_count} distinct)"
+            for name in data.columns
+        ]
     
     def _parse_config(self, config_text: str) -> Dict[str, Any]:
         """Parse and validate visualization config from LLM response"""
@@ -64,7 +83,12 @@ class VizGenerator:
         config_text = config_text.replace('```json', '').replace('```', '').strip()
         
         # Parse JSON
-        config = json.loads(config_text)
+        return self.validate_config(json.loads(config_text))
+    
+    def validate_config(self, config: Any) -> Dict[str, Any]:
+        """Check a parsed visualization config has the required fields"""
+        if not isinstance(config, dict):
+            raise ValueError("Visualization config must be an object")
         
         # Validate required fields
         required_fields = ['chart_type', 'title', 'x_axis', 'y_axis']
@@ -74,8 +98,29 @@ class VizGenerator:
         
         return config
     
-    def _default_config(self, column_names: List[str] = None) -> Dict[str, Any]:
+    def default_config(
+        self, 
+        column_names: List[str] = None, 
+        profiles: Optional[Dict[str, ColumnProfile]] = None
+    ) -> Dict[str, Any]:
         """Return default visualization config when generation fails"""
+        if profiles:
+            # Prefer a date/text column on x and a numeric column on y
+            numeric = [p for p in profiles.values() if p.is_numeric]
+            dimensions = [p for p in profiles.values() if not p.is_numeric]
+            temporal = [p for p in dimensions if p.is_temporal]
+            if numeric and dimensions:
+                x = (temporal or dimensions)[0]
+                return {
+                    "chart_type": "line" if x.is_temporal else "bar",
+                    "title": "Data Visualization",
+                    "x_axis": x.name,
+                    "y_axis": numeric[0].name,
+                    "group_by": None,
+                    "aggregation": "none",
+                    "source": "default"
+                }
+        
         if column_names and len(column_names) >= 2:
             return {
                 "chart_type": "bar",
@@ -83,7 +128,8 @@ class VizGenerator:
                 "x_axis": column_names[0],
                 "y_axis": column_names[1],
                 "group_by": None,
-                "aggregation": "none"
+                "aggregation": "none",
+                "source": "default"
             }
         
         return {
@@ -92,7 +138,8 @@ class VizGenerator:
             "x_axis": "category",
             "y_axis": "value",
             "group_by": None,
-            "aggregation": "none"
+            "aggregation": "none",
+            "source": "default"
         }
 
 
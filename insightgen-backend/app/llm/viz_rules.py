@@ -0,0 +1,116 @@
+"""Deterministic chart selection from result column profiles"""
+from app.config import settings
+from app.db.profiler import ColumnProfile, classify_columns
+from typing import Dict, Any, Optional
+
+
+MAX_SERIES = 10
+
+
+def _title_case(name: str) -> str:
+    """Turn a column name into a readable label"""
+    return " ".join(word.capitalize() for word in name.split("_") if word)
+
+
+class VizRules:
+    """
+    Infer chart type, axes and grouping from column types and cardinalities
+    
+    Handles the unambiguous shapes:
+    - date + numeric -> line
+    - date + low-cardinality text + numeric -> line grouped by the text column
+    - text + numeric -> pie for a handful of non-negative slices, else bar
+    - numeric + numeric -> scatter
+    
+    Anything else is reported as ambiguous so the caller can ask the LLM.
+    The pie and bar limits are the ones the downsampler enforces.
+    """
+    
+    def __init__(self, max_pie_slices: int = 10, max_bar_categories: int = 50):
+        self.max_pie_slices = max_pie_slices
+        self.max_bar_categories = max_bar_categories
+    
+    def infer(
+        self,
+        profiles: Dict[str, ColumnProfile],
+        num_rows: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Infer a visualization config
+        
+        Args:
+            profiles: Column profiles of the query result
+            num_rows: Number of result rows
+        
+        Returns:
+            Visualization config dictionary, or None when the shape is ambiguous
+        """
+        if num_rows < 2:
+            return None
+        
+        temporal, categorical, measures = classify_columns(profiles)
+        
+        if not measures:
+            return None
+        y = measures[0]
+        
+        # Time series, optionally split into a few series
+        if len(temporal) == 1 and len(categorical) <= 1:
+            x = temporal[0]
+            if not categorical:
+                return self._config("line", x, y, None, num_rows)
+            if categorical[0].distinct_count <= MAX_SERIES:
+                return self._config("line", x, y, categorical[0], num_rows)
+            return None
+        
+        # Category comparison
+        if len(categorical) == 1 and not temporal:
+            x = categorical[0]
+            if (
+                x.distinct_count <= self.max_pie_slices
+                and x.distinct_count == num_rows
+                and len(measures) == 1
+                and (y.min or 0) >= 0
+            ):
+                return self._config("pie", x, y, None, num_rows)
+            if x.distinct_count <= self.max_bar_categories:
+                return self._config("bar", x, y, None, num_rows)
+            return None
+        
+        # Correlation between two measures
+        if not temporal and not categorical and len(measures) == 2:
+            return self._config("scatter", measures[0], measures[1], None, num_rows)
+        
+        return None
+    
+    def _config(
+        self,
+        chart_type: str,
+        x: ColumnProfile,
+        y: ColumnProfile,
+        group_by: Optional[ColumnProfile],
+        num_rows: int
+    ) -> Dict[str, Any]:
+        """Build a visualization config in the LLM response shape"""
+        title = f"{_title_case(y.name)} by {_title_case(x.name)}"
+        if group_by is not None:
+            title += f" and {_title_case(group_by.name)}"
+        
+        # Repeated x values without a series split need aggregating
+        needs_sum = group_by is None and chart_type != "scatter" and x.distinct_count < num_rows
+        
+        return {
+            "chart_type": chart_type,
+            "title": title,
+            "x_axis": x.name,
+            "y_axis": y.name,
+            "group_by": group_by.name if group_by is not None else None,
+            "aggregation": "sum" if needs_sum else "none"
+        }
+
+
+# Global instance
+viz_rules = VizRules(
+    max_pie_slices=settings.CHART_MAX_PIE_SLICES,
+    max_bar_categories=settings.CHART_MAX_BAR_CATEGORIES
+)
@@ -1,11 +1,43 @@
 """InsightGen FastAPI Application"""
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from app.config import settings
-from app.api import dashboard_router, health_router
+from app.api import dashboard_router, health_router, metrics_router, slow_queries_router
+from app.metrics import metrics
 from app.security import limiter
+from app.services.rollups import refresh_rollups_periodically
+from app.services.schema_refresh import refresh_schema, refresh_schema_periodically
+import asyncio
+import time
+
+
+HTTP_SECONDS = metrics.histogram(
+    "insightgen_http_request_duration_seconds",
+    "HTTP request duration until the response starts (includes serialization)",
+    ("method", "route", "status")
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Introspect the database schema at startup and keep it and the rollups fresh"""
+    tasks = []
+    if settings.SCHEMA_INTROSPECTION_ENABLED:
+        await refresh_schema()
+        tasks.append(asyncio.create_task(
+            refresh_schema_periodically(settings.SCHEMA_REFRESH_SECONDS)
+        ))
+    if settings.ROLLUPS_ENABLED:
+        tasks.append(asyncio.create_task(
+            refresh_rollups_periodically(settings.ROLLUP_REFRESH_SECONDS)
+        ))
+    yield
+    for task in tasks:
+        task.cancel()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -13,7 +45,8 @@ app = FastAPI(
     description="GenAI-based Dashboard Generator - Convert natural language to SQL queries and dashboards",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add rate limiter state
@@ -29,9 +62,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    """Time every request by route template (not raw path, to bound label values)"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status)
+        )
+
+
 # Include routers
 app.include_router(health_router)
 app.include_router(dashboard_router)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    app.include_router(slow_queries_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 
 @app.get("/")
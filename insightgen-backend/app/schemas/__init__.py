@@ -5,6 +5,7 @@ from app.schemas.dashboard import (
     ErrorResponse,
     Chart,
     ChartConfig,
+    ColumnarData,
     DashboardMetadata
 )
 
@@ -14,5 +15,6 @@ __all__ = [
     "ErrorResponse",
     "Chart",
     "ChartConfig",
+    "ColumnarData",
     "DashboardMetadata"
 ]
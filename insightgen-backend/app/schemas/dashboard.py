@@ -1,6 +1,6 @@
 """Pydantic schemas for API request/response validation"""
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union, Literal
 
 
 class DashboardRequest(BaseModel):
@@ -12,6 +12,14 @@ class DashboardRequest(BaseModel):
         max_length=500,
         examples=["Show sales trends by category for last quarter"]
     )
+    response_format: Literal["rows", "columnar"] = Field(
+        default="rows",
+        description="Chart data layout: list of row objects, or column names plus per-column value arrays"
+    )
+    insight_mode: Literal["llm", "statistical"] = Field(
+        default="llm",
+        description="Insight engine: Gemini (statistical fallback when slow or failing), or statistical only"
+    )
 
 
 class ChartConfig(BaseModel):
@@ -22,12 +30,18 @@ class ChartConfig(BaseModel):
     aggregation: str = "none"
 
 
+class ColumnarData(BaseModel):
+    """Columnar chart data: column names plus one value array per column"""
+    columns: List[str]
+    values: Dict[str, List[Any]]
+
+
 class Chart(BaseModel):
     """Chart model"""
     id: str
     type: str = Field(..., description="Chart type: line, bar, pie, area, scatter")
     title: str
-    data: List[Dict[str, Any]]
+    data: Union[List[Dict[str, Any]], ColumnarData]
     config: ChartConfig
 
 
@@ -36,6 +50,42 @@ class DashboardMetadata(BaseModel):
     rows_returned: int
     execution_time_ms: float
     columns: List[str]
+    chart_rows: Optional[int] = Field(
+        default=None,
+        description="Rows in the chart data after chart-aware reduction"
+    )
+    viz_source: Optional[str] = Field(
+        default=None,
+        description="Where the chart config came from: rules, llm or default"
+    )
+    insight_source: Optional[str] = Field(
+        default=None,
+        description="Engine that produced the insights: llm or statistical"
+    )
+    reduction: Optional[str] = Field(
+        default=None,
+        description="Reduction applied to chart data: lttb, top_n_other, category_cap or stratified_sample"
+    )
+    cache_status: Optional[str] = Field(
+        default=None,
+        description="Result cache status: hit or miss"
+    )
+    row_limit: Optional[int] = Field(
+        default=None,
+        description="Tighter row limit applied by the cost guard to keep the query within budget"
+    )
+    rollup: Optional[str] = Field(
+        default=None,
+        description="Pre-aggregated rollup table the query was answered from, if any"
+    )
+    warnings: List[str] = Field(
+        default_factory=list,
+        description="Secondary stages that failed and fell back to defaults"
+    )
+    timings_ms: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Milliseconds per pipeline stage (sql, query, viz, insights, ...), query phase (query_database, ...) and in total"
+    )
 
 
 class DashboardResponse(BaseModel):
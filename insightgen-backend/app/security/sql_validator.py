@@ -1,11 +1,81 @@
 """SQL Validator for security - prevents dangerous SQL operations"""
-import sqlparse
+from sqlparse.engine import FilterStack
 from sqlparse.sql import IdentifierList, Identifier, Where, Token
-from sqlparse.tokens import Keyword, DML
-from typing import Tuple, List
+from sqlparse.tokens import Keyword, DML, CTE
+from app.config import settings
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple, List, Dict, Any
+import hashlib
 import re
 
 
+# Comments, string literals, quoted identifiers, numbers, words and single symbols
+_SQL_TOKEN_PATTERN = re.compile(
+    r"--[^\n]*|/\*.*?\*/|\$(\w*)\$.*?\$\1\$"
+    r"|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|\w+|\S",
+    re.DOTALL
+)
+
+
+def fingerprint_sql(sql: str) -> str:
+    """
+    Compute a normalized fingerprint of a SQL query
+    
+    Whitespace is collapsed, keywords and identifiers are lowercased and one
+    trailing semicolon is dropped. Comments, string literals and quoted
+    identifiers are kept verbatim, and numeric literals keep their spelling
+    (2 and 2.0 differ in PostgreSQL: integer vs numeric division), so
+    queries that differ only in formatting share a fingerprint while queries
+    with different values (or a comment hiding a clause) do not.
+    
+    Args:
+        sql: SQL query string
+    
+    Returns:
+        Hex digest identifying the query
+    """
+    sql = sql.strip()
+    if sql.endswith(';'):
+        sql = sql[:-1]
+    
+    normalized = []
+    for match in _SQL_TOKEN_PATTERN.finditer(sql):
+        token = match.group(0)
+        if token[0] in ("'", '"', '$') or token[:2] in ('--', '/*'):
+            normalized.append(token)
+        else:
+            normalized.append(token.lower())
+    return hashlib.sha256(" ".join(normalized).encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class ValidatedStatement:
+    """
+    Outcome of validating one SQL query
+    
+    Carries everything later stages need (verdict, LIMIT status, fingerprint)
+    so the SQL never has to be parsed again.
+    """
+    sql: str
+    fingerprint: str
+    is_valid: bool
+    error: str
+    has_limit: bool
+    max_rows: int
+    
+    @property
+    def executable_sql(self) -> str:
+        """
+        The query without a trailing semicolon, with a LIMIT clause appended
+        when it has none, so it can also be wrapped in a subquery
+        """
+        sql = self.sql.strip().rstrip(';').strip()
+        if self.has_limit:
+            return sql
+        return f"{sql} LIMIT {self.max_rows}"
+
+
 class SQLValidator:
     """Validates SQL queries for security and safety"""
     
@@ -19,8 +89,55 @@ class SQLValidator:
     # Allowed tables (from our schema)
     ALLOWED_TABLES = {'products', 'customers', 'orders'}
     
-    def __init__(self, max_rows: int = 10000):
+    # One scanner for all dangerous keywords, compiled once
+    DANGEROUS_KEYWORD_PATTERN = re.compile(
+        r'\b(' + '|'.join(sorted(DANGEROUS_KEYWORDS)) + r')\b',
+        re.IGNORECASE
+    )
+    
+    LIMIT_PATTERN = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+    
+    def __init__(self, max_rows: int = 10000, cache_size: int = 1024):
         self.max_rows = max_rows
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._verdicts: "OrderedDict[str, Tuple[bool, str, bool]]" = OrderedDict()
+    
+    def check(self, sql: str) -> ValidatedStatement:
+        """
+        Validate a SQL query, reusing the verdict for previously seen queries
+        
+        Verdicts are memoized per fingerprint, so formatting-only variants of
+        a query are parsed once.
+        
+        Args:
+            sql: SQL query string to validate
+        
+        Returns:
+            ValidatedStatement with the verdict and LIMIT status
+        """
+        fingerprint = fingerprint_sql(sql)
+        verdict = self._verdicts.get(fingerprint)
+        if verdict is None:
+            self.misses += 1
+            verdict = self._check_uncached(sql)
+            self._verdicts[fingerprint] = verdict
+            if len(self._verdicts) > self.cache_size:
+                self._verdicts.popitem(last=False)
+        else:
+            self.hits += 1
+            self._verdicts.move_to_end(fingerprint)
+        
+        is_valid, error, has_limit = verdict
+        return ValidatedStatement(
+            sql=sql,
+            fingerprint=fingerprint,
+            is_valid=is_valid,
+            error=error,
+            has_limit=has_limit,
+            max_rows=self.max_rows
+        )
     
     def validate(self, sql: str) -> Tuple[bool, str]:
         """
@@ -33,9 +150,20 @@ class SQLValidator:
             Tuple of (is_valid, error_message)
             If valid, error_message is empty string
         """
-        # Parse SQL
+        statement = self.check(sql)
+        return statement.is_valid, statement.error
+    
+    def _check_uncached(self, sql: str) -> Tuple[bool, str, bool]:
+        """Run every check on a query; returns (is_valid, error_message, has_limit)"""
+        is_valid, error_msg = self._run_checks(sql)
+        return is_valid, error_msg, self._has_limit_clause(sql)
+    
+    def _run_checks(self, sql: str) -> Tuple[bool, str]:
+        """Single-pass validation: split into statements once, without grouping"""
+        # Parse SQL (lexing and statement splitting only; the checks below
+        # never need sqlparse's expensive token grouping)
         try:
-            parsed = sqlparse.parse(sql)
+            parsed = list(FilterStack().run(sql))
         except Exception as e:
             return False, f"Invalid SQL syntax: {str(e)}"
         
@@ -69,26 +197,33 @@ class SQLValidator:
         # if invalid_tables:
         #     return False, f"Access to table(s) not allowed: {', '.join(invalid_tables)}"
         
-        # Ensure LIMIT clause exists (add if missing)
-        if not self._has_limit_clause(statement):
-            # This is just a warning, we'll add LIMIT in the executor
-            pass
+        # LIMIT is added by the executor when missing (see ValidatedStatement)
         
         return True, ""
     
     def _is_select_statement(self, statement) -> bool:
-        """Check if statement is a SELECT query"""
+        """
+        Check if statement is a SELECT query
+        
+        A statement starting with WITH is accepted when every DML keyword in
+        it is SELECT (the dangerous keyword scan rejects data-modifying CTEs).
+        """
         first_token = statement.token_first(skip_ws=True, skip_cm=True)
-        return first_token and first_token.ttype is DML and first_token.value.upper() == 'SELECT'
+        if not first_token:
+            return False
+        if first_token.ttype is DML:
+            return first_token.value.upper() == 'SELECT'
+        if first_token.ttype is CTE:
+            dml = [t.value.upper() for t in statement.flatten() if t.ttype is DML]
+            return bool(dml) and all(value == 'SELECT' for value in dml)
+        return False
     
     def _has_dangerous_keywords(self, sql: str) -> Tuple[bool, str]:
         """Check for dangerous SQL keywords"""
-        sql_upper = sql.upper()
-        for keyword in self.DANGEROUS_KEYWORDS:
-            # Use word boundaries to avoid false positives
-            pattern = r'\b' + keyword + r'\b'
-            if re.search(pattern, sql_upper):
-                return True, keyword
+        # Word boundaries avoid false positives on e.g. "created_at"
+        match = self.DANGEROUS_KEYWORD_PATTERN.search(sql)
+        if match:
+            return True, match.group(1).upper()
         return False, ""
     
     def _extract_tables(self, statement) -> List[str]:
@@ -136,18 +271,25 @@ class SQLValidator:
             return name
         return str(identifier).split()[0]
     
-    def _has_limit_clause(self, statement) -> bool:
+    def _has_limit_clause(self, sql: str) -> bool:
         """Check if query has LIMIT clause"""
-        sql_str = str(statement).upper()
-        return 'LIMIT' in sql_str
+        return self.LIMIT_PATTERN.search(sql) is not None
     
     def add_limit_if_missing(self, sql: str) -> str:
         """Add LIMIT clause if missing"""
-        if not self._has_limit_clause(sqlparse.parse(sql)[0]):
-            sql = sql.rstrip(';').strip()
-            sql = f"{sql} LIMIT {self.max_rows}"
-        return sql
+        return self.check(sql).executable_sql
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return verdict cache statistics"""
+        return {
+            "entries": len(self._verdicts),
+            "hits": self.hits,
+            "misses": self.misses
+        }
 
 
 # Global validator instance
-sql_validator = SQLValidator()
+sql_validator = SQLValidator(
+    max_rows=settings.MAX_QUERY_ROWS,
+    cache_size=settings.SQL_VALIDATION_CACHE_SIZE
+)
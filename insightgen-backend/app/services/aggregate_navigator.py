@@ -0,0 +1,457 @@
+"""
+Aggregate navigator - answer aggregate queries from the order rollups
+
+Rewrites a validated query over orders (optionally inner-joined to products
+and/or customers on their keys) onto the smallest rollup that holds every
+column it uses: the monthly rollup when order_date only appears truncated to
+months or coarser, otherwise the daily one. SUM, AVG and COUNT over orders
+become sums of the rollup totals. A query the rewriter does not fully
+understand is left alone, so a rewrite never changes what a query returns.
+"""
+from typing import Dict, List, Optional, Set, Tuple, Union
+import re
+
+
+_TOKEN_PATTERN = re.compile(
+    r"(?P<ws>\s+)"
+    r"|(?P<comment>--[^\n]*|/\*.*?\*/)"
+    r"|(?P<string>'(?:[^']|'')*')"
+    r"|(?P<quoted>\"(?:[^\"]|\"\")*\")"
+    r"|(?P<number>\d+(?:\.\d*)?(?:[eE][-+]?\d+)?|\.\d+)"
+    r"|(?P<word>[A-Za-z_][A-Za-z0-9_]*)"
+    r"|(?P<op>::|<=|>=|<>|!=|\|\||[(),.;*=<>+\-/%])"
+    r"|(?P<other>.)",
+    re.DOTALL
+)
+
+# Columns of the source tables, and the foreign key joining each to orders
+SOURCE_COLUMNS = {
+    "orders": {"order_id", "customer_id", "product_id", "order_date", "quantity", "revenue"},
+    "products": {"product_id", "product_name", "category", "price"},
+    "customers": {"customer_id", "customer_name", "region"},
+}
+JOIN_KEYS = {"products": "product_id", "customers": "customer_id"}
+
+# Order measures, only usable inside SUM/AVG
+MEASURES = {("orders", "revenue"): "revenue", ("orders", "quantity"): "quantity"}
+ROLLUP_MEASURES = {"order_count", "quantity", "revenue"}
+
+# Rollups from smallest to largest, with the rollup column per source column.
+# The monthly order_date column only serves month-or-coarser expressions.
+ROLLUPS = (
+    ("orders_monthly_rollup", {
+        ("orders", "order_date"): "month_start",
+        ("products", "category"): "category",
+        ("customers", "region"): "region",
+    }),
+    ("orders_daily_rollup", {
+        ("orders", "order_date"): "order_date",
+        ("orders", "product_id"): "product_id",
+        ("products", "product_id"): "product_id",
+        ("products", "product_name"): "product_name",
+        ("products", "category"): "category",
+        ("customers", "region"): "region",
+    }),
+)
+MONTHLY_ROLLUP = ROLLUPS[0][0]
+COARSE_DATE_UNITS = {"month", "quarter", "year"}
+
+KEYWORDS = {
+    "SELECT", "FROM", "WHERE", "GROUP", "BY", "HAVING", "ORDER", "ASC", "DESC",
+    "NULLS", "FIRST", "LAST", "LIMIT", "OFFSET", "AND", "OR", "NOT", "IN", "IS",
+    "NULL", "TRUE", "FALSE", "BETWEEN", "LIKE", "ILIKE", "CASE", "WHEN", "THEN",
+    "ELSE", "END", "AS", "ON", "JOIN", "INNER", "INTERVAL", "DATE", "TIMESTAMP",
+    "CURRENT_DATE", "CURRENT_TIMESTAMP", "ALL", "YEAR", "QUARTER", "MONTH",
+    "WEEK", "DAY", "DOW", "DOY", "ISODOW", "EPOCH",
+}
+
+# Constructs whose results could change when computed over rollup rows
+REFUSED_KEYWORDS = {
+    "WITH", "UNION", "INTERSECT", "EXCEPT", "OVER", "WINDOW", "DISTINCT",
+    "LEFT", "RIGHT", "FULL", "OUTER", "CROSS", "NATURAL", "USING", "LATERAL",
+    "FILTER", "WITHIN", "GROUPING", "ROLLUP", "CUBE", "SETS", "EXISTS",
+    "TABLESAMPLE",
+}
+
+FUNCTIONS = {
+    "sum", "avg", "count", "min", "max", "date_trunc", "extract", "date_part",
+    "to_char", "upper", "lower", "initcap", "coalesce", "nullif", "round",
+    "trunc", "abs", "ceil", "ceiling", "floor", "cast", "concat", "greatest",
+    "least", "trim", "length", "now",
+}
+
+CLAUSES_AFTER_FROM = {"WHERE", "GROUP", "HAVING", "ORDER", "LIMIT", "OFFSET"}
+
+Piece = Union[str, Tuple]
+
+
+def _tokenize(sql: str) -> List[Tuple[str, str]]:
+    """Split SQL into (kind, text) tokens"""
+    return [(match.lastgroup, match.group(0)) for match in _TOKEN_PATTERN.finditer(sql)]
+
+
+class _Unsupported(Exception):
+    """The query cannot be answered from a rollup"""
+
+
+class AggregateNavigator:
+    """Rewrite aggregate queries over orders onto the order rollups"""
+    
+    def rewrite(self, sql: str) -> Optional[Tuple[str, str]]:
+        """
+        Rewrite a query onto the smallest rollup that can answer it
+        
+        Args:
+            sql: Validated, executable SELECT statement
+        
+        Returns:
+            Tuple of (rewritten SQL, rollup table), or None when the query
+            must run against the source tables
+        """
+        try:
+            return _Rewrite(sql).run()
+        except _Unsupported:
+            return None
+
+
+class _Rewrite:
+    """State of rewriting one query"""
+    
+    def __init__(self, sql: str):
+        self.tokens = _tokenize(sql)
+        self.sig = [i for i, (kind, _) in enumerate(self.tokens) if kind != "ws"]
+        self.position = {index: n for n, index in enumerate(self.sig)}
+        self.names: Dict[str, str] = {}
+        self.output_aliases: Set[str] = set()
+        self.coarse: Set[int] = set()
+        self.depth: Dict[int, int] = {}
+    
+    def run(self) -> Tuple[str, str]:
+        self._check_structure()
+        from_start, from_end = self._from_clause()
+        self._parse_from(from_start, from_end)
+        self._find_output_aliases(from_start, from_end)
+        self._find_coarse_dates()
+        pieces, aggregated = self._rewrite_pieces(from_start, from_end)
+        
+        grouped = any(
+            self._upper(i) == "GROUP" and self.depth[i] == 0
+            for i in self.sig
+        )
+        if not aggregated and not grouped:
+            # Row-level queries return one row per order
+            raise _Unsupported()
+        
+        columns = [piece for piece in pieces if isinstance(piece, tuple) and piece[0] == "col"]
+        joined = set(self.names.values())
+        input_columns = set().union(*(SOURCE_COLUMNS[table] for table in joined))
+        for table, mapping in ROLLUPS:
+            if any(key not in mapping for _, key, _ in columns):
+                continue
+            if table == MONTHLY_ROLLUP and not all(
+                coarse for _, key, coarse in columns if key == ("orders", "order_date")
+            ):
+                continue
+            # GROUP BY resolves a bare name to an input column before an
+            # output alias, so an alias must not turn into a rollup column
+            rollup_columns = set(mapping.values()) | ROLLUP_MEASURES
+            if self.output_aliases & (rollup_columns - input_columns):
+                continue
+            return self._render(pieces, table, mapping), table
+        raise _Unsupported()
+    
+    # Parsing
+    
+    def _upper(self, index: int) -> str:
+        kind, value = self.tokens[index]
+        return value.upper() if kind == "word" else value
+    
+    def _next(self, index: int, offset: int = 1) -> Optional[int]:
+        """Index of the significant token offset places after index"""
+        n = self.position[index] + offset
+        return self.sig[n] if 0 <= n < len(self.sig) else None
+    
+    def _text(self, index: Optional[int]) -> str:
+        return self._upper(index) if index is not None else ""
+    
+    def _check_structure(self) -> None:
+        """Refuse anything but a single plain SELECT"""
+        if not self.sig or self._upper(self.sig[0]) != "SELECT":
+            raise _Unsupported()
+        selects = 0
+        for n, index in enumerate(self.sig):
+            kind, value = self.tokens[index]
+            if kind in ("comment", "quoted", "other"):
+                raise _Unsupported()
+            if value == ";" and n != len(self.sig) - 1:
+                raise _Unsupported()
+            upper = self._upper(index)
+            if upper in REFUSED_KEYWORDS:
+                raise _Unsupported()
+            selects += upper == "SELECT"
+        if selects != 1:
+            raise _Unsupported()
+        
+        depth = 0
+        for index in self.sig:
+            value = self.tokens[index][1]
+            if value == ")":
+                depth -= 1
+            self.depth[index] = depth
+            if value == "(":
+                depth += 1
+            if depth < 0:
+                raise _Unsupported()
+        if depth != 0:
+            raise _Unsupported()
+    
+    def _from_clause(self) -> Tuple[int, int]:
+        """Token range of the top-level FROM clause"""
+        start = next(
+            (i for i in self.sig if self._upper(i) == "FROM" and self.depth[i] == 0),
+            None
+        )
+        if start is None:
+            raise _Unsupported()
+        end = next(
+            (
+                i for i in self.sig
+                if i > start and self.depth[i] == 0
+                and (self._upper(i) in CLAUSES_AFTER_FROM or self._upper(i) == ";")
+            ),
+            len(self.tokens)
+        )
+        return start, end
+    
+    def _parse_from(self, start: int, end: int) -> None:
+        """Accept 'orders [AS] o [[INNER] JOIN products|customers [AS] x ON <key> = <key>]...'"""
+        items = [i for i in self.sig if start < i < end]
+        values = [self._upper(i) for i in items]
+        n = 0
+        
+        def take_table(allowed) -> str:
+            nonlocal n
+            if n >= len(values) or self.tokens[items[n]][0] != "word":
+                raise _Unsupported()
+            table = values[n].lower()
+            if table not in allowed or table in self.names.values():
+                raise _Unsupported()
+            n += 1
+            if n < len(values) and values[n] == "AS":
+                n += 1
+            alias = table
+            if n < len(values) and self.tokens[items[n]][0] == "word" \
+                    and values[n] not in ("INNER", "JOIN", "ON"):
+                alias = values[n].lower()
+                n += 1
+            if alias in self.names:
+                raise _Unsupported()
+            self.names[alias] = table
+            return table
+        
+        def take_ref() -> Tuple[str, str]:
+            nonlocal n
+            if values[n + 1:n + 2] != ["."]:
+                raise _Unsupported()
+            table = self.names.get(values[n].lower())
+            column = values[n + 2].lower() if n + 2 < len(values) else ""
+            if table is None:
+                raise _Unsupported()
+            n += 3
+            return table, column
+        
+        take_table({"orders"})
+        while n < len(values):
+            if values[n] == "INNER":
+                n += 1
+            if n >= len(values) or values[n] != "JOIN":
+                raise _Unsupported()
+            n += 1
+            table = take_table(JOIN_KEYS)
+            if n >= len(values) or values[n] != "ON":
+                raise _Unsupported()
+            n += 1
+            left = take_ref()
+            if n >= len(values) or values[n] != "=":
+                raise _Unsupported()
+            n += 1
+            right = take_ref()
+            key = JOIN_KEYS[table]
+            if {left, right} != {("orders", key), (table, key)}:
+                raise _Unsupported()
+    
+    def _find_output_aliases(self, from_start: int, from_end: int) -> None:
+        """Collect the select-list aliases ('AS name' at the top level)"""
+        for index in self.sig:
+            if from_start <= index < from_end or self._upper(index) != "AS":
+                continue
+            following = self._next(index)
+            if self.depth[index] == 0 and following is not None:
+                self.output_aliases.add(self.tokens[following][1].lower())
+    
+    def _find_coarse_dates(self) -> None:
+        """
+        Mark column tokens used only at month-or-coarser precision:
+        DATE_TRUNC('unit', col), DATE_PART('unit', col), EXTRACT(UNIT FROM col)
+        """
+        for index in self.sig:
+            name = self._upper(index)
+            if name not in ("DATE_TRUNC", "DATE_PART", "EXTRACT") or self._text(self._next(index)) != "(":
+                continue
+            unit = self._next(index, 2)
+            if unit is None:
+                continue
+            if name == "EXTRACT":
+                separator = "FROM"
+                unit_name = self.tokens[unit][1].lower()
+            else:
+                separator = ","
+                unit_name = self.tokens[unit][1].strip("'").lower()
+            if unit_name not in COARSE_DATE_UNITS or self._text(self._next(index, 3)) != separator:
+                continue
+            # Either a bare column or alias.column, then the closing paren
+            if self._text(self._next(index, 5)) == ")":
+                self.coarse.add(self._next(index, 4))
+            elif self._text(self._next(index, 5)) == "." and self._text(self._next(index, 7)) == ")":
+                self.coarse.add(self._next(index, 6))
+    
+    # Rewriting
+    
+    def _resolve(self, index: int) -> Tuple[Tuple[str, str], int]:
+        """
+        Resolve the column reference starting at index
+        
+        Returns:
+            ((table, column), index of the column token)
+        """
+        if self._text(self._next(index)) == ".":
+            table = self.names.get(self.tokens[index][1].lower())
+            column_index = self._next(index, 2)
+            if table is None or column_index is None or self.tokens[column_index][0] != "word":
+                raise _Unsupported()
+            column = self.tokens[column_index][1].lower()
+            if column not in SOURCE_COLUMNS[table]:
+                raise _Unsupported()
+            return (table, column), column_index
+        
+        column = self.tokens[index][1].lower()
+        tables = [table for table in self.names.values() if column in SOURCE_COLUMNS[table]]
+        if len(tables) != 1:
+            raise _Unsupported()
+        return (tables[0], column), index
+    
+    def _rewrite_aggregate(self, index: int) -> Tuple[str, int]:
+        """
+        Rewrite SUM/AVG/COUNT over orders into sums of rollup totals
+        
+        Returns:
+            (replacement SQL, index of the closing parenthesis)
+        """
+        name = self.tokens[index][1].lower()
+        open_paren = self._next(index)
+        close = next(
+            i for i in self.sig
+            if i > open_paren and self.depth[i] == self.depth[open_paren] and self.tokens[i][1] == ")"
+        )
+        args = [i for i in self.sig if open_paren < i < close]
+        arg_text = [self._upper(i) for i in args]
+        
+        if name == "count":
+            if arg_text not in (["*"], ["1"]):
+                if arg_text[:1] == ["*"] or len(args) not in (1, 3):
+                    raise _Unsupported()
+                key, _ = self._resolve(args[0])
+                if key != ("orders", "order_id") or (len(args) == 3 and arg_text[1] != "."):
+                    raise _Unsupported()
+            return "COALESCE(SUM(r.order_count), 0)::bigint", close
+        
+        if len(args) not in (1, 3) or (len(args) == 3 and arg_text[1] != "."):
+            raise _Unsupported()
+        key, _ = self._resolve(args[0])
+        measure = MEASURES.get(key)
+        if measure is None:
+            raise _Unsupported()
+        if name == "avg":
+            return f"(SUM(r.{measure})::numeric / NULLIF(SUM(r.order_count), 0))", close
+        if measure == "quantity":
+            return "SUM(r.quantity)::bigint", close
+        return "SUM(r.revenue)", close
+    
+    def _rewrite_pieces(self, from_start: int, from_end: int) -> Tuple[List[Piece], bool]:
+        """
+        Rewrite everything but the FROM clause
+        
+        Returns:
+            (pieces: SQL text, ("col", source column, coarse) references and
+            a ("from",) placeholder; whether the query aggregates)
+        """
+        pieces: List[Piece] = []
+        aggregated = False
+        index = 0
+        while index < len(self.tokens):
+            kind, value = self.tokens[index]
+            if index == from_start:
+                pieces.append(("from",))
+                index = from_end
+                continue
+            if kind != "word":
+                pieces.append(value)
+                index += 1
+                continue
+            
+            upper = value.upper()
+            previous = self.sig[self.position[index] - 1] if self.position[index] else None
+            following = self._text(self._next(index))
+            if previous is not None and self._upper(previous) in ("AS", "::"):
+                # Alias or type name
+                pieces.append(value)
+            elif upper in KEYWORDS:
+                pieces.append(value)
+            elif following == "(":
+                if value.lower() not in FUNCTIONS:
+                    raise _Unsupported()
+                if value.lower() in ("sum", "avg", "count"):
+                    replacement, close = self._rewrite_aggregate(index)
+                    aggregated = True
+                    pieces.append(replacement)
+                    # An unaliased COUNT/AVG keeps its output column name
+                    after = self._text(self._next(close))
+                    if (
+                        self.depth[index] == 0 and index < from_start
+                        and previous is not None and self._upper(previous) in ("SELECT", ",")
+                        and after in (",", "FROM") and value.lower() != "sum"
+                    ):
+                        pieces.append(f" AS {value.lower()}")
+                    index = close + 1
+                    continue
+                pieces.append(value)
+            elif following != "." and value.lower() in self.output_aliases:
+                if any(value.lower() in SOURCE_COLUMNS[table] for table in self.names.values()):
+                    # Ambiguous between an output alias and an input column
+                    raise _Unsupported()
+                pieces.append(value)
+            else:
+                key, column_index = self._resolve(index)
+                if key in MEASURES or key not in ROLLUPS[-1][1]:
+                    raise _Unsupported()
+                pieces.append(("col", key, column_index in self.coarse))
+                index = column_index + 1
+                continue
+            index += 1
+        return pieces, aggregated
+    
+    def _render(self, pieces: List[Piece], table: str, mapping: Dict[Tuple[str, str], str]) -> str:
+        """Join the pieces, pointing column references at the rollup"""
+        parts = []
+        for piece in pieces:
+            if isinstance(piece, str):
+                parts.append(piece)
+            elif piece[0] == "from":
+                parts.append(f"FROM {table} r ")
+            else:
+                parts.append(f"r.{mapping[piece[1]]}")
+        return "".join(parts).strip()
+
+
+# Global instance
+aggregate_navigator = AggregateNavigator()
@@ -0,0 +1,90 @@
+"""Cost guard - reject or limit queries whose EXPLAIN estimates are over budget"""
+from app.config import settings
+from app.services.slow_query_log import plan_nodes
+from typing import Any, Dict, Optional
+
+
+class QueryBudgetExceeded(ValueError):
+    """Raised when a query's estimated cost or join size is over budget"""
+
+
+class CostGuard:
+    """
+    Check EXPLAIN (FORMAT JSON) estimates before a query runs
+    
+    - A join estimated to produce more than max_join_rows rows is rejected;
+      it is almost always a missing join condition (a cartesian product).
+    - A query whose estimated total cost is over max_cost is rejected,
+      unless it streams rows out of a LIMIT: then a tighter LIMIT that fits
+      the budget is returned, as long as it keeps at least min_rows rows.
+    """
+    
+    def __init__(
+        self,
+        max_cost: float = 10_000_000.0,
+        max_join_rows: float = 100_000_000.0,
+        min_rows: int = 100
+    ):
+        self.max_cost = max_cost
+        self.max_join_rows = max_join_rows
+        self.min_rows = min_rows
+    
+    def check(self, plan: Dict[str, Any]) -> Optional[int]:
+        """
+        Check a plan against the budgets
+        
+        Args:
+            plan: Top plan node ("Plan" of EXPLAIN (FORMAT JSON) output)
+        
+        Returns:
+            A tighter row limit to apply, or None when the query fits
+        
+        Raises:
+            QueryBudgetExceeded: The query must not run
+        """
+        for node in plan_nodes(plan):
+            if "Join Type" in node and node["Plan Rows"] > self.max_join_rows:
+                raise QueryBudgetExceeded(
+                    f"Query rejected: a join is estimated to produce {node['Plan Rows']:,.0f} rows "
+                    f"(budget {self.max_join_rows:,.0f}); check the join conditions"
+                )
+        
+        cost = plan["Total Cost"]
+        if cost <= self.max_cost:
+            return None
+        
+        limit = self._limit_within_budget(plan)
+        if limit is None:
+            raise QueryBudgetExceeded(
+                f"Query rejected: estimated cost {cost:,.0f} exceeds the budget of "
+                f"{self.max_cost:,.0f}; narrow the date range or filters, or aggregate the data"
+            )
+        return limit
+    
+    def _limit_within_budget(self, plan: Dict[str, Any]) -> Optional[int]:
+        """
+        Largest LIMIT keeping a Limit plan within the cost budget
+        
+        The planner charges a Limit node its input's startup cost plus the
+        fraction of the input's run cost for the rows it takes, so the
+        fraction that fits the budget gives the row count.
+        """
+        if plan["Node Type"] != "Limit" or not plan.get("Plans"):
+            return None
+        source = plan["Plans"][0]
+        startup = source["Startup Cost"]
+        run_cost = source["Total Cost"] - startup
+        if startup >= self.max_cost or run_cost <= 0 or source["Plan Rows"] <= 0:
+            return None
+        rows = int(source["Plan Rows"] * (self.max_cost - startup) / run_cost)
+        if rows < self.min_rows:
+            return None
+        return rows
+
+
+# Global instance
+cost_guard = CostGuard(
+    max_cost=settings.QUERY_MAX_COST,
+    max_join_rows=settings.QUERY_MAX_JOIN_ROWS,
+    min_rows=settings.QUERY_MIN_LIMITED_ROWS
+)
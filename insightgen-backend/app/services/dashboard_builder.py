@@ -1,18 +1,254 @@
 """Dashboard builder service - orchestrates the entire dashboard generation pipeline"""
-from sqlalchemy.orm import Session
-from app.llm import sql_generator, viz_generator, insight_generator
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.db.query_result import QueryResult
+from app.llm import sql_generator, viz_generator, insight_generator, analysis_generator
+from app.metrics import metrics
 from app.services.query_executor import query_executor
-from typing import Dict, Any
+from app.services.downsampler import Downsampler
+from dataclasses import dataclass
+from typing import Dict, Any, List, Tuple, Callable, Awaitable, Optional, AsyncIterator
+import asyncio
+import time
 import uuid
 
 
+STAGE_SECONDS = metrics.histogram(
+    "insightgen_stage_duration_seconds",
+    "Dashboard pipeline stage duration (after its dependencies finished)",
+    ("stage", "outcome")
+)
+
+
+@dataclass
+class PipelineStage:
+    """
+    A node in the dashboard execution graph
+    
+    Attributes:
+        name: Unique stage name, also the key of its result
+        run: Coroutine function receiving the results of earlier stages
+        depends_on: Names of stages that must finish first
+        timeout: Per-stage timeout in seconds (None for no timeout)
+        fallback: Called with (results, error) when the stage fails; stages
+            without a fallback are required and abort the whole pipeline
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]
+    depends_on: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    fallback: Optional[Callable[[Dict[str, Any], BaseException], Any]] = None
+
+
+async def run_pipeline(
+    stages: List[PipelineStage],
+    on_stage_complete: Optional[Callable[[str, Any], None]] = None,
+    timings: Optional[Dict[str, float]] = None
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Run pipeline stages, starting each one as soon as its dependencies finish
+    
+    Independent stages run concurrently. Stages must be listed after the
+    stages they depend on.
+    
+    Args:
+        stages: Stages in dependency order
+        on_stage_complete: Optional callback invoked with (name, result) as
+            soon as each stage finishes
+        timings: Optional dict filled with each finished stage's duration
+            in milliseconds, from when its dependencies finished
+    
+    Returns:
+        Tuple of (results, warnings)
+        - results: Dict of stage name to stage result
+        - warnings: Messages for optional stages that fell back
+    """
+    results: Dict[str, Any] = {}
+    warnings: List[str] = []
+    tasks: Dict[str, asyncio.Task] = {}
+    
+    async def run_stage(stage: PipelineStage) -> Any:
+        if stage.depends_on:
+            await asyncio.gather(*(tasks[name] for name in stage.depends_on))
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            result = await asyncio.wait_for(stage.run(results), timeout=stage.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if stage.fallback is None:
+                STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage.name, outcome="error")
+                if isinstance(e, asyncio.TimeoutError):
+                    raise RuntimeError(
+                        f"Stage '{stage.name}' timed out after {stage.timeout}s"
+                    ) from e
+                raise
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            warnings.append(f"{stage.name} stage failed ({reason}); using fallback")
+            result = stage.fallback(results, e)
+            outcome = "fallback"
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage.name, outcome=outcome)
+        if timings is not None:
+            timings[stage.name] = round(elapsed * 1000, 2)
+        results[stage.name] = result
+        if on_stage_complete is not None:
+            on_stage_complete(stage.name, result)
+        return result
+    
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+    
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    
+    return results, warnings
+
+
 class DashboardBuilder:
     """Orchestrates dashboard generation from natural language query"""
     
-    def build_dashboard(
+    def __init__(self):
+        self.downsampler = Downsampler(
+            max_points=settings.CHART_MAX_POINTS,
+            max_pie_slices=settings.CHART_MAX_PIE_SLICES,
+            max_bar_categories=settings.CHART_MAX_BAR_CATEGORIES
+        )
+    
+    def _build_stages(
         self, 
-        db: Session, 
-        user_question: str
+        db: AsyncSession, 
+        user_question: str, 
+        insight_mode: str = "llm"
+    ) -> List[PipelineStage]:
+        """
+        Build the execution graph for one dashboard
+        
+        SQL generation and execution are required. Visualization and
+        insights only depend on the query results, so they run concurrently
+        and fall back to defaults on failure or timeout. With combined
+        analysis enabled (and LLM insights requested) a single analysis
+        stage produces both, and the viz and insights stages unpack it. The
+        chart stage reduces the rows to what the chosen chart type can
+        display.
+        """
+        combined = settings.COMBINED_ANALYSIS_ENABLED and insight_mode == "llm"
+        
+        async def generate_sql(results: Dict[str, Any]) -> str:
+            return await sql_generator.generate_sql(user_question)
+        
+        async def execute_query(results: Dict[str, Any]):
+            # Only SQL that validated and ran is reused for later questions
+            try:
+                result = await query_executor.execute_query(db, results["sql"])
+            except Exception:
+                sql_generator.forget(results["sql"])
+                raise
+            sql_generator.remember(user_question, results["sql"])
+            return result
+        
+        async def generate_viz(results: Dict[str, Any]) -> Dict[str, Any]:
+            data, _ = results["query"]
+            return await viz_generator.generate_viz_config(results["sql"], data)
+        
+        async def generate_insights(results: Dict[str, Any]) -> Tuple[List[str], str]:
+            data, _ = results["query"]
+            return await insight_generator.generate_insights_with_source(
+                user_question,
+                results["sql"],
+                data,
+                mode=insight_mode
+            )
+        
+        async def generate_analysis(results: Dict[str, Any]):
+            data, _ = results["query"]
+            return await analysis_generator.generate_analysis(
+                user_question,
+                results["sql"],
+                data
+            )
+        
+        async def analysis_viz(results: Dict[str, Any]) -> Dict[str, Any]:
+            return results["analysis"][0]
+        
+        async def analysis_insights(results: Dict[str, Any]) -> Tuple[List[str], str]:
+            return results["analysis"][1]
+        
+        async def reduce_chart_data(results: Dict[str, Any]):
+            data, _ = results["query"]
+            return self.downsampler.reduce(data, results["viz"])
+        
+        def default_viz(results: Dict[str, Any], error: BaseException) -> Dict[str, Any]:
+            data, metadata = results["query"]
+            return viz_generator.default_config(metadata["columns"], data.profile())
+        
+        def default_insights(results: Dict[str, Any], error: BaseException) -> Tuple[List[str], str]:
+            data, _ = results["query"]
+            return insight_generator.default_insights(data), "statistical"
+        
+        def default_analysis(results: Dict[str, Any], error: BaseException):
+            return default_viz(results, error), default_insights(results, error)
+        
+        def unreduced_chart_data(results: Dict[str, Any], error: BaseException):
+            data, _ = results["query"]
+            return data, None
+        
+        analysis_stages = [
+            PipelineStage(
+                name="analysis",
+                run=generate_analysis,
+                depends_on=("query",),
+                timeout=max(settings.VIZ_STAGE_TIMEOUT_SECONDS, settings.INSIGHT_STAGE_TIMEOUT_SECONDS),
+                fallback=default_analysis
+            )
+        ] if combined else []
+        
+        return [
+            PipelineStage(
+                name="sql",
+                run=generate_sql,
+                timeout=settings.SQL_STAGE_TIMEOUT_SECONDS
+            ),
+            PipelineStage(
+                name="query",
+                run=execute_query,
+                depends_on=("sql",)
+            ),
+            *analysis_stages,
+            PipelineStage(
+                name="viz",
+                run=analysis_viz if combined else generate_viz,
+                depends_on=("analysis",) if combined else ("query",),
+                timeout=settings.VIZ_STAGE_TIMEOUT_SECONDS,
+                fallback=default_viz
+            ),
+            PipelineStage(
+                name="chart",
+                run=reduce_chart_data,
+                depends_on=("query", "viz"),
+                fallback=unreduced_chart_data
+            ),
+            PipelineStage(
+                name="insights",
+                run=analysis_insights if combined else generate_insights,
+                depends_on=("analysis",) if combined else ("query",),
+                timeout=settings.INSIGHT_STAGE_TIMEOUT_SECONDS,
+                fallback=default_insights
+            )
+        ]
+    
+    async def build_dashboard(
+        self, 
+        db: AsyncSession, 
+        user_question: str, 
+        response_format: str = "rows", 
+        insight_mode: str = "llm"
     ) -> Dict[str, Any]:
         """
         Build complete dashboard from natural language question
@@ -20,51 +256,193 @@ class DashboardBuilder:
         Pipeline:
         1. Generate SQL from natural language
         2. Validate and execute SQL
-        3. Generate visualization config
-        4. Generate insights
+        3. Generate visualization config and insights concurrently
+        4. Reduce chart data for the chosen chart type
         5. Return complete dashboard JSON
         
         Args:
-            db: Database session
+            db: Async database session
             user_question: Natural language question from user
-            
+            response_format: Chart data layout, "rows" or "columnar"
+            insight_mode: "llm" or "statistical" (no LLM call for insights)
+        
         Returns:
             Complete dashboard configuration dictionary
         """
-        # Step 1: Generate SQL
-        sql_query = sql_generator.generate_sql(user_question)
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        
+        # Steps 1-4: Run the stage graph
+        results, warnings = await run_pipeline(
+            self._build_stages(db, user_question, insight_mode),
+            timings=timings
+        )
+        
+        # Step 5: Build dashboard response
+        assemble_start = time.perf_counter()
+        dashboard = self._assemble_dashboard(
+            user_question,
+            results,
+            warnings,
+            response_format
+        )
+        elapsed = time.perf_counter() - assemble_start
+        STAGE_SECONDS.observe(elapsed, stage="assemble", outcome="ok")
+        timings["assemble"] = round(elapsed * 1000, 2)
+        
+        timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+        dashboard["metadata"]["timings_ms"] = self._stage_timings(timings, results)
+        return dashboard
+    
+    async def stream_dashboard(
+        self, 
+        db: AsyncSession, 
+        user_question: str, 
+        chunk_size: int = 500, 
+        response_format: str = "rows", 
+        insight_mode: str = "llm"
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Build a dashboard, yielding events as each pipeline stage completes
         
-        # Step 2: Execute query
-        data, metadata = query_executor.execute_query(db, sql_query)
+        Events (name, payload):
+        - sql: {"sql": ...}
+        - metadata: query metadata, including columns
+        - rows: {"offset": ..., "rows": ...} in chunks of chunk_size, where
+          rows is a list of records or columnar data per response_format
+        - chart: chart config; data holds the reduced chart rows when the
+          chart type needed fewer points than the full result, else null
+        - insights: {"insights": [...], "source": "llm" | "statistical"}
+        - complete: {"dashboard_id": ..., "warnings": [...], "viz_source": ...,
+          "chart_rows": ..., "reduction": ...}
+        
+        Args:
+            db: Async database session
+            user_question: Natural language question from user
+            chunk_size: Number of rows per rows event
+            response_format: Row chunk layout, "rows" or "columnar"
+            insight_mode: "llm" or "statistical" (no LLM call for insights)
+        """
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        queue: asyncio.Queue = asyncio.Queue()
         
-        # Step 3: Generate visualization config
-        viz_config = viz_generator.generate_viz_config(sql_query, data)
+        def on_stage_complete(name: str, result: Any) -> None:
+            queue.put_nowait((name, result))
         
-        # Step 4: Generate insights
-        insights = insight_generator.generate_insights(
-            user_question, 
-            sql_query, 
-            data
+        pipeline = asyncio.ensure_future(
+            run_pipeline(
+                self._build_stages(db, user_question, insight_mode),
+                on_stage_complete,
+                timings
+            )
         )
+        pipeline.add_done_callback(lambda _: queue.put_nowait((None, None)))
+        
+        try:
+            while True:
+                name, result = await queue.get()
+                if name is None:
+                    break
+                if name == "sql":
+                    yield "sql", {"sql": result}
+                elif name == "query":
+                    data, metadata = result
+                    yield "metadata", metadata
+                    for offset in range(0, len(data), chunk_size):
+                        chunk = data.slice(offset, offset + chunk_size)
+                        yield "rows", {
+                            "offset": offset,
+                            "rows": self._format_data(chunk, response_format)
+                        }
+                elif name == "viz":
+                    viz_config = result
+                elif name == "chart":
+                    chart_data, reduction = result
+                    yield "chart", self._build_chart(
+                        viz_config,
+                        self._format_data(chart_data, response_format) if reduction else None
+                    )
+                elif name == "insights":
+                    insights, source = result
+                    yield "insights", {"insights": insights, "source": source}
+            
+            results, warnings = pipeline.result()
+            chart_data, reduction = results["chart"]
+            timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+            yield "complete", {
+                "dashboard_id": str(uuid.uuid4()),
+                "warnings": warnings,
+                "viz_source": results["viz"].get("source"),
+                "chart_rows": len(chart_data),
+                "reduction": reduction,
+                "timings_ms": self._stage_timings(timings, results)
+            }
+        finally:
+            if not pipeline.done():
+                pipeline.cancel()
+                await asyncio.gather(pipeline, return_exceptions=True)
+    
+    def _stage_timings(self, timings: Dict[str, float], results: Dict[str, Any]) -> Dict[str, float]:
+        """Stage timings plus the query stage's breakdown (validation, database, ...)"""
+        _, metadata = results["query"]
+        breakdown = {
+            f"query_{phase}": elapsed
+            for phase, elapsed in metadata.get("timings_ms", {}).items()
+        }
+        return {**timings, **breakdown}
+    
+    def _format_data(self, data: QueryResult, response_format: str) -> Any:
+        """Serialize query results in the requested layout"""
+        if response_format == "columnar":
+            return data.to_columnar()
+        return data.to_records()
+    
+    def _build_chart(
+        self, 
+        viz_config: Dict[str, Any], 
+        data: Any
+    ) -> Dict[str, Any]:
+        """Build the chart definition from a visualization config"""
+        return {
+            "id": "chart_1",
+            "type": viz_config.get("chart_type", "bar"),
+            "title": viz_config.get("title", "Data Visualization"),
+            "data": data,
+            "config": {
+                "x_axis": viz_config.get("x_axis"),
+                "y_axis": viz_config.get("y_axis"),
+                "group_by": viz_config.get("group_by"),
+                "aggregation": viz_config.get("aggregation", "none")
+            }
+        }
+    
+    def _assemble_dashboard(
+        self, 
+        user_question: str, 
+        results: Dict[str, Any], 
+        warnings: List[str], 
+        response_format: str = "rows"
+    ) -> Dict[str, Any]:
+        """Assemble the dashboard response from pipeline stage results"""
+        _, metadata = results["query"]
+        chart_data, reduction = results["chart"]
+        insights, insight_source = results["insights"]
+        metadata = {
+            **metadata,
+            "warnings": warnings,
+            "viz_source": results["viz"].get("source"),
+            "insight_source": insight_source,
+            "chart_rows": len(chart_data),
+            "reduction": reduction
+        }
         
-        # Step 5: Build dashboard response
         dashboard = {
             "dashboard_id": str(uuid.uuid4()),
             "query": user_question,
-            "sql": sql_query,
+            "sql": results["sql"],
             "charts": [
-                {
-                    "id": "chart_1",
-                    "type": viz_config.get("chart_type", "bar"),
-                    "title": viz_config.get("title", "Data Visualization"),
-                    "data": data,
-                    "config": {
-                        "x_axis": viz_config.get("x_axis"),
-                        "y_axis": viz_config.get("y_axis"),
-                        "group_by": viz_config.get("group_by"),
-                        "aggregation": viz_config.get("aggregation", "none")
-                    }
-                }
+                self._build_chart(results["viz"], self._format_data(chart_data, response_format))
             ],
             "insights": insights,
             "metadata": metadata
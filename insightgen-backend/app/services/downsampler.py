@@ -0,0 +1,226 @@
+"""Chart-aware reduction of query results before they are sent to the client"""
+from app.db.query_result import QueryResult
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+
+class Downsampler:
+    """
+    Reduce chart data to what the chart type can actually display
+    
+    - line / area: largest-triangle-three-buckets (LTTB) per series
+    - pie: top-N slices plus an aggregated "Other" slice
+    - bar: cap the number of categories, keeping the largest
+    - scatter: density-preserving grid-stratified sampling
+    """
+    
+    def __init__(
+        self,
+        max_points: int = 1000,
+        max_pie_slices: int = 10,
+        max_bar_categories: int = 50
+    ):
+        self.max_points = max_points
+        self.max_pie_slices = max_pie_slices
+        self.max_bar_categories = max_bar_categories
+    
+    def reduce(
+        self,
+        data: QueryResult,
+        viz_config: Dict[str, Any]
+    ) -> Tuple[QueryResult, Optional[str]]:
+        """
+        Reduce query results for the configured chart
+        
+        Args:
+            data: Full query results
+            viz_config: Visualization config (chart_type, x_axis, y_axis, group_by)
+        
+        Returns:
+            Tuple of (chart_data, method)
+            - chart_data: Reduced results (the input when no reduction applies)
+            - method: Name of the reduction applied, or None
+        """
+        chart_type = viz_config.get("chart_type", "bar")
+        x_axis = viz_config.get("x_axis")
+        y_axis = viz_config.get("y_axis")
+        group_by = viz_config.get("group_by")
+        if group_by not in data.columns:
+            group_by = None
+        
+        if x_axis not in data.columns:
+            return data, None
+        has_numeric_y = y_axis in data.columns and data.is_numeric(y_axis)
+        
+        if chart_type in ("line", "area"):
+            if len(data) > self.max_points and has_numeric_y:
+                return self._lttb(data, x_axis, y_axis, group_by), "lttb"
+        elif chart_type == "pie":
+            if len(data) > self.max_pie_slices and has_numeric_y:
+                return self._top_n_other(data, x_axis, y_axis), "top_n_other"
+        elif chart_type == "bar":
+            reduced = self._cap_categories(data, x_axis, y_axis if has_numeric_y else None)
+            if reduced is not None:
+                return reduced, "category_cap"
+        elif chart_type == "scatter":
+            if len(data) > self.max_points:
+                return self._stratified_sample(data, x_axis, y_axis if has_numeric_y else None), "stratified_sample"
+        
+        return data, None
+    
+    def _x_values(self, data: QueryResult, x_axis: str) -> np.ndarray:
+        """Return the x column as float64 (dates as day/second offsets, text as position)"""
+        kind = data.column_kind(x_axis)
+        array = data.array(x_axis)
+        if kind in ("date", "datetime"):
+            return array.astype("datetime64[s]").astype(np.float64)
+        if data.is_numeric(x_axis):
+            return array.astype(np.float64)
+        return np.arange(len(data), dtype=np.float64)
+    
+    def _lttb(
+        self,
+        data: QueryResult,
+        x_axis: str,
+        y_axis: str,
+        group_by: Optional[str]
+    ) -> QueryResult:
+        """Largest-triangle-three-buckets downsampling, per series when grouped"""
+        x = self._x_values(data, x_axis)
+        y = np.nan_to_num(data.array(y_axis).astype(np.float64))
+        
+        if group_by is None:
+            series = [np.arange(len(data))]
+        else:
+            groups = data.array(group_by)
+            _, inverse = np.unique(groups.astype(str), return_inverse=True)
+            series = [np.flatnonzero(inverse == g) for g in range(inverse.max() + 1)]
+        
+        keep: List[np.ndarray] = []
+        for indices in series:
+            target = max(3, self.max_points * len(indices) // len(data))
+            order = indices[np.argsort(x[indices], kind="stable")]
+            keep.append(order[_lttb_indices(x[order], y[order], target)])
+        
+        return data.take(np.sort(np.concatenate(keep)).tolist())
+    
+    def _top_n_other(self, data: QueryResult, x_axis: str, y_axis: str) -> QueryResult:
+        """Aggregate by slice label, keep the largest N-1 and fold the rest into Other"""
+        labels = data.array(x_axis).astype(str)
+        values = np.nan_to_num(data.array(y_axis).astype(np.float64))
+        unique, inverse = np.unique(labels, return_inverse=True)
+        totals = np.bincount(inverse, weights=values, minlength=len(unique))
+        
+        order = np.argsort(-totals, kind="stable")
+        if len(unique) <= self.max_pie_slices:
+            top, rest = order, order[:0]
+        else:
+            top, rest = order[:self.max_pie_slices - 1], order[self.max_pie_slices - 1:]
+        
+        slice_labels = [str(unique[i]) for i in top]
+        slice_values = [float(totals[i]) for i in top]
+        if len(rest):
+            slice_labels.append("Other")
+            slice_values.append(float(totals[rest].sum()))
+        
+        return QueryResult([x_axis, y_axis], [slice_labels, slice_values])
+    
+    def _cap_categories(
+        self,
+        data: QueryResult,
+        x_axis: str,
+        y_axis: Optional[str]
+    ) -> Optional[QueryResult]:
+        """Keep the rows of the largest categories; None when already under the cap"""
+        labels = data.array(x_axis).astype(str)
+        unique, first_seen, inverse = np.unique(labels, return_index=True, return_inverse=True)
+        if len(unique) <= self.max_bar_categories:
+            return None
+        
+        if y_axis is not None:
+            values = np.abs(np.nan_to_num(data.array(y_axis).astype(np.float64)))
+            totals = np.bincount(inverse, weights=values, minlength=len(unique))
+            kept = np.argsort(-totals, kind="stable")[:self.max_bar_categories]
+        else:
+            kept = np.argsort(first_seen, kind="stable")[:self.max_bar_categories]
+        
+        mask = np.isin(inverse, kept)
+        return data.take(np.flatnonzero(mask).tolist())
+    
+    def _stratified_sample(
+        self,
+        data: QueryResult,
+        x_axis: str,
+        y_axis: Optional[str]
+    ) -> QueryResult:
+        """
+        Sample points through a 2D grid, keeping at least one point per
+        occupied cell so sparse regions and outliers survive
+        """
+        n = len(data)
+        x = self._x_values(data, x_axis)
+        y = (
+            np.nan_to_num(data.array(y_axis).astype(np.float64))
+            if y_axis is not None else np.zeros(n)
+        )
+        
+        bins = max(1, int(np.sqrt(self.max_points)))
+        cells = _bin(x, bins) * bins + _bin(y, bins)
+        order = np.argsort(cells, kind="stable")
+        sorted_cells = cells[order]
+        starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+        counts = np.diff(np.r_[starts, n])
+        
+        # Allocate the budget proportionally, with one point minimum per cell
+        quota = np.maximum(1, np.floor(counts * self.max_points / n)).astype(int)
+        keep = []
+        for start, count, q in zip(starts, counts, quota):
+            step = count / q
+            keep.extend(order[start + (np.arange(q) * step).astype(int)])
+        
+        return data.take(sorted(keep))
+
+
+def _bin(values: np.ndarray, bins: int) -> np.ndarray:
+    """Assign each value to one of `bins` equal-width bins"""
+    low, high = values.min(), values.max()
+    if high <= low:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - low) / (high - low) * bins).astype(np.int64), bins - 1)
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select point indices with the largest-triangle-three-buckets algorithm
+    
+    Always keeps the first and last point; each intermediate bucket keeps
+    the point forming the largest triangle with the previously selected
+    point and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs(
+            (x[previous] - avg_x) * (bucket_y - y[previous])
+            - (x[previous] - bucket_x) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    
+    return selected
@@ -1,60 +1,149 @@
 """Query executor service - safely executes SQL queries"""
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, bindparam
 from app.config import settings
+from app.db.async_session import cancel_engine
+from app.db.query_result import QueryResult
+from app.metrics import metrics
 from app.security import sql_validator
-from typing import List, Dict, Any, Tuple
+from app.services.aggregate_navigator import aggregate_navigator
+from app.services.cost_guard import cost_guard, QueryBudgetExceeded
+from app.services.result_cache import ResultCache
+from app.services.rollups import rollup_manager
+from app.services.slow_query_log import slow_query_log, is_statement_timeout
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import json
 import time
 
 
+# Modification counters used as per-table data versions
+TABLE_CHANGES_SQL = text(
+    "SELECT relname, n_tup_ins + n_tup_upd + n_tup_del AS changes "
+    "FROM pg_stat_user_tables WHERE relname IN :tables"
+).bindparams(bindparam("tables", expanding=True))
+
+QUERY_PHASE_SECONDS = metrics.histogram(
+    "insightgen_query_phase_duration_seconds",
+    "Query execution phase duration",
+    ("phase",)
+)
+
+
+class _PhaseTimer:
+    """Split one query execution into consecutive timed phases"""
+    
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._last = time.perf_counter()
+    
+    def mark(self, phase: str) -> None:
+        """End a phase: record the time since the previous mark"""
+        now = time.perf_counter()
+        QUERY_PHASE_SECONDS.observe(now - self._last, phase=phase)
+        self.timings[phase] = round((now - self._last) * 1000, 2)
+        self._last = now
+
+
 class QueryExecutor:
     """Execute SQL queries safely with timeout and row limits"""
     
     def __init__(self):
         self.timeout = settings.QUERY_TIMEOUT_SECONDS
         self.max_rows = settings.MAX_QUERY_ROWS
+        self.result_cache = ResultCache(
+            tables=sql_validator.ALLOWED_TABLES,
+            max_bytes=settings.RESULT_CACHE_MAX_BYTES
+        ) if settings.RESULT_CACHE_ENABLED else None
+        self._versions_checked_at = 0.0
     
-    def execute_query(
+    async def execute_query(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         sql: str
-    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    ) -> Tuple[QueryResult, Dict[str, Any]]:
         """
         Execute SQL query and return results with metadata
         
         Args:
-            db: Database session
+            db: Async database session
             sql: SQL query to execute
-            
+        
         Returns:
             Tuple of (results, metadata)
-            - results: List of dictionaries (rows)
-            - metadata: Dict with execution info
+            - results: Columnar QueryResult
+            - metadata: Dict with execution info, including per-phase
+              timings_ms (validation, cache, rewrite, guard, database,
+              conversion)
+        
+        Raises:
+            ValueError: The SQL is invalid, or over the cost guard's budget
+            RuntimeError: The query failed
         """
-        # Validate SQL
-        is_valid, error_msg = sql_validator.validate(sql)
-        if not is_valid:
-            raise ValueError(f"SQL validation failed: {error_msg}")
+        timer = _PhaseTimer()
+        
+        # Validate SQL (parsed once, verdict memoized per fingerprint)
+        statement = sql_validator.check(sql)
+        timer.mark("validation")
+        if not statement.is_valid:
+            raise ValueError(f"SQL validation failed: {statement.error}")
         
         # Add LIMIT if missing
-        sql = sql_validator.add_limit_if_missing(sql)
+        sql = statement.executable_sql
         
         # Execute query with timing
         start_time = time.time()
+        executed_sql = sql
+        database_start = None
         
         try:
-            # Set statement timeout
-            db.execute(text(f"SET statement_timeout = {self.timeout * 1000}"))
+            # Serve repeated queries from the result cache
+            if self.result_cache is not None:
+                await self._refresh_table_versions(db)
+                cached = self.result_cache.get(sql, statement.fingerprint)
+                timer.mark("cache")
+                if cached is not None:
+                    data, metadata = cached
+                    execution_time = (time.time() - start_time) * 1000
+                    return data, {
+                        **metadata,
+                        "execution_time_ms": round(execution_time, 2),
+                        "cache_status": "hit",
+                        "timings_ms": timer.timings
+                    }
+            
+            # Answer from a pre-aggregated rollup when one covers the query
+            executed_sql, rollup, row_limit = sql, None, None
+            if settings.ROLLUPS_ENABLED:
+                rewrite = aggregate_navigator.rewrite(sql)
+                if rewrite is not None and await rollup_manager.is_fresh():
+                    executed_sql, rollup = rewrite
+                timer.mark("rewrite")
+            
+            # Pooled connections already default to read-only transactions
+            # and QUERY_TIMEOUT_SECONDS (see app.db.async_session)
+            database_start = time.perf_counter()
             
-            # Execute query
-            result = db.execute(text(sql))
+            # Fail fast on queries the planner expects to be too expensive,
+            # or cap their rows when a tighter LIMIT brings them in budget
+            if settings.QUERY_COST_GUARD_ENABLED:
+                row_limit = await self._check_cost(db, executed_sql)
+                if row_limit is not None:
+                    # Own line for the paren: a trailing comment must not swallow it
+                    executed_sql = f"SELECT * FROM ({executed_sql}\n) AS limited LIMIT {row_limit}"
+                timer.mark("guard")
+            
+            # Execute query (cancelled on the server if this task is cancelled)
+            result = await self._execute_cancellable(db, executed_sql)
             
             # Fetch results
             rows = result.fetchall()
+            timer.mark("database")
             
-            # Convert to list of dictionaries
-            columns = result.keys()
-            data = [dict(zip(columns, row)) for row in rows]
+            # Convert to columnar result
+            columns = list(result.keys())
+            data = QueryResult.from_rows(columns, rows)
+            timer.mark("conversion")
             
             # Calculate execution time
             execution_time = (time.time() - start_time) * 1000  # Convert to ms
@@ -63,13 +152,115 @@ class QueryExecutor:
             metadata = {
                 "rows_returned": len(data),
                 "execution_time_ms": round(execution_time, 2),
-                "columns": list(columns)
+                "columns": columns
             }
+            if rollup is not None:
+                metadata["rollup"] = rollup
+            if row_limit is not None:
+                metadata["row_limit"] = row_limit
             
-            return data, metadata
+            if self.result_cache is not None:
+                self.result_cache.set(sql, data, metadata, statement.fingerprint)
+                metadata = {**metadata, "cache_status": "miss"}
+            metadata = {**metadata, "timings_ms": timer.timings}
             
+            if settings.SLOW_QUERY_LOG_ENABLED:
+                slow_query_log.observe(
+                    statement.fingerprint,
+                    sql,
+                    executed_sql,
+                    timer.timings["database"],
+                    rows=len(data)
+                )
+            
+            return data, metadata
+        
+        except QueryBudgetExceeded:
+            raise
         except Exception as e:
+            if settings.SLOW_QUERY_LOG_ENABLED and database_start is not None and is_statement_timeout(e):
+                slow_query_log.observe(
+                    statement.fingerprint,
+                    sql,
+                    executed_sql,
+                    (time.perf_counter() - database_start) * 1000,
+                    timed_out=True
+                )
             raise RuntimeError(f"Query execution failed: {str(e)}")
+    
+    async def _execute_cancellable(self, db: AsyncSession, sql: str):
+        """
+        Execute a query, cancelling it on the server if the caller is cancelled
+        
+        Cancelling the task awaiting the driver would make SQLAlchemy discard
+        the connection mid-query. Instead the query runs in a task of its own
+        and, when the caller is cancelled (e.g. the client disconnected), its
+        backend is sent pg_cancel_backend. The query then fails as any other
+        cancelled statement would, and the connection goes back to the pool
+        when the session closes.
+        
+        The backend pid is read before the query starts: the session must
+        not be used while the query task is running.
+        """
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        pid = raw.driver_connection.get_server_pid()
+        
+        query = asyncio.ensure_future(db.execute(text(sql)))
+        try:
+            return await asyncio.shield(query)
+        except asyncio.CancelledError:
+            cleanup = asyncio.ensure_future(self._cancel_backend(pid, query))
+            while not cleanup.done():
+                try:
+                    await asyncio.shield(cleanup)
+                except asyncio.CancelledError:
+                    pass
+            raise
+    
+    async def _cancel_backend(self, pid: int, query: asyncio.Future) -> None:
+        """Cancel the query running on a backend and wait for it to stop"""
+        if not query.done():
+            try:
+                async with cancel_engine.connect() as conn:
+                    cancelled = (await conn.execute(
+                        text("SELECT pg_cancel_backend(:pid)"), {"pid": pid}
+                    )).scalar()
+                if not cancelled:
+                    print(f"Could not cancel query on backend {pid}: no such backend")
+            except Exception as e:
+                print(f"Could not cancel query on backend {pid}: {e}")
+                query.cancel()
+        await asyncio.gather(query, return_exceptions=True)
+    
+    async def _check_cost(self, db: AsyncSession, sql: str) -> Optional[int]:
+        """
+        EXPLAIN a query and check its estimates against the cost guard
+        
+        Returns:
+            A tighter row limit to apply, or None
+        
+        Raises:
+            QueryBudgetExceeded: The query is over budget
+        """
+        raw = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+        plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+        return cost_guard.check(plan)
+    
+    async def _refresh_table_versions(self, db: AsyncSession) -> None:
+        """Refresh per-table data versions at most once per check interval"""
+        now = time.monotonic()
+        if now - self._versions_checked_at < settings.RESULT_CACHE_VERSION_CHECK_SECONDS:
+            return
+        self._versions_checked_at = now
+        
+        result = await db.execute(
+            TABLE_CHANGES_SQL,
+            {"tables": list(self.result_cache.tables)}
+        )
+        self.result_cache.update_change_counts(
+            {row.relname: int(row.changes or 0) for row in result}
+        )
 
 
 # Global instance
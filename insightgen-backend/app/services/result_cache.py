@@ -0,0 +1,132 @@
+"""Result-set cache for executed SQL queries"""
+from app.db.query_result import QueryResult
+from app.security.sql_validator import fingerprint_sql
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Iterable
+import re
+
+
+def referenced_tables(sql: str, tables: Iterable[str]) -> Tuple[str, ...]:
+    """Return which of the given tables a query mentions"""
+    words = set(re.findall(r"\w+", sql.lower()))
+    return tuple(sorted(t for t in tables if t in words))
+
+
+class ResultCache:
+    """
+    LRU cache of query results with a byte-size budget
+    
+    Each entry records the data version of every table its query reads.
+    A table's version combines an external change counter (the
+    pg_stat_user_tables modification count) with a local bump counter, and
+    any change invalidates all entries that depend on it.
+    """
+    
+    def __init__(self, tables: Iterable[str], max_bytes: int = 64 * 1024 * 1024):
+        self.tables = tuple(tables)
+        self.max_bytes = max_bytes
+        self._change_counts: Dict[str, int] = {table: 0 for table in self.tables}
+        self._bumps: Dict[str, int] = {table: 0 for table in self.tables}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    def get(
+        self,
+        sql: str,
+        fingerprint: Optional[str] = None
+    ) -> Optional[Tuple[QueryResult, Dict[str, Any]]]:
+        """
+        Look up cached results for a query
+        
+        Args:
+            sql: SQL query (after LIMIT has been applied)
+            fingerprint: Precomputed fingerprint (e.g. from validation)
+        
+        Returns:
+            Tuple of (results, metadata), or None on a miss
+        """
+        key = fingerprint or fingerprint_sql(sql)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        if any(self.table_version(t) != v for t, v in entry["versions"].items()):
+            self._remove(key)
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry["data"], entry["metadata"]
+    
+    def set(
+        self,
+        sql: str,
+        data: QueryResult,
+        metadata: Dict[str, Any],
+        fingerprint: Optional[str] = None
+    ) -> None:
+        """Store query results, evicting least recently used entries to fit"""
+        size = data.estimated_size()
+        if size > self.max_bytes:
+            return
+        
+        key = fingerprint or fingerprint_sql(sql)
+        self._remove(key)
+        tables = referenced_tables(sql, self.tables)
+        self._entries[key] = {
+            "data": data,
+            "metadata": metadata,
+            "size": size,
+            "versions": {t: self.table_version(t) for t in tables}
+        }
+        self.current_bytes += size
+        
+        while self.current_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+    
+    def table_version(self, table: str) -> Tuple[int, int]:
+        """Return the current data version of a table"""
+        return self._change_counts[table], self._bumps[table]
+    
+    def update_change_counts(self, counts: Dict[str, int]) -> None:
+        """Record table modification counts (e.g. from pg_stat_user_tables)"""
+        for table, count in counts.items():
+            if table in self._change_counts:
+                self._change_counts[table] = count
+    
+    def invalidate_table(self, table: str) -> None:
+        """Bump a table's data version, invalidating dependent entries"""
+        if table in self._bumps:
+            self._bumps[table] += 1
+    
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        self._entries.clear()
+        self.current_bytes = 0
+    
+    def reset_tables(self, tables: Iterable[str]) -> None:
+        """Track a new set of tables (after a schema change) and drop all entries"""
+        self.tables = tuple(tables)
+        self._change_counts = {table: self._change_counts.get(table, 0) for table in self.tables}
+        self._bumps = {table: self._bumps.get(table, 0) for table in self.tables}
+        self.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache statistics"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+    
+    def _remove(self, key: str) -> None:
+        """Remove an entry and release its budget"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry["size"]
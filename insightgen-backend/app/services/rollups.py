@@ -0,0 +1,88 @@
+"""Keep the order rollups refreshed and track whether they are current"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.config import settings
+from app.db.async_session import async_engine
+from app.db.rollups import ROLLUP_NAME, SOURCE_CHANGES_SQL, STATE_SQL, refresh_rollups
+from typing import Dict, Any, Optional
+import asyncio
+import time
+
+
+class RollupManager:
+    """Refresh the rollups and tell whether they match the source tables"""
+    
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        check_interval: float = 5.0,
+        timeout: int = 3600,
+        rescan_ids: int = 10000
+    ):
+        self.engine = engine
+        self.check_interval = check_interval
+        self.timeout = timeout
+        self.rescan_ids = rescan_ids
+        self._fresh = False
+        self._checked_at = 0.0
+    
+    async def refresh(self, full: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Refresh the rollups in their own transaction
+        
+        Args:
+            full: Rebuild from scratch
+        
+        Returns:
+            Refresh summary (see refresh_rollups), None if skipped or failed
+        """
+        try:
+            async with self.engine.begin() as conn:
+                # API connections default to read-only transactions and the
+                # query timeout, both wrong for a refresh
+                await conn.execute(text("SET TRANSACTION READ WRITE"))
+                await conn.execute(text(f"SET LOCAL statement_timeout = {int(self.timeout * 1000)}"))
+                summary = await conn.run_sync(refresh_rollups, full, self.rescan_ids)
+        except Exception as e:
+            print(f"Rollup refresh failed: {e}")
+            return None
+        self._checked_at = 0.0
+        return summary
+    
+    async def is_fresh(self) -> bool:
+        """
+        Whether the rollups reflect every change to the source tables
+        
+        Re-checked at most once per check interval, on a connection of its
+        own so callers' transactions are untouched.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._fresh
+        self._checked_at = now
+        
+        try:
+            async with self.engine.connect() as conn:
+                changes = (await conn.execute(SOURCE_CHANGES_SQL)).one().changes
+                state = (await conn.execute(STATE_SQL, {"name": ROLLUP_NAME})).one_or_none()
+            self._fresh = state is not None and int(changes) == state.source_changes
+        except Exception as e:
+            print(f"Rollup freshness check failed: {e}")
+            self._fresh = False
+        return self._fresh
+
+
+async def refresh_rollups_periodically(interval: float) -> None:
+    """Refresh the rollups every interval seconds (cheap when nothing changed)"""
+    while True:
+        await rollup_manager.refresh()
+        await asyncio.sleep(interval)
+
+
+# Global instance
+rollup_manager = RollupManager(
+    async_engine,
+    check_interval=settings.ROLLUP_FRESHNESS_CHECK_SECONDS,
+    timeout=settings.ROLLUP_REFRESH_TIMEOUT_SECONDS,
+    rescan_ids=settings.ROLLUP_RESCAN_IDS
+)
@@ -0,0 +1,67 @@
+"""Keep schema-dependent components in sync with the live database schema"""
+from app.db.async_session import async_engine
+from app.db.schema_context import schema_context_builder
+from app.db.schema_introspector import schema_introspector
+from app.db.schema_loader import set_schema_metadata
+from app.llm import sql_generator
+from app.security import sql_validator
+from app.services.query_executor import query_executor
+from typing import Dict, Any, Optional
+import asyncio
+
+
+_applied_metadata: Optional[Dict[str, Any]] = None
+
+
+def apply_schema(metadata: Dict[str, Any]) -> None:
+    """
+    Point every schema consumer at new metadata
+    
+    Args:
+        metadata: Schema metadata in the SCHEMA_METADATA shape
+    """
+    global _applied_metadata
+    _applied_metadata = metadata
+    tables = set(metadata["tables"])
+    previous_version = schema_context_builder.schema_version
+    
+    set_schema_metadata(metadata)
+    schema_context_builder.load(metadata)
+    sql_validator.ALLOWED_TABLES = tables
+    # New statistics alone leave cached results valid
+    redefined = schema_context_builder.schema_version != previous_version
+    if query_executor.result_cache is not None and redefined:
+        query_executor.result_cache.reset_tables(tables)
+    if sql_generator.cache is not None:
+        sql_generator.cache.load_schema(metadata)
+
+
+async def refresh_schema() -> bool:
+    """
+    Introspect the database (incrementally) and apply the schema if it changed
+    
+    Falls back to the on-disk schema cache, and failing that to the static
+    schema, when the database cannot be introspected.
+    
+    Returns:
+        True if a new schema was applied
+    """
+    try:
+        await schema_introspector.refresh(async_engine)
+    except Exception as e:
+        print(f"Schema introspection failed: {e}")
+        if schema_introspector.metadata is None:
+            schema_introspector.load_cached()
+    
+    metadata = schema_introspector.metadata
+    if metadata is None or metadata is _applied_metadata or not metadata["tables"]:
+        return False
+    apply_schema(metadata)
+    return True
+
+
+async def refresh_schema_periodically(interval: float) -> None:
+    """Re-check table signatures every interval seconds (cheap when nothing changed)"""
+    while True:
+        await asyncio.sleep(interval)
+        await refresh_schema()
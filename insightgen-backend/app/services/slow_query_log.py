@@ -0,0 +1,245 @@
+"""Slow-query log - timing, rows and EXPLAIN plans of slow or timed-out queries"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.config import settings
+from app.db.async_session import async_engine
+from collections import deque
+from typing import Dict, Any, List, Optional
+import asyncio
+import json
+import os
+import random
+import time
+
+
+# PostgreSQL query_canceled, raised when statement_timeout expires
+QUERY_CANCELED_SQLSTATE = "57014"
+
+ORDERINGS = ("total_ms", "max_ms", "mean_ms", "calls")
+
+
+def is_statement_timeout(error: BaseException) -> bool:
+    """Whether a database error was a statement timeout"""
+    orig = getattr(error, "orig", error)
+    if getattr(orig, "sqlstate", None) == QUERY_CANCELED_SQLSTATE:
+        return True
+    return "statement timeout" in str(error)
+
+
+def plan_nodes(plan: Dict[str, Any]):
+    """Yield every node of an EXPLAIN (FORMAT JSON) plan tree"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def summarize_plan(plan: Dict[str, Any]) -> List[str]:
+    """One line per scan or join node, e.g. 'Seq Scan on orders'"""
+    lines = []
+    for node in plan_nodes(plan):
+        line = node["Node Type"]
+        if "Index Name" in node:
+            line += f" using {node['Index Name']}"
+        if "Relation Name" in node:
+            line += f" on {node['Relation Name']}"
+        if "Relation Name" in node or "Join Type" in node:
+            lines.append(line)
+    return lines
+
+
+class SlowQueryLog:
+    """
+    Bounded on-disk log of slow and timed-out queries
+    
+    A query slower than the threshold is logged with its fingerprint,
+    timing and row count. A sample of slow queries (sample_rate) is
+    re-run under EXPLAIN (ANALYZE, BUFFERS) to capture the actual plan; a
+    timed-out query gets a plain EXPLAIN, since running it again would time
+    out too. Plans are captured in the background on a connection of their
+    own, one at a time, so the request that was slow is not delayed further.
+    
+    The log is a JSON-lines file holding the latest max_entries entries.
+    """
+    
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        path: str,
+        threshold_ms: float = 1000.0,
+        sample_rate: float = 0.1,
+        max_entries: int = 1000,
+        explain_timeout_ms: int = 30000
+    ):
+        self.engine = engine
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.max_entries = max_entries
+        self.explain_timeout_ms = explain_timeout_ms
+        self._entries: deque = deque(maxlen=max_entries)
+        self._file_entries = 0
+        self._capture: Optional[asyncio.Task] = None
+        self._random = random.Random()
+        self.load()
+    
+    def load(self) -> int:
+        """
+        (Re)load the log from disk
+        
+        Returns:
+            Number of entries loaded
+        """
+        self._entries.clear()
+        self._file_entries = 0
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._entries.append(json.loads(line))
+                    self._file_entries += 1
+                except ValueError as e:
+                    print(f"Skipping bad slow-query entry {self.path}:{line_number}: {e}")
+        return len(self._entries)
+    
+    def observe(
+        self,
+        fingerprint: str,
+        sql: str,
+        executed_sql: str,
+        elapsed_ms: float,
+        rows: Optional[int] = None,
+        timed_out: bool = False
+    ) -> bool:
+        """
+        Log a query if it was slow or timed out
+        
+        Args:
+            fingerprint: Normalized SQL fingerprint
+            sql: SQL as validated
+            executed_sql: SQL actually sent (e.g. rewritten onto a rollup)
+            elapsed_ms: Database time in milliseconds
+            rows: Rows returned (None when the query failed)
+            timed_out: The statement timeout cancelled the query
+        
+        Returns:
+            True if the query was logged
+        """
+        if not timed_out and elapsed_ms < self.threshold_ms:
+            return False
+        
+        entry = {
+            "fingerprint": fingerprint,
+            "sql": sql,
+            "executed_sql": executed_sql if executed_sql != sql else None,
+            "elapsed_ms": round(elapsed_ms, 2),
+            "rows": rows,
+            "status": "timeout" if timed_out else "slow",
+            "logged_at": time.time(),
+            "plan_type": None,
+            "plan": None
+        }
+        analyze = not timed_out and self._random.random() < self.sample_rate
+        if (timed_out or analyze) and (self._capture is None or self._capture.done()):
+            self._capture = asyncio.ensure_future(self._explain_and_append(entry, analyze))
+        else:
+            self._append(entry)
+        return True
+    
+    def worst(self, limit: int = 20, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        """
+        Logged queries grouped by fingerprint, worst first
+        
+        Args:
+            limit: Maximum number of queries
+            order_by: total_ms, max_ms, mean_ms or calls
+        
+        Returns:
+            Per-query calls, timeouts, total/mean/max milliseconds, the last
+            row count and the most recent captured plan
+        """
+        if order_by not in ORDERINGS:
+            raise ValueError(f"order_by must be one of: {', '.join(ORDERINGS)}")
+        
+        groups: Dict[str, Dict[str, Any]] = {}
+        for entry in self._entries:
+            group = groups.setdefault(entry["fingerprint"], {
+                "fingerprint": entry["fingerprint"],
+                "sql": entry["sql"],
+                "calls": 0,
+                "timeouts": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "last_rows": None,
+                "last_seen": None,
+                "plan_type": None,
+                "plan_summary": None,
+                "plan": None
+            })
+            group["calls"] += 1
+            group["timeouts"] += entry["status"] == "timeout"
+            group["total_ms"] += entry["elapsed_ms"]
+            group["max_ms"] = max(group["max_ms"], entry["elapsed_ms"])
+            group["last_seen"] = entry["logged_at"]
+            if entry["rows"] is not None:
+                group["last_rows"] = entry["rows"]
+            if entry["plan"] is not None:
+                group["plan_type"] = entry["plan_type"]
+                group["plan"] = entry["plan"]
+                group["plan_summary"] = summarize_plan(entry["plan"]["Plan"])
+        
+        for group in groups.values():
+            group["total_ms"] = round(group["total_ms"], 2)
+            group["mean_ms"] = round(group["total_ms"] / group["calls"], 2)
+        return sorted(groups.values(), key=lambda group: group[order_by], reverse=True)[:limit]
+    
+    async def _explain_and_append(self, entry: Dict[str, Any], analyze: bool) -> None:
+        """Capture the plan of a logged query, then write the entry"""
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        try:
+            async with self.engine.connect() as conn:
+                # EXPLAIN ANALYZE executes the query: keep it read-only and
+                # bounded, and roll back when done
+                async with conn.begin() as transaction:
+                    await conn.execute(text("SET TRANSACTION READ ONLY"))
+                    await conn.execute(text(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}"))
+                    sql = entry["executed_sql"] or entry["sql"]
+                    raw = (await conn.execute(text(f"EXPLAIN ({options}) {sql}"))).scalar()
+                    await transaction.rollback()
+            entry["plan"] = (raw if isinstance(raw, list) else json.loads(raw))[0]
+            entry["plan_type"] = "analyze" if analyze else "explain"
+        except Exception as e:
+            print(f"Slow-query EXPLAIN failed: {e}")
+        self._append(entry)
+    
+    def _append(self, entry: Dict[str, Any]) -> None:
+        """Add an entry, rewriting the file once it holds twice the limit"""
+        self._entries.append(entry)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if self._file_entries + 1 > 2 * self.max_entries:
+                with open(self.path, "w") as f:
+                    f.writelines(json.dumps(e, default=str) + "\n" for e in self._entries)
+                self._file_entries = len(self._entries)
+            else:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(entry, default=str) + "\n")
+                self._file_entries += 1
+        except OSError as e:
+            print(f"Could not write slow-query log {self.path}: {e}")
+
+
+# Global instance
+slow_query_log = SlowQueryLog(
+    async_engine,
+    path=settings.SLOW_QUERY_LOG_PATH,
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    sample_rate=settings.SLOW_QUERY_ANALYZE_SAMPLE_RATE,
+    max_entries=settings.SLOW_QUERY_LOG_MAX_ENTRIES,
+    explain_timeout_ms=settings.QUERY_TIMEOUT_SECONDS * 1000
+)
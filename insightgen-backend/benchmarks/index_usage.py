@@ -0,0 +1,101 @@
+"""
+Index usage check for the example queries
+
+Runs EXPLAIN on the SQL examples in the SQL generation prompt and in
+SCHEMA_METADATA["common_queries"] (plus a date-range dashboard query), and
+reports which indexes each plan uses and whether it falls back to a
+sequential scan of orders. Needs a populated database whose tables are
+large enough for the planner to prefer indexes, e.g.:
+
+    python init_db.py --scale 1
+    python -m benchmarks.index_usage [--analyze]
+
+Exits non-zero when a query that should use an index doesn't.
+"""
+import argparse
+import json
+import re
+import sys
+
+from sqlalchemy import text
+
+from app.db.schema_loader import SCHEMA_METADATA
+from app.db.session import engine
+from app.llm.prompt_templates import SQL_GENERATION_PROMPT
+
+
+# Date-filtered orders queries must prune with one of these; the others are
+# reported for information (a full aggregate may legitimately scan)
+DATE_RANGE_INDEXES = {"ix_orders_order_date_brin", "ix_orders_product_date", "ix_orders_customer_date"}
+
+EXTRA_QUERIES = [
+    (
+        "Daily revenue by region for the last 30 days",
+        "SELECT c.region, o.order_date, SUM(o.revenue) AS total_revenue "
+        "FROM orders o JOIN customers c ON o.customer_id = c.customer_id "
+        "WHERE o.order_date >= CURRENT_DATE - INTERVAL '30 days' "
+        "GROUP BY c.region, o.order_date ORDER BY o.order_date"
+    ),
+    (
+        "Electronics revenue by month",
+        "SELECT DATE_TRUNC('month', o.order_date) AS month, SUM(o.revenue) AS total_revenue "
+        "FROM orders o JOIN products p ON o.product_id = p.product_id "
+        "WHERE p.category = 'Electronics' GROUP BY month ORDER BY month"
+    ),
+]
+
+_DATE_FILTER_PATTERN = re.compile(r"\bWHERE\b[^;]*\border_date\b", re.IGNORECASE)
+
+
+def example_queries():
+    """(question, sql) pairs from the prompt examples and common queries"""
+    queries = re.findall(r'Question: "([^"]+)"\nSQL: (.+)', SQL_GENERATION_PROMPT)
+    queries += [(q["question"], q["sql"]) for q in SCHEMA_METADATA.get("common_queries", [])]
+    return queries + EXTRA_QUERIES
+
+
+def plan_nodes(plan):
+    """Yield every node of an EXPLAIN (FORMAT JSON) plan tree"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(connection, sql: str, analyze: bool):
+    """Return (indexes used, tables sequentially scanned, total cost, ms)"""
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    raw = connection.execute(text(f"EXPLAIN ({options}) {sql}")).scalar()
+    result = (raw if isinstance(raw, list) else json.loads(raw))[0]
+    nodes = list(plan_nodes(result["Plan"]))
+    indexes = sorted({node["Index Name"] for node in nodes if "Index Name" in node})
+    seq_scans = sorted({node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"})
+    return indexes, seq_scans, result["Plan"]["Total Cost"], result.get("Execution Time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--analyze", action="store_true", help="Run EXPLAIN ANALYZE (executes the queries)")
+    args = parser.parse_args()
+    
+    failures = []
+    with engine.connect() as connection:
+        for question, sql in example_queries():
+            indexes, seq_scans, cost, elapsed = explain(connection, sql, args.analyze)
+            needs_index = bool(_DATE_FILTER_PATTERN.search(sql))
+            ok = not needs_index or bool(DATE_RANGE_INDEXES.intersection(indexes))
+            if not ok:
+                failures.append(question)
+            
+            print(f"{'OK  ' if ok else 'FAIL'} {question}")
+            print(f"     indexes: {', '.join(indexes) or '-'}")
+            print(f"     seq scans: {', '.join(seq_scans) or '-'}")
+            timing = f", {elapsed:.1f} ms" if elapsed is not None else ""
+            print(f"     cost: {cost:,.0f}{timing}")
+    
+    if failures:
+        print(f"\n{len(failures)} date-range query(ies) not using an orders index")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+End-to-end pipeline benchmark
+
+Runs the dashboard pipeline and its hot spots on synthetic order data at
+configurable scale factors (scale 1 = 1,000 result rows), without a
+database or network:
+- validate: SQLValidator.validate on unseen queries (memo cleared)
+- execute: QueryExecutor.execute_query against an in-memory session
+  (driver rows -> columnar result), result cache disabled
+- execute_cached: the same query served from the result cache
+- summary: column profiles, numeric stats and the LLM data summary
+- stat_insights: statistical insight engine
+- parse: viz config and insight parsing of LLM responses
+- dashboard: DashboardBuilder.build_dashboard with canned LLM responses
+- serialize: JSON encoding of the finished dashboard
+
+For every case it reports throughput, latency percentiles and peak traced
+memory, and writes them to a JSON file. With --compare, results are
+checked against a baseline (benchmarks/baseline.json) and the run fails
+when p50 latency or peak memory grew by more than the tolerance.
+
+Usage:
+    python -m benchmarks.pipeline [--scales 1,10,100] [--iterations N]
+        [--output FILE] [--compare FILE] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("LLM_PROVIDER", "replay")
+os.environ.setdefault("SCHEMA_INTROSPECTION_ENABLED", "false")
+os.environ.setdefault("ROLLUPS_ENABLED", "false")
+os.environ.setdefault("SLOW_QUERY_LOG_ENABLED", "false")
+os.environ.setdefault("QUERY_COST_GUARD_ENABLED", "false")
+
+from app.db.query_result import QueryResult
+from app.llm import viz_generator, insight_generator
+from app.llm.client import llm_client
+from app.llm.prompt_templates import (
+    SQL_GENERATION_PROMPT,
+    VISUALIZATION_GENERATION_PROMPT,
+    COMBINED_ANALYSIS_PROMPT
+)
+from app.llm.providers import LLMProvider, LLMResponse, LatencyModel
+from app.llm.stat_insights import stat_insight_engine
+from app.security import sql_validator
+from app.services.dashboard_builder import DashboardBuilder
+from app.services.query_executor import QueryExecutor, query_executor
+from app.services.result_cache import ResultCache
+
+
+BASELINE_FORMAT = 1
+ROWS_PER_SCALE = 1000
+CASES = (
+    "validate", "execute", "execute_cached", "summary",
+    "stat_insights", "parse", "dashboard", "serialize"
+)
+
+CATEGORIES = ["Electronics", "Clothing", "Home & Garden", "Sports", "Books", "Toys", "Beauty", "Food"]
+REGIONS = ["North", "South", "East", "West", "Central"]
+
+BENCHMARK_SQL = (
+    "SELECT o.order_date, p.category, c.region, "
+    "SUM(o.revenue) AS revenue, SUM(o.quantity) AS units "
+    "FROM orders o "
+    "JOIN products p ON p.product_id = o.product_id "
+    "JOIN customers c ON c.customer_id = o.customer_id "
+    "GROUP BY o.order_date, p.category, c.region "
+    "ORDER BY o.order_date"
+)
+BENCHMARK_COLUMNS = ["order_date", "category", "region", "revenue", "units"]
+
+VIZ_RESPONSE = json.dumps({
+    "chart_type": "line",
+    "title": "Revenue by Date and Category",
+    "x_axis": "order_date",
+    "y_axis": "revenue",
+    "group_by": "category",
+    "aggregation": "sum"
+})
+INSIGHTS_RESPONSE = json.dumps([
+    "Revenue grew 12.4% in the latest month, led by Electronics.",
+    "The North region contributes 31% of total revenue.",
+    "Weekend orders are 18% larger than weekday orders on average."
+])
+
+
+def generate_rows(num_rows: int, seed: int = 42):
+    """Synthetic grouped order rows as a database driver returns them"""
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    rows = []
+    for i in range(num_rows):
+        rows.append((
+            start + timedelta(days=i // (len(CATEGORIES) * len(REGIONS)) % 730),
+            CATEGORIES[i % len(CATEGORIES)],
+            REGIONS[(i // len(CATEGORIES)) % len(REGIONS)],
+            Decimal(f"{rng.lognormvariate(6, 1):.2f}"),
+            rng.randint(1, 50)
+        ))
+    return rows
+
+
+class BenchmarkResult:
+    """Rows returned by BenchmarkSession.execute"""
+    
+    def __init__(self, columns, rows):
+        self._columns = columns
+        self._rows = rows
+    
+    def keys(self):
+        return self._columns
+    
+    def fetchall(self):
+        return self._rows
+    
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class BenchmarkSession:
+    """In-memory stand-in for AsyncSession serving the synthetic rows"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "pg_stat_user_tables" in sql:
+            return BenchmarkResult([], [])
+        if sql.lstrip().upper().startswith("SET"):
+            return BenchmarkResult([], [])
+        return BenchmarkResult(BENCHMARK_COLUMNS, self.rows)
+    
+    async def connection(self):
+        """Stands in for the session's connection and its raw asyncpg one"""
+        return self
+    
+    async def get_raw_connection(self):
+        return self
+    
+    @property
+    def driver_connection(self):
+        return self
+    
+    def get_server_pid(self) -> int:
+        return 0
+
+
+class CannedProvider(LLMProvider):
+    """LLM provider answering each prompt type with a fixed response"""
+    
+    name = "canned"
+    
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+    
+    async def generate(self, prompt: str) -> LLMResponse:
+        delay = self.latency.sample()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Prompts are told apart by their (static) first line
+        first_line = prompt.split("\n", 1)[0]
+        if first_line == SQL_GENERATION_PROMPT.split("\n", 1)[0]:
+            text = BENCHMARK_SQL
+        elif first_line == COMBINED_ANALYSIS_PROMPT.split("\n", 1)[0]:
+            text = json.dumps({"chart": json.loads(VIZ_RESPONSE), "insights": json.loads(INSIGHTS_RESPONSE)})
+        elif first_line == VISUALIZATION_GENERATION_PROMPT.split("\n", 1)[0]:
+            text = VIZ_RESPONSE
+        else:
+            text = INSIGHTS_RESPONSE
+        return LLMResponse(text=text, prompt_tokens=len(prompt) // 4, output_tokens=len(text) // 4)
+
+
+def _percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(run, iterations: int, warmup: int = 1):
+    """
+    Time a zero-argument coroutine function
+    
+    Returns:
+        Dict with throughput, latency percentiles (ms) and peak traced
+        memory (KiB, measured in a separate run so tracing doesn't skew
+        the timings)
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        for _ in range(warmup):
+            loop.run_until_complete(run())
+        
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(iterations):
+            call_start = time.perf_counter()
+            loop.run_until_complete(run())
+            latencies.append((time.perf_counter() - call_start) * 1000)
+        elapsed = time.perf_counter() - start
+        
+        tracemalloc.start()
+        loop.run_until_complete(run())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        loop.close()
+    
+    return {
+        "iterations": iterations,
+        "throughput_ops": round(iterations / elapsed, 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(_percentile(latencies, 0.5), 3),
+        "p95_ms": round(_percentile(latencies, 0.95), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "peak_memory_kb": round(peak / 1024, 1)
+    }
+
+
+def build_cases(num_rows: int, latency: LatencyModel):
+    """Benchmark coroutine functions for one data size"""
+    rows = generate_rows(num_rows)
+    session = BenchmarkSession(rows)
+    column_values = [list(values) for values in zip(*rows)]
+    
+    # The dashboard pipeline uses the global executor; keep it uncached so
+    # every build executes the query
+    uncached = query_executor
+    uncached.result_cache = None
+    cached = QueryExecutor()
+    cached.result_cache = ResultCache(tables=sql_validator.ALLOWED_TABLES, max_bytes=1 << 30)
+    
+    llm_client.provider = CannedProvider(latency)
+    builder = DashboardBuilder()
+    dashboard = {}
+    
+    async def validate():
+        sql_validator._verdicts.clear()
+        sql_validator.validate(BENCHMARK_SQL)
+    
+    async def execute():
+        await uncached.execute_query(session, BENCHMARK_SQL)
+    
+    async def execute_cached():
+        await cached.execute_query(session, BENCHMARK_SQL)
+    
+    async def summary():
+        data = QueryResult(BENCHMARK_COLUMNS, column_values)
+        data.profile()
+        insight_generator.create_data_summary(data)
+    
+    async def stat_insights():
+        stat_insight_engine.generate(QueryResult(BENCHMARK_COLUMNS, column_values))
+    
+    async def parse():
+        viz_generator._parse_config(f"```json\n{VIZ_RESPONSE}\n```")
+        insight_generator._parse_insights(INSIGHTS_RESPONSE)
+    
+    async def build():
+        dashboard["value"] = await builder.build_dashboard(session, "Show revenue by category and region over time")
+    
+    async def serialize():
+        if "value" not in dashboard:
+            await build()
+        json.dumps(dashboard["value"], default=str)
+    
+    return {
+        "validate": validate,
+        "execute": execute,
+        "execute_cached": execute_cached,
+        "summary": summary,
+        "stat_insights": stat_insights,
+        "parse": parse,
+        "dashboard": build,
+        "serialize": serialize
+    }
+
+
+def compare(results, baseline, tolerance: float):
+    """
+    Compare results with a baseline
+    
+    Returns:
+        List of regression descriptions (p50 latency or peak memory more
+        than tolerance above the baseline)
+    """
+    previous = {(r["case"], r["scale"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result["case"], result["scale"]))
+        if before is None:
+            continue
+        for metric in ("p50_ms", "peak_memory_kb"):
+            if before[metric] > 0 and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{result['case']} @ scale {result['scale']}: {metric} "
+                    f"{before[metric]} -> {result[metric]} "
+                    f"(+{(result[metric] / before[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated scale factors (1 = 1,000 rows)")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed runs per case")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated cases to run")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated median LLM latency")
+    parser.add_argument("--output", default="benchmarks/results.json", help="Where to write results")
+    parser.add_argument("--compare", help="Baseline file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing")
+    args = parser.parse_args()
+    
+    scales = [float(scale) for scale in args.scales.split(",")]
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    latency = LatencyModel(
+        "lognormal" if args.llm_latency_ms > 0 else "none",
+        median_ms=args.llm_latency_ms,
+        seed=0
+    )
+    
+    results = []
+    print(f"{'case':<15} {'scale':>6} {'rows':>8} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>10}")
+    for scale in scales:
+        num_rows = max(1, int(scale * ROWS_PER_SCALE))
+        runners = build_cases(num_rows, latency)
+        for case in cases:
+            result = {"case": case, "scale": scale, "rows": num_rows}
+            result.update(measure(runners[case], args.iterations))
+            results.append(result)
+            print(
+                f"{case:<15} {scale:>6g} {num_rows:>8} {result['throughput_ops']:>10.1f} "
+                f"{result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+                f"{result['peak_memory_kb']:>10.1f}"
+            )
+    
+    baseline = {
+        "format": BASELINE_FORMAT,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "llm_latency_ms": args.llm_latency_ms,
+        "results": results
+    }
+    
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
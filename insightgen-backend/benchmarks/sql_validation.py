@@ -0,0 +1,74 @@
+"""
+Microbenchmark for SQL validation
+
+Generates multi-join CTE queries of increasing size (the shape Gemini
+produces for analytical questions) and times:
+- sqlparse.parse: full parse with grouping, which the old validator ran twice
+- cold: SQLValidator.check on an unseen query (single ungrouped parse)
+- warm: SQLValidator.check on a memoized query (fingerprint lookup only)
+
+Usage:
+    python -m benchmarks.sql_validation [--repeat N]
+"""
+import argparse
+import time
+
+import sqlparse
+
+from app.security.sql_validator import SQLValidator
+
+
+def generate_query(num_ctes: int) -> str:
+    """Build a WITH query with num_ctes joined, filtered, aggregated CTEs"""
+    ctes = ",\n".join(
+        f"c{i} AS (\n"
+        f"    SELECT o.customer_id, p.category, SUM(o.revenue) AS revenue_{i}\n"
+        f"    FROM orders o\n"
+        f"    JOIN products p ON p.product_id = o.product_id\n"
+        f"    JOIN customers cu ON cu.customer_id = o.customer_id\n"
+        f"    WHERE o.order_date >= DATE '2024-01-01' + INTERVAL '{i} month'\n"
+        f"      AND cu.region IN ('North', 'South')\n"
+        f"    GROUP BY o.customer_id, p.category\n"
+        f")"
+        for i in range(num_ctes)
+    )
+    joins = "\n".join(
+        f"JOIN c{i} USING (customer_id, category)" for i in range(1, num_ctes)
+    )
+    return f"WITH {ctes}\nSELECT * FROM c0\n{joins}\nORDER BY revenue_0 DESC;"
+
+
+def time_per_call(func, repeat: int) -> float:
+    """Return the mean wall time of func() in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per measurement")
+    args = parser.parse_args()
+    
+    print(f"{'ctes':>5} {'chars':>7} {'sqlparse.parse':>15} {'cold':>9} {'warm':>9}")
+    for num_ctes in (1, 4, 16, 32):
+        sql = generate_query(num_ctes)
+        validator = SQLValidator()
+        assert validator.check(sql).is_valid
+        
+        def cold():
+            validator._verdicts.clear()
+            validator.check(sql)
+        
+        parse_ms = time_per_call(lambda: sqlparse.parse(sql), args.repeat)
+        cold_ms = time_per_call(cold, args.repeat)
+        warm_ms = time_per_call(lambda: validator.check(sql), args.repeat)
+        print(
+            f"{num_ctes:>5} {len(sql):>7} {parse_ms:>12.3f} ms "
+            f"{cold_ms:>6.3f} ms {warm_ms:>6.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Tests for rewriting aggregate queries onto the order rollups"""
+from app.services.aggregate_navigator import AggregateNavigator
+import pytest
+
+
+@pytest.fixture
+def navigator():
+    return AggregateNavigator()
+
+
+def test_monthly_totals_read_the_monthly_rollup(navigator):
+    sql, table = navigator.rewrite(
+        "SELECT DATE_TRUNC('month', o.order_date) AS month, SUM(o.revenue) AS revenue "
+        "FROM orders o GROUP BY 1 ORDER BY 1"
+    )
+    
+    assert table == "orders_monthly_rollup"
+    assert sql == (
+        "SELECT DATE_TRUNC('month', r.month_start) AS month, SUM(r.revenue) AS revenue "
+        "FROM orders_monthly_rollup r GROUP BY 1 ORDER BY 1"
+    )
+
+
+def test_daily_dates_read_the_daily_rollup(navigator):
+    sql, table = navigator.rewrite(
+        "SELECT o.order_date, SUM(o.revenue) AS revenue FROM orders o GROUP BY o.order_date"
+    )
+    
+    assert table == "orders_daily_rollup"
+    assert sql == (
+        "SELECT r.order_date, SUM(r.revenue) AS revenue "
+        "FROM orders_daily_rollup r GROUP BY r.order_date"
+    )
+
+
+def test_count_and_avg_become_sums_and_keep_their_names(navigator):
+    sql, table = navigator.rewrite(
+        "SELECT p.category, COUNT(*), AVG(o.quantity) FROM orders o "
+        "JOIN products p ON o.product_id = p.product_id GROUP BY p.category"
+    )
+    
+    assert table == "orders_monthly_rollup"
+    assert "COALESCE(SUM(r.order_count), 0)::bigint AS count" in sql
+    assert "(SUM(r.quantity)::numeric / NULLIF(SUM(r.order_count), 0)) AS avg" in sql
+
+
+@pytest.mark.parametrize("sql", [
+    # Row-level query
+    "SELECT o.order_id, o.revenue FROM orders o LIMIT 10",
+    # Column the rollups do not carry
+    "SELECT c.customer_name, SUM(o.revenue) FROM orders o "
+    "JOIN customers c ON o.customer_id = c.customer_id GROUP BY c.customer_name",
+    # Output alias that would turn into a rollup column in GROUP BY
+    "SELECT p.category AS region, SUM(o.revenue) FROM orders o "
+    "JOIN products p ON o.product_id = p.product_id GROUP BY region",
+    "SELECT COUNT(DISTINCT o.customer_id) FROM orders o",
+    "SELECT p.category, SUM(o.revenue) FROM orders o "
+    "LEFT JOIN products p ON o.product_id = p.product_id GROUP BY p.category",
+    "SELECT SUM(revenue) FROM orders; DELETE FROM orders",
+])
+def test_queries_it_cannot_answer_are_left_alone(navigator, sql):
+    assert navigator.rewrite(sql) is None
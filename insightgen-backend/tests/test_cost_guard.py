@@ -0,0 +1,56 @@
+"""Tests for the EXPLAIN-based query budget"""
+from app.services.cost_guard import CostGuard, QueryBudgetExceeded
+import pytest
+
+
+def scan(cost, rows, startup=0.0):
+    return {"Node Type": "Seq Scan", "Startup Cost": startup, "Total Cost": cost, "Plan Rows": rows}
+
+
+def limit(source, rows):
+    return {
+        "Node Type": "Limit",
+        "Startup Cost": source["Startup Cost"],
+        "Total Cost": source["Total Cost"],
+        "Plan Rows": rows,
+        "Plans": [source]
+    }
+
+
+@pytest.fixture
+def guard():
+    return CostGuard(max_cost=1000.0, max_join_rows=10_000.0, min_rows=100)
+
+
+def test_query_within_budget_runs_unchanged(guard):
+    assert guard.check(scan(cost=500.0, rows=1000)) is None
+
+
+def test_cartesian_join_is_rejected_even_when_cheap(guard):
+    join = {
+        "Node Type": "Nested Loop", "Join Type": "Inner",
+        "Startup Cost": 0.0, "Total Cost": 10.0, "Plan Rows": 50_000,
+        "Plans": [scan(1.0, 100), scan(1.0, 500)]
+    }
+    
+    with pytest.raises(QueryBudgetExceeded, match="join"):
+        guard.check(join)
+
+
+def test_expensive_query_without_limit_is_rejected(guard):
+    with pytest.raises(QueryBudgetExceeded, match="cost"):
+        guard.check(scan(cost=5000.0, rows=100_000))
+
+
+def test_expensive_limit_is_tightened_to_the_budget(guard):
+    # 100 startup + 9900 for 100,000 rows: 900 of run cost buys 9,090 rows
+    plan = limit(scan(cost=10_000.0, rows=100_000, startup=100.0), rows=50_000)
+    
+    assert guard.check(plan) == 9090
+
+
+def test_limit_below_min_rows_is_rejected(guard):
+    plan = limit(scan(cost=1_000_000.0, rows=100_000, startup=100.0), rows=50_000)
+    
+    with pytest.raises(QueryBudgetExceeded):
+        guard.check(plan)
@@ -0,0 +1,59 @@
+"""Tests for the dashboard pipeline"""
+from app.llm.sql_cache import SQLCache
+from app.llm.sql_generator import SQLGenerator
+from app.services.dashboard_builder import DashboardBuilder, run_pipeline
+import asyncio
+import importlib
+import pytest
+
+builder_module = importlib.import_module("app.services.dashboard_builder")
+
+QUESTION = "Show total sales by category"
+SQL = "SELECT category, SUM(revenue) FROM orders GROUP BY category"
+
+
+class FakeClient:
+    async def generate(self, prompt, purpose="default"):
+        return SQL
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    generator = SQLGenerator()
+    generator.client = FakeClient()
+    generator.cache = SQLCache()
+    monkeypatch.setattr(builder_module, "sql_generator", generator)
+    return generator
+
+
+def run_sql_and_query():
+    stages = DashboardBuilder()._build_stages(None, QUESTION)
+    stages = [stage for stage in stages if stage.name in ("sql", "query")]
+    return asyncio.run(run_pipeline(stages))
+
+
+def test_sql_is_cached_after_it_runs(generator, monkeypatch):
+    async def execute_query(db, sql):
+        return "rows", {}
+    monkeypatch.setattr(builder_module.query_executor, "execute_query", execute_query)
+    
+    run_sql_and_query()
+    
+    assert generator.cache.stats()["entries"] == 1
+
+
+def test_failed_sql_is_not_cached(generator, monkeypatch):
+    async def execute_query(db, sql):
+        raise RuntimeError("Query execution failed: column does not exist")
+    monkeypatch.setattr(builder_module.query_executor, "execute_query", execute_query)
+    
+    with pytest.raises(RuntimeError):
+        run_sql_and_query()
+    
+    assert generator.cache.stats()["entries"] == 0
+
+
+def test_generated_sql_is_not_cached_before_it_runs(generator):
+    asyncio.run(generator.generate_sql(QUESTION))
+    
+    assert generator.cache.stats()["entries"] == 0
@@ -0,0 +1,56 @@
+"""Tests for loading the synthetic sales data"""
+from app.db import data_generator
+from app.db.data_generator import GeneratorConfig, load_sample_data
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import pytest
+
+
+class FakeConnection:
+    """psycopg2 connection recording the statements run through it"""
+    
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+    
+    def cursor(self):
+        return self
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+    
+    def commit(self):
+        self.commits += 1
+    
+    def rollback(self):
+        pass
+    
+    def close(self):
+        pass
+
+
+def test_failed_chunk_still_restores_the_orders_keys_and_indexes(monkeypatch):
+    connection = FakeConnection()
+    engine = SimpleNamespace(
+        url=SimpleNamespace(render_as_string=lambda hide_password: "postgresql://test"),
+        raw_connection=lambda: connection
+    )
+    
+    def failing_chunk(database_url, config, index):
+        raise RuntimeError("COPY failed")
+    
+    monkeypatch.setattr(data_generator, "copy_frame", lambda connection, table, frame: None)
+    monkeypatch.setattr(data_generator, "_drop_keys_and_indexes", lambda connection, table: ["RESTORE orders_pkey"])
+    monkeypatch.setattr(data_generator, "_load_order_chunk", failing_chunk)
+    monkeypatch.setattr(data_generator, "ProcessPoolExecutor", ThreadPoolExecutor)
+    
+    with pytest.raises(RuntimeError, match="COPY failed"):
+        load_sample_data(engine, GeneratorConfig(scale=0.0001), workers=1)
+    
+    assert "RESTORE orders_pkey" in connection.statements
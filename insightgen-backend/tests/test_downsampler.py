@@ -0,0 +1,93 @@
+"""Tests for chart-aware result reduction"""
+from app.db.query_result import QueryResult
+from app.services.downsampler import Downsampler
+from datetime import date, timedelta
+import numpy as np
+import pytest
+
+
+def config(chart_type, x_axis, y_axis):
+    return {"chart_type": chart_type, "x_axis": x_axis, "y_axis": y_axis}
+
+
+@pytest.fixture
+def downsampler():
+    return Downsampler(max_points=100, max_pie_slices=4, max_bar_categories=3)
+
+
+def daily_series(days):
+    start = date(2024, 1, 1)
+    return QueryResult.from_rows(
+        ["order_date", "revenue"],
+        [(start + timedelta(days=i), float(i % 7)) for i in range(days)]
+    )
+
+
+def test_line_is_reduced_to_the_point_budget_keeping_both_ends(downsampler):
+    data = daily_series(1000)
+    
+    reduced, method = downsampler.reduce(data, config("line", "order_date", "revenue"))
+    
+    assert method == "lttb"
+    assert len(reduced) == 100
+    dates = list(reduced.array("order_date"))
+    assert dates[0] == data.array("order_date")[0]
+    assert dates[-1] == data.array("order_date")[-1]
+
+
+def test_line_keeps_a_spike(downsampler):
+    rows = [(i, 1.0) for i in range(1000)]
+    rows[500] = (500, 1000.0)
+    data = QueryResult.from_rows(["x", "y"], rows)
+    
+    reduced, _ = downsampler.reduce(data, config("line", "x", "y"))
+    
+    assert 1000.0 in reduced.array("y")
+
+
+def test_pie_keeps_the_largest_slices_and_folds_the_rest_into_other(downsampler):
+    data = QueryResult.from_rows(
+        ["category", "revenue"],
+        [("A", 50.0), ("B", 40.0), ("C", 30.0), ("D", 5.0), ("E", 3.0), ("A", 10.0)]
+    )
+    
+    reduced, method = downsampler.reduce(data, config("pie", "category", "revenue"))
+    
+    assert method == "top_n_other"
+    assert list(reduced.array("category")) == ["A", "B", "C", "Other"]
+    assert list(reduced.array("revenue")) == [60.0, 40.0, 30.0, 8.0]
+
+
+def test_bar_keeps_the_rows_of_the_largest_categories(downsampler):
+    data = QueryResult.from_rows(
+        ["region", "revenue"],
+        [("North", 1.0), ("South", 9.0), ("East", 5.0), ("West", 7.0), ("South", 2.0)]
+    )
+    
+    reduced, method = downsampler.reduce(data, config("bar", "region", "revenue"))
+    
+    assert method == "category_cap"
+    assert list(reduced.array("region")) == ["South", "East", "West", "South"]
+
+
+@pytest.mark.parametrize("chart_type", ["line", "pie", "bar", "scatter", "table"])
+def test_small_results_pass_through(downsampler, chart_type):
+    data = QueryResult.from_rows(["category", "revenue"], [("A", 1.0), ("B", 2.0), ("C", 3.0)])
+    
+    reduced, method = downsampler.reduce(data, config(chart_type, "category", "revenue"))
+    
+    assert reduced is data
+    assert method is None
+
+
+def test_scatter_sample_keeps_an_outlier(downsampler):
+    rng = np.random.default_rng(0)
+    rows = [(float(x), float(y)) for x, y in rng.normal(size=(5000, 2))]
+    rows.append((100.0, 100.0))
+    data = QueryResult.from_rows(["x", "y"], rows)
+    
+    reduced, method = downsampler.reduce(data, config("scatter", "x", "y"))
+    
+    assert method == "stratified_sample"
+    assert len(reduced) < len(data)
+    assert 100.0 in reduced.array("x")
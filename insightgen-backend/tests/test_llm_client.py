@@ -0,0 +1,50 @@
+"""Tests for the shared LLM client"""
+from app.llm.client import LLMClient
+from app.llm.providers import LLMProvider, LLMResponse
+import asyncio
+
+
+class FixedProvider(LLMProvider):
+    """Answers after a per-prompt delay and counts requests"""
+    
+    def __init__(self, delays):
+        self.delays = delays
+        self.requests = 0
+    
+    async def generate(self, prompt: str) -> LLMResponse:
+        self.requests += 1
+        await asyncio.sleep(self.delays[prompt])
+        return LLMResponse(text=prompt)
+
+
+def make_client(provider):
+    return LLMClient(provider, timeout=5.0, hedge_enabled=True, hedge_min_samples=3)
+
+
+def test_hedge_delay_is_kept_per_purpose():
+    provider = FixedProvider({"fast": 0.001, "slow": 0.05})
+    client = make_client(provider)
+    
+    async def run():
+        for _ in range(3):
+            await client.generate("fast", purpose="viz")
+            await client.generate("slow", purpose="analysis")
+    asyncio.run(run())
+    
+    assert client.hedge_delay("viz") < 0.01
+    assert client.hedge_delay("analysis") >= 0.05
+    assert client.hedge_delay("sql") is None
+
+
+def test_cancelled_call_is_counted():
+    client = make_client(FixedProvider({"slow": 1.0}))
+    
+    async def run():
+        task = asyncio.ensure_future(client.generate("slow", purpose="sql"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    asyncio.run(run())
+    
+    assert client.stats()["sql"]["cancellations"] == 1
+    assert client.stats()["sql"]["failures"] == 0
@@ -0,0 +1,19 @@
+"""Tests for the LLM providers"""
+from app.llm.providers import GeminiProvider, LLMProvider
+import asyncio
+import pytest
+
+
+def test_gemini_provider_needs_no_key_until_first_call():
+    provider = GeminiProvider("gemini-2.5-flash", api_key="")
+    
+    with pytest.raises(ValueError, match="GOOGLE_API_KEY"):
+        asyncio.run(provider.generate("Say hi"))
+
+
+def test_provider_without_generate_fails_when_created():
+    class Incomplete(LLMProvider):
+        name = "incomplete"
+    
+    with pytest.raises(TypeError):
+        Incomplete()
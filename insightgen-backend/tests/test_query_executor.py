@@ -0,0 +1,84 @@
+"""Tests for cancelling running queries on the server"""
+import asyncio
+import importlib
+import pytest
+
+
+query_executor_module = importlib.import_module("app.services.query_executor")
+
+PID = 4242
+
+
+class FakeSession:
+    """AsyncSession whose query runs until its backend is cancelled"""
+    
+    def __init__(self):
+        self.running = False
+        self.backend_cancelled = asyncio.Event()
+        self.driver_connection = self
+    
+    def get_server_pid(self):
+        return PID
+    
+    async def get_raw_connection(self):
+        return self
+    
+    async def connection(self):
+        assert not self.running, "session used while its query is running"
+        return self
+    
+    async def execute(self, statement):
+        self.running = True
+        try:
+            await self.backend_cancelled.wait()
+            raise RuntimeError("canceling statement due to user request")
+        finally:
+            self.running = False
+
+
+class FakeCancelEngine:
+    """Engine running pg_cancel_backend against the fake session"""
+    
+    def __init__(self, session):
+        self.session = session
+        self.cancelled_pids = []
+    
+    def connect(self):
+        return self
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def execute(self, statement, params):
+        assert self.session.running, "cancel sent to an idle backend"
+        self.cancelled_pids.append(params["pid"])
+        self.session.backend_cancelled.set()
+        return self
+    
+    def scalar(self):
+        return True
+
+
+def test_cancelling_the_caller_cancels_the_query_on_its_backend(monkeypatch):
+    async def scenario():
+        session = FakeSession()
+        engine = FakeCancelEngine(session)
+        monkeypatch.setattr(query_executor_module, "cancel_engine", engine)
+        
+        task = asyncio.ensure_future(
+            query_executor_module.query_executor._execute_cancellable(session, "SELECT pg_sleep(60)")
+        )
+        await asyncio.sleep(0.01)
+        assert session.running
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return session, engine
+    
+    session, engine = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+    
+    assert engine.cancelled_pids == [PID]
+    assert not session.running
@@ -0,0 +1,86 @@
+"""Tests for the order rollup refresh"""
+from app.db import rollups
+from app.db.rollups import refresh_rollups
+from datetime import date
+from types import SimpleNamespace
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+    
+    def scalar(self):
+        return self.value
+    
+    def one(self):
+        return self.value
+    
+    def one_or_none(self):
+        return self.value
+
+
+class FakeConnection:
+    """Answers the refresh's reads and records every statement it runs"""
+    
+    def __init__(self, state, changes=10, modifications=0, high=100, changed=(None, None)):
+        self.answers = {
+            rollups.SOURCE_CHANGES_SQL: SimpleNamespace(changes=changes, modifications=modifications),
+            rollups.STATE_SQL: state,
+            rollups.CHANGED_DATES_SQL: SimpleNamespace(first=changed[0], last=changed[1]),
+        }
+        self.high = high
+        self.executed = []
+    
+    def execute(self, statement, params=None):
+        self.executed.append((statement, params))
+        if statement in self.answers:
+            return FakeResult(self.answers[statement])
+        if "advisory" in str(statement):
+            return FakeResult(True)
+        if "max(order_id)" in str(statement):
+            return FakeResult(self.high)
+        return FakeResult(None)
+    
+    def params(self, statement):
+        return [params for executed, params in self.executed if executed is statement]
+    
+    def statements(self):
+        return [str(statement) for statement, _ in self.executed]
+
+
+def state(last_order_id=80, changes=5, modifications=0):
+    return SimpleNamespace(
+        last_order_id=last_order_id, source_changes=changes, source_modifications=modifications
+    )
+
+
+def test_incremental_refresh_rescans_recent_ids_and_replaces_their_dates():
+    connection = FakeConnection(state(), changed=(date(2024, 1, 30), date(2024, 2, 3)))
+    
+    summary = refresh_rollups(connection, rescan_ids=50)
+    
+    assert summary == {"mode": "incremental", "low": 30, "high": 100}
+    assert connection.params(rollups.CHANGED_DATES_SQL) == [{"low": 30, "high": 100}]
+    dates = {"first": date(2024, 1, 30), "last": date(2024, 2, 3)}
+    assert connection.params(rollups.DAILY_DELETE_SQL) == [dates]
+    assert connection.params(rollups.DAILY_INSERT_SQL) == [dates]
+    months = {"month_first": date(2024, 1, 1), "month_last": date(2024, 2, 29)}
+    assert connection.params(rollups.MONTHLY_DELETE_SQL) == [months]
+    assert connection.params(rollups.MONTHLY_INSERT_SQL) == [months]
+
+
+def test_modified_source_rebuilds_every_row_without_truncate():
+    connection = FakeConnection(state(), modifications=1)
+    
+    summary = refresh_rollups(connection)
+    
+    assert summary["mode"] == "full"
+    assert connection.params(rollups.DAILY_DELETE_SQL) == [{"first": date.min, "last": date.max}]
+    assert not any("TRUNCATE" in statement.upper() for statement in connection.statements())
+
+
+def test_unchanged_source_skips_the_refresh():
+    connection = FakeConnection(state(changes=10))
+    
+    assert refresh_rollups(connection)["mode"] == "unchanged"
+    assert connection.params(rollups.DAILY_DELETE_SQL) == []
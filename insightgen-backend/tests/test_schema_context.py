@@ -0,0 +1,87 @@
+"""Tests for schema versioning of introspected metadata"""
+from app.db.schema_context import SchemaContextBuilder
+from app.db.schema_introspector import SchemaIntrospector
+from app.db.schema_loader import get_schema_metadata, set_schema_metadata
+import copy
+import importlib
+import pytest
+
+
+METADATA = {
+    "database": "sales",
+    "description": "Sales data",
+    "tables": {
+        "products": {
+            "description": "Products",
+            "columns": {
+                "product_id": {"type": "INTEGER", "primary_key": True},
+                "category": {"type": "VARCHAR(100)", "stats": {"null_frac": 0.0, "n_distinct": 5.0}}
+            },
+            "sample_values": {"category": ["Electronics", "Books"]}
+        }
+    }
+}
+
+
+def version(metadata):
+    return SchemaContextBuilder(metadata).schema_version
+
+
+def test_new_statistics_keep_the_schema_version():
+    analyzed = copy.deepcopy(METADATA)
+    products = analyzed["tables"]["products"]
+    products["columns"]["category"]["stats"] = {"null_frac": 0.1, "n_distinct": 6.0}
+    products["sample_values"] = {"category": ["Electronics", "Books", "Toys"]}
+    products["date_ranges"] = {}
+    
+    assert version(analyzed) == version(METADATA)
+
+
+def test_new_column_type_changes_the_schema_version():
+    altered = copy.deepcopy(METADATA)
+    altered["tables"]["products"]["columns"]["category"]["type"] = "TEXT"
+    
+    assert version(altered) != version(METADATA)
+
+
+def test_built_metadata_does_not_share_columns_with_the_introspector():
+    introspector = SchemaIntrospector(static_metadata=METADATA)
+    introspector._tables = copy.deepcopy(METADATA["tables"])
+    metadata = introspector._build_metadata()
+    
+    introspector._tables["products"]["columns"]["category"]["stats"] = {}
+    introspector._tables["products"]["sample_values"]["category"] = []
+    
+    assert metadata["tables"]["products"] == METADATA["tables"]["products"]
+
+
+@pytest.fixture
+def schema_refresh(monkeypatch):
+    """The schema refresh module, with the schema it started with restored afterwards"""
+    module = importlib.import_module("app.services.schema_refresh")
+    monkeypatch.setattr(module.sql_validator, "ALLOWED_TABLES", module.sql_validator.ALLOWED_TABLES)
+    monkeypatch.setattr(module, "_applied_metadata", module._applied_metadata)
+    original = get_schema_metadata()
+    yield module
+    set_schema_metadata(original)
+    module.schema_context_builder.load(original)
+    if module.sql_generator.cache is not None:
+        module.sql_generator.cache.load_schema(original)
+
+
+def test_reanalyzed_schema_keeps_cached_results(schema_refresh, monkeypatch):
+    resets = []
+    cache = schema_refresh.query_executor.result_cache
+    monkeypatch.setattr(cache, "reset_tables", resets.append)
+    schema_refresh.apply_schema(copy.deepcopy(METADATA))
+    resets.clear()
+    
+    analyzed = copy.deepcopy(METADATA)
+    analyzed["tables"]["products"]["sample_values"] = {"category": ["Toys"]}
+    schema_refresh.apply_schema(analyzed)
+    assert resets == []
+    
+    altered = copy.deepcopy(METADATA)
+    altered["tables"]["products"]["columns"]["category"]["type"] = "TEXT"
+    schema_refresh.apply_schema(altered)
+    assert resets == [{"products"}]
@@ -0,0 +1,88 @@
+"""Tests for the semantic NL-to-SQL cache"""
+from app.llm.sql_cache import SQLCache
+import pytest
+
+SCHEMA_VERSION = "v1"
+SQL = "SELECT customer_name FROM customers WHERE region = 'North'"
+
+
+@pytest.fixture
+def cache():
+    return SQLCache(max_entries=100, ttl_seconds=3600, similarity_threshold=0.8)
+
+
+def test_exact_match_ignores_case_order_and_stop_words(cache):
+    cache.set("Show total sales by category", SCHEMA_VERSION, "SELECT 1")
+    
+    assert cache.get("total SALES by Category", SCHEMA_VERSION) == "SELECT 1"
+
+
+def test_near_match_is_reused(cache):
+    cache.set("Show customers who placed an order in the North region", SCHEMA_VERSION, SQL)
+    
+    assert cache.get("Show customers who placed orders in North region", SCHEMA_VERSION) == SQL
+
+
+@pytest.mark.parametrize("question", [
+    "Show customers who did not order in the North region",
+    "Show customers who didn't order in the North region",
+    "Show customers who order excluding the North region",
+    "Show customers who ordered without the North region",
+])
+def test_negation_does_not_match_the_positive_question(cache, question):
+    cache.set("Show customers who did order in the North region", SCHEMA_VERSION, SQL)
+    
+    assert cache.get(question, SCHEMA_VERSION) is None
+
+
+def test_top_and_bottom_do_not_match(cache):
+    cache.set("Show the top 5 products by revenue this year", SCHEMA_VERSION, "SELECT 1")
+    
+    assert cache.get("Show the bottom 5 products by revenue this year", SCHEMA_VERSION) is None
+    assert cache.get("Show the lowest 5 products by revenue this year", SCHEMA_VERSION) is None
+
+
+def test_different_aggregates_do_not_match(cache):
+    cache.set(
+        "total order quantity per customer region for Electronics products over the last 3 months",
+        SCHEMA_VERSION, "SELECT 1"
+    )
+    
+    assert cache.get(
+        "average order quantity per customer region for Electronics products over the last 3 months",
+        SCHEMA_VERSION
+    ) is None
+
+
+def test_different_columns_do_not_match(cache):
+    cache.set(
+        "total revenue per customer region for Electronics products over the last 3 months",
+        SCHEMA_VERSION, "SELECT 1"
+    )
+    
+    assert cache.get(
+        "total quantity per customer region for Electronics products over the last 3 months",
+        SCHEMA_VERSION
+    ) is None
+
+
+def test_different_numbers_do_not_match(cache):
+    cache.set("Show the top 5 products by revenue in 2024", SCHEMA_VERSION, "SELECT 1")
+    
+    assert cache.get("Show the top 10 products by revenue in 2024", SCHEMA_VERSION) is None
+
+
+def test_discard_evicts_every_entry_with_the_sql(cache):
+    cache.set("Show total sales by category", SCHEMA_VERSION, "SELECT 1")
+    cache.set("Revenue per category", SCHEMA_VERSION, "SELECT 1")
+    cache.set("Revenue per region", SCHEMA_VERSION, "SELECT 2")
+    
+    assert cache.discard("SELECT 1") == 2
+    assert cache.get("Show total sales by category", SCHEMA_VERSION) is None
+    assert cache.get("Revenue per region", SCHEMA_VERSION) == "SELECT 2"
+
+
+def test_schema_change_drops_entries(cache):
+    cache.set("Show total sales by category", SCHEMA_VERSION, "SELECT 1")
+    
+    assert cache.get("Show total sales by category", "v2") is None
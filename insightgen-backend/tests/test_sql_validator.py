@@ -0,0 +1,56 @@
+"""Tests for SQL fingerprinting and validation"""
+from app.security.sql_validator import SQLValidator, fingerprint_sql
+import pytest
+
+
+def test_formatting_does_not_change_the_fingerprint():
+    assert fingerprint_sql("SELECT  category,\n SUM(revenue) FROM orders GROUP BY category;") == \
+        fingerprint_sql("select category, sum(revenue) from ORDERS group by category")
+
+
+@pytest.mark.parametrize("first, second", [
+    ("SELECT SUM(quantity)/2 FROM orders", "SELECT SUM(quantity)/2.0 FROM orders"),
+    ("SELECT * FROM orders LIMIT 1000", "SELECT * FROM orders LIMIT 1e3"),
+    ("SELECT * FROM orders WHERE revenue > 1.5", "SELECT * FROM orders WHERE revenue > 1.50"),
+    ("SELECT * FROM orders WHERE region = 'North'", "SELECT * FROM orders WHERE region = 'north'"),
+    ("SELECT * FROM orders", "SELECT * FROM orders -- WHERE region = 'North'"),
+])
+def test_different_literals_change_the_fingerprint(first, second):
+    assert fingerprint_sql(first) != fingerprint_sql(second)
+
+
+def test_verdicts_are_memoized_per_fingerprint():
+    validator = SQLValidator(max_rows=100)
+    
+    validator.check("SELECT * FROM orders")
+    validator.check("select *  from orders;")
+    
+    assert validator.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+
+@pytest.mark.parametrize("sql, error", [
+    ("DELETE FROM orders", "Only SELECT queries are allowed"),
+    ("SELECT * FROM orders; DROP TABLE orders", "Dangerous keyword detected: DROP"),
+    ("SELECT 1; SELECT 2", "Multiple SQL statements not allowed"),
+])
+def test_unsafe_sql_is_rejected(sql, error):
+    statement = SQLValidator().check(sql)
+    
+    assert not statement.is_valid
+    assert statement.error == error
+
+
+def test_limit_is_added_when_missing():
+    statement = SQLValidator(max_rows=100).check("SELECT * FROM orders;")
+    
+    assert statement.executable_sql == "SELECT * FROM orders LIMIT 100"
+
+
+def test_trailing_semicolon_is_dropped_when_a_limit_is_present():
+    statement = SQLValidator().check("SELECT * FROM orders LIMIT 10;  ")
+    
+    assert statement.executable_sql == "SELECT * FROM orders LIMIT 10"
+
+
+def test_credit_limit_column_is_not_a_limit_clause():
+    assert not SQLValidator().check("SELECT credit_limit FROM customers").has_limit
@@ -0,0 +1,52 @@
+"""Tests for the statistical insight engine"""
+from app.db.query_result import QueryResult
+from app.llm.stat_insights import StatInsightEngine
+from datetime import date
+
+
+def generate(columns, rows):
+    return StatInsightEngine(max_insights=10).generate(QueryResult.from_rows(columns, rows))
+
+
+def test_growth_ignores_rows_without_a_period():
+    rows = [
+        (None, 150.0),
+        (date(2024, 1, 1), 400.0),
+        (date(2024, 2, 1), 800.0),
+        (date(2024, 3, 1), 950.0),
+    ]
+    
+    insights = generate(["month", "revenue"], rows)
+    
+    assert any("increased 18.8% in the latest month" in text for text in insights)
+    assert any("Across 3 month periods, revenue is up 137.5%" in text for text in insights)
+    assert not any("533.3%" in text for text in insights)
+
+
+def test_contributors_ignore_null_categories():
+    rows = [("Electronics", 500.0), ("Clothing", 300.0), ("Books", 100.0), (None, 5.0)]
+    
+    insights = generate(["category", "revenue"], rows)
+    
+    assert any(text.startswith("Electronics leads revenue") for text in insights)
+    assert any(text.startswith("Books contributes the least revenue") for text in insights)
+    assert not any("None" in text for text in insights)
+
+
+def test_series_change_ignores_null_series():
+    rows = [
+        (date(2024, 1, 1), "North", 100.0),
+        (date(2024, 1, 1), "South", 100.0),
+        (date(2024, 1, 1), None, 1.0),
+        (date(2024, 2, 1), "North", 150.0),
+        (date(2024, 2, 1), "South", 90.0),
+        (date(2024, 2, 1), None, 50.0),
+    ]
+    
+    insights = generate(["month", "region", "revenue"], rows)
+    
+    assert any(text.startswith("North had the strongest latest-period change") for text in insights)
+
+
+def test_empty_result():
+    assert generate(["revenue"], []) == ["No data available to generate insights."]
@@ -0,0 +1,37 @@
+"""Tests for rule-based chart selection"""
+from app.config import settings
+from app.db.query_result import QueryResult
+from app.llm.viz_rules import VizRules, viz_rules
+from datetime import date
+
+
+def infer(rules, columns, rows):
+    data = QueryResult.from_rows(columns, rows)
+    return rules.infer(data.profile(), len(data))
+
+
+def test_limits_come_from_the_chart_settings():
+    assert viz_rules.max_pie_slices == settings.CHART_MAX_PIE_SLICES
+    assert viz_rules.max_bar_categories == settings.CHART_MAX_BAR_CATEGORIES
+
+
+def test_date_and_measure_make_a_line_chart():
+    rows = [(date(2024, 1, day), day * 10.0) for day in range(1, 8)]
+    
+    config = infer(VizRules(), ["order_date", "revenue"], rows)
+    
+    assert config["chart_type"] == "line"
+    assert (config["x_axis"], config["y_axis"]) == ("order_date", "revenue")
+
+
+def test_few_categories_make_a_pie_up_to_the_slice_limit():
+    rows = [(f"Category {i}", 10.0 + i) for i in range(4)]
+    
+    assert infer(VizRules(max_pie_slices=4), ["category", "revenue"], rows)["chart_type"] == "pie"
+    assert infer(VizRules(max_pie_slices=3), ["category", "revenue"], rows)["chart_type"] == "bar"
+
+
+def test_too_many_categories_are_ambiguous():
+    rows = [(f"Product {i}", float(i)) for i in range(20)]
+    
+    assert infer(VizRules(max_bar_categories=10), ["product_name", "revenue"], rows) is None